@@ -0,0 +1,67 @@
+"""
+Command plug-in used to register a spline IK build as a single undoable
+command, see :func:`splineIK.utils.undo.runUndoableBuild`.
+"""
+import sys
+from maya import OpenMayaMPx
+
+from splineIK.utils import undo
+
+
+# ----------------------------------------------------------------------------
+
+
+class BuildCommand(OpenMayaMPx.MPxCommand):
+    def __init__(self):
+        OpenMayaMPx.MPxCommand.__init__(self)
+        self._build = None
+
+    # ------------------------------------------------------------------------
+
+    def isUndoable(self):
+        return True
+
+    def doIt(self, args):
+        # get build
+        if not undo.PENDING_BUILDS:
+            raise RuntimeError(
+                "{0}: no pending build!".format(undo.BUILD_COMMAND)
+            )
+
+        self._build = undo.PENDING_BUILDS[-1]
+        self.redoIt()
+
+    def redoIt(self):
+        self._build.redo()
+
+    def undoIt(self):
+        self._build.undo()
+
+
+def creator():
+    return OpenMayaMPx.asMPxPtr(BuildCommand())
+
+
+# ----------------------------------------------------------------------------
+
+
+def initializePlugin(obj):
+    plugin = OpenMayaMPx.MFnPlugin(obj, "Robert Joosten", "1.0", "Any")
+    try:
+        plugin.registerCommand(undo.BUILD_COMMAND, creator)
+    except:
+        sys.stderr.write(
+            "Failed to register command: {0}\n".format(undo.BUILD_COMMAND)
+        )
+        raise
+
+
+def uninitializePlugin(obj):
+    plugin = OpenMayaMPx.MFnPlugin(obj)
+    try:
+        plugin.deregisterCommand(undo.BUILD_COMMAND)
+    except:
+        sys.stderr.write(
+            "Failed to deregister command: {0}\n".format(undo.BUILD_COMMAND)
+        )
+        raise
@@ -0,0 +1,343 @@
+"""
+Node plug-in used to cache the joint transforms of a spline IK, see
+:func:`splineIK.utils.cache.createCache`. A cache hit only saves the
+evaluation of the joint network in DG evaluation mode, see
+:mod:`splineIK.utils.cache`.
+"""
+import sys
+from maya import OpenMaya, OpenMayaMPx
+
+from splineIK.utils import cache
+
+
+# ----------------------------------------------------------------------------
+
+
+class CacheNode(OpenMayaMPx.MPxNode):
+    aEnable = OpenMaya.MObject()
+    aCacheSize = OpenMaya.MObject()
+    aInputMatrix = OpenMaya.MObject()
+    aInputValue = OpenMaya.MObject()
+
+    aInput = OpenMaya.MObject()
+    aInputTranslate = OpenMaya.MObject()
+    aInputRotate = OpenMaya.MObject()
+    aInputRotateX = OpenMaya.MObject()
+    aInputRotateY = OpenMaya.MObject()
+    aInputRotateZ = OpenMaya.MObject()
+    aInputScale = OpenMaya.MObject()
+
+    aOutput = OpenMaya.MObject()
+    aOutputTranslate = OpenMaya.MObject()
+    aOutputRotate = OpenMaya.MObject()
+    aOutputRotateX = OpenMaya.MObject()
+    aOutputRotateY = OpenMaya.MObject()
+    aOutputRotateZ = OpenMaya.MObject()
+    aOutputScale = OpenMaya.MObject()
+
+    aCacheHits = OpenMaya.MObject()
+    aCacheMisses = OpenMaya.MObject()
+    aCacheEntries = OpenMaya.MObject()
+
+    def __init__(self):
+        OpenMayaMPx.MPxNode.__init__(self)
+        self._cache = cache.LRUCache()
+
+    # ------------------------------------------------------------------------
+
+    def __getKey(self, data):
+        values = []
+
+        # get matrices, the last column of a transformation matrix is
+        # constant and is skipped
+        handle = data.inputArrayValue(CacheNode.aInputMatrix)
+        for i in range(handle.elementCount()):
+            handle.jumpToArrayElement(i)
+            matrix = handle.inputValue().asMatrix()
+            values.extend(matrix(r, c) for r in range(4) for c in range(3))
+
+        # get values
+        handle = data.inputArrayValue(CacheNode.aInputValue)
+        for i in range(handle.elementCount()):
+            handle.jumpToArrayElement(i)
+            values.append(handle.inputValue().asDouble())
+
+        return cache.getKey(values)
+
+    def __getTransforms(self, data):
+        transforms = []
+
+        handle = data.inputArrayValue(CacheNode.aInput)
+        for i in range(handle.elementCount()):
+            handle.jumpToArrayElement(i)
+            element = handle.inputValue()
+            rotate = element.child(CacheNode.aInputRotate)
+
+            t = element.child(CacheNode.aInputTranslate).asVector()
+            r = [
+                rotate.child(attr).asAngle().asRadians()
+                for attr in [
+                    CacheNode.aInputRotateX,
+                    CacheNode.aInputRotateY,
+                    CacheNode.aInputRotateZ
+                ]
+            ]
+            s = element.child(CacheNode.aInputScale).asVector()
+
+            transforms.append((
+                handle.elementIndex(),
+                (t.x, t.y, t.z),
+                tuple(r),
+                (s.x, s.y, s.z)
+            ))
+
+        return transforms
+
+    def __setTransforms(self, data, transforms):
+        handle = data.outputArrayValue(CacheNode.aOutput)
+        builder = handle.builder()
+
+        for index, t, r, s in transforms:
+            element = builder.addElement(index)
+            element.child(CacheNode.aOutputTranslate).set3Double(*t)
+            element.child(CacheNode.aOutputScale).set3Double(*s)
+
+            rotate = element.child(CacheNode.aOutputRotate)
+            for attr, value in zip(
+                [
+                    CacheNode.aOutputRotateX,
+                    CacheNode.aOutputRotateY,
+                    CacheNode.aOutputRotateZ
+                ],
+                r
+            ):
+                rotate.child(attr).setMAngle(OpenMaya.MAngle(value))
+
+        handle.set(builder)
+        handle.setAllClean()
+
+    def __setCounters(self, data):
+        for attr, value in [
+            (CacheNode.aCacheHits, self._cache.hits),
+            (CacheNode.aCacheMisses, self._cache.misses),
+            (CacheNode.aCacheEntries, len(self._cache)),
+        ]:
+            handle = data.outputValue(attr)
+            handle.setInt(value)
+            handle.setClean()
+
+    # ------------------------------------------------------------------------
+
+    def compute(self, plug, data):
+        # validate plug, the counters are computed together with the
+        # outputs
+        attr = plug
+        if attr.isChild():
+            attr = attr.parent()
+        if attr.isElement():
+            attr = attr.array()
+        if attr not in [
+            CacheNode.aOutput,
+            CacheNode.aCacheHits,
+            CacheNode.aCacheMisses,
+            CacheNode.aCacheEntries
+        ]:
+            return OpenMaya.kUnknownParameter
+
+        # disabling the cache clears it, the cache can go stale when the
+        # joint network is changed
+        enable = data.inputValue(CacheNode.aEnable).asBool()
+        if not enable:
+            self._cache.clear()
+
+        self._cache.size = data.inputValue(CacheNode.aCacheSize).asInt()
+
+        # get transforms, the joint network is only pulled on a miss. The
+        # evaluation manager evaluates the dirty joint network regardless,
+        # so a hit only skips the network in DG evaluation mode.
+        transforms = None
+        if enable:
+            key = self.__getKey(data)
+            transforms = self._cache.get(key)
+
+        if transforms is None:
+            transforms = self.__getTransforms(data)
+            if enable:
+                self._cache.set(key, transforms)
+
+        # set outputs
+        self.__setTransforms(data, transforms)
+        self.__setCounters(data)
+        data.setClean(plug)
+
+
+def creator():
+    return OpenMayaMPx.asMPxPtr(CacheNode())
+
+
+def createTransformAttributes(prefix, short):
+    nAttr = OpenMaya.MFnNumericAttribute()
+    uAttr = OpenMaya.MFnUnitAttribute()
+    cAttr = OpenMaya.MFnCompoundAttribute()
+
+    translate = nAttr.create(
+        "{0}Translate".format(prefix),
+        "{0}t".format(short),
+        OpenMaya.MFnNumericData.k3Double
+    )
+
+    rotates = [
+        uAttr.create(
+            "{0}Rotate{1}".format(prefix, axis),
+            "{0}r{1}".format(short, axis.lower()),
+            OpenMaya.MFnUnitAttribute.kAngle
+        )
+        for axis in ["X", "Y", "Z"]
+    ]
+    rotate = nAttr.create(
+        "{0}Rotate".format(prefix),
+        "{0}r".format(short),
+        *rotates
+    )
+
+    scale = nAttr.create(
+        "{0}Scale".format(prefix),
+        "{0}s".format(short),
+        OpenMaya.MFnNumericData.k3Double
+    )
+    nAttr.setDefault(1.0, 1.0, 1.0)
+
+    compound = cAttr.create(prefix, short)
+    cAttr.setArray(True)
+    cAttr.setUsesArrayDataBuilder(True)
+    for child in [translate, rotate, scale]:
+        cAttr.addChild(child)
+
+    return [compound, translate, rotate] + rotates + [scale]
+
+
+def initialize():
+    nAttr = OpenMaya.MFnNumericAttribute()
+    mAttr = OpenMaya.MFnMatrixAttribute()
+
+    # create settings
+    CacheNode.aEnable = nAttr.create(
+        "enable",
+        "en",
+        OpenMaya.MFnNumericData.kBoolean,
+        True
+    )
+    nAttr.setKeyable(True)
+
+    CacheNode.aCacheSize = nAttr.create(
+        "cacheSize",
+        "cs",
+        OpenMaya.MFnNumericData.kInt,
+        1000
+    )
+    nAttr.setMin(0)
+    nAttr.setKeyable(True)
+
+    # create keys
+    CacheNode.aInputMatrix = mAttr.create("inputMatrix", "im")
+    mAttr.setArray(True)
+
+    CacheNode.aInputValue = nAttr.create(
+        "inputValue",
+        "iv",
+        OpenMaya.MFnNumericData.kDouble
+    )
+    nAttr.setArray(True)
+
+    # create transforms
+    CacheNode.aInput, \
+    CacheNode.aInputTranslate, \
+    CacheNode.aInputRotate, \
+    CacheNode.aInputRotateX, \
+    CacheNode.aInputRotateY, \
+    CacheNode.aInputRotateZ, \
+    CacheNode.aInputScale = createTransformAttributes("input", "i")
+
+    CacheNode.aOutput, \
+    CacheNode.aOutputTranslate, \
+    CacheNode.aOutputRotate, \
+    CacheNode.aOutputRotateX, \
+    CacheNode.aOutputRotateY, \
+    CacheNode.aOutputRotateZ, \
+    CacheNode.aOutputScale = createTransformAttributes("output", "o")
+
+    cAttr = OpenMaya.MFnCompoundAttribute(CacheNode.aOutput)
+    cAttr.setWritable(False)
+    cAttr.setStorable(False)
+
+    # create counters
+    for name, short, attr in [
+        ("cacheHits", "ch", "aCacheHits"),
+        ("cacheMisses", "cm", "aCacheMisses"),
+        ("cacheEntries", "ce", "aCacheEntries"),
+    ]:
+        obj = nAttr.create(name, short, OpenMaya.MFnNumericData.kInt, 0)
+        nAttr.setWritable(False)
+        nAttr.setStorable(False)
+        setattr(CacheNode, attr, obj)
+
+    # add attributes
+    for attr in [
+        CacheNode.aEnable,
+        CacheNode.aCacheSize,
+        CacheNode.aInputMatrix,
+        CacheNode.aInputValue,
+        CacheNode.aInput,
+        CacheNode.aOutput,
+        CacheNode.aCacheHits,
+        CacheNode.aCacheMisses,
+        CacheNode.aCacheEntries,
+    ]:
+        CacheNode.addAttribute(attr)
+
+    # the counters are set when the outputs are computed, they are
+    # affected by the same inputs to be dirtied with the outputs
+    for attr in [
+        CacheNode.aEnable,
+        CacheNode.aCacheSize,
+        CacheNode.aInputMatrix,
+        CacheNode.aInputValue,
+        CacheNode.aInput,
+    ]:
+        for affected in [
+            CacheNode.aOutput,
+            CacheNode.aCacheHits,
+            CacheNode.aCacheMisses,
+            CacheNode.aCacheEntries,
+        ]:
+            CacheNode.attributeAffects(attr, affected)
+
+
+# ----------------------------------------------------------------------------
+
+
+def initializePlugin(obj):
+    plugin = OpenMayaMPx.MFnPlugin(obj, "Robert Joosten", "1.0", "Any")
+    try:
+        plugin.registerNode(
+            cache.CACHE_NODE,
+            OpenMaya.MTypeId(cache.CACHE_NODE_ID),
+            creator,
+            initialize
+        )
+    except:
+        sys.stderr.write(
+            "Failed to register node: {0}\n".format(cache.CACHE_NODE)
+        )
+        raise
+
+
+def uninitializePlugin(obj):
+    plugin = OpenMayaMPx.MFnPlugin(obj)
+    try:
+        plugin.deregisterNode(OpenMaya.MTypeId(cache.CACHE_NODE_ID))
+    except:
+        sys.stderr.write(
+            "Failed to deregister node: {0}\n".format(cache.CACHE_NODE)
+        )
+        raise
@@ -0,0 +1,324 @@
+"""
+Deformer plug-in used to deform geometry along a spline IK without
+joints, see :mod:`splineIK.utils.deformer`. The plug-in uses the Python
+API 2.0 as its arrays can be converted to and from NumPy arrays. The
+node only reads the bind, the geometry is bound in its rest pose using
+:func:`splineIK.utils.deformer.bindDeformer`.
+"""
+import sys
+from maya.api import OpenMaya, OpenMayaAnim
+
+from splineIK.utils import deformer
+
+
+def maya_useNewAPI():
+    pass
+
+
+# ----------------------------------------------------------------------------
+
+
+class DeformerNode(OpenMayaAnim.MPxDeformerNode):
+    aInputCurve = OpenMaya.MObject()
+    aRootMatrix = OpenMaya.MObject()
+    aForwardAxis = OpenMaya.MObject()
+    aUpAxis = OpenMaya.MObject()
+
+    aSample = OpenMaya.MObject()
+    aSampleParameter = OpenMaya.MObject()
+    aSampleMatrix = OpenMaya.MObject()
+
+    aScaleMultiplier = OpenMaya.MObject()
+    aScaleClampMin = OpenMaya.MObject()
+    aScaleClampMax = OpenMaya.MObject()
+
+    aBind = OpenMaya.MObject()
+    aBindIndex = OpenMaya.MObject()
+    aBindWeight = OpenMaya.MObject()
+    aBindOffset = OpenMaya.MObject()
+    aRestLength = OpenMaya.MObject()
+
+    def __init__(self):
+        OpenMayaAnim.MPxDeformerNode.__init__(self)
+
+    # ------------------------------------------------------------------------
+
+    def __getSamples(self, data):
+        parameters = []
+        matrices = []
+
+        handle = data.inputArrayValue(DeformerNode.aSample)
+        for i in range(len(handle)):
+            handle.jumpToPhysicalElement(i)
+            element = handle.inputValue()
+
+            parameters.append(
+                element.child(DeformerNode.aSampleParameter).asDouble()
+            )
+            matrices.append(
+                list(element.child(DeformerNode.aSampleMatrix).asMatrix())
+            )
+
+        return parameters, matrices
+
+    def __getCurvePoints(self, curve, parameters):
+        # get points, the parameters are normalized between 0-1
+        start, end = curve.knotDomain
+        positions = []
+        tangents = []
+
+        for parameter in parameters:
+            parameter = start + parameter * (end - start)
+            point = curve.getPointAtParam(parameter, OpenMaya.MSpace.kObject)
+            tangent = curve.tangent(parameter, OpenMaya.MSpace.kObject)
+
+            positions.append([point.x, point.y, point.z])
+            tangents.append([tangent.x, tangent.y, tangent.z])
+
+        return positions, tangents
+
+    def __getBind(self, data, index):
+        # an element without data raises, the geometry is not bound
+        handle = data.inputArrayValue(DeformerNode.aBind)
+        try:
+            handle.jumpToLogicalElement(index)
+            element = handle.inputValue()
+            return [
+                list(OpenMaya.MFnIntArrayData(
+                    element.child(DeformerNode.aBindIndex).data()
+                ).array()),
+                list(OpenMaya.MFnDoubleArrayData(
+                    element.child(DeformerNode.aBindWeight).data()
+                ).array()),
+                list(OpenMaya.MFnDoubleArrayData(
+                    element.child(DeformerNode.aBindOffset).data()
+                ).array()),
+            ]
+        except RuntimeError:
+            return None
+
+    def __getRestLengths(self, data):
+        handle = data.inputValue(DeformerNode.aRestLength)
+        try:
+            return list(OpenMaya.MFnDoubleArrayData(handle.data()).array())
+        except RuntimeError:
+            return []
+
+    # ------------------------------------------------------------------------
+
+    def deform(self, data, iterator, matrix, index):
+        # get envelope
+        envelope = data.inputValue(
+            OpenMayaAnim.MPxDeformerNode.envelope
+        ).asFloat()
+        if not envelope:
+            return
+
+        # get curve
+        curve = data.inputValue(DeformerNode.aInputCurve).asNurbsCurve()
+        if curve.isNull():
+            return
+
+        curve = OpenMaya.MFnNurbsCurve(curve)
+
+        # get samples
+        parameters, matrices = self.__getSamples(data)
+        if len(parameters) < 2:
+            return
+
+        # get bind, the geometry is left undeformed when the bind doesn't
+        # match the geometry or the samples, binding a posed curve would
+        # silently change the rest pose
+        bind = self.__getBind(data, index)
+        restLengths = self.__getRestLengths(data)
+
+        if not bind or len(bind[1]) != iterator.count() or (
+            len(restLengths) != len(parameters) - 1
+        ):
+            return
+
+        positions, tangents = self.__getCurvePoints(curve, parameters)
+
+        # get settings
+        forwardAxis = data.inputValue(DeformerNode.aForwardAxis).asShort()
+        upAxis = data.inputValue(DeformerNode.aUpAxis).asShort()
+        rootMatrix = data.inputValue(DeformerNode.aRootMatrix).asMatrix()
+        rootScale = OpenMaya.MVector(
+            rootMatrix[0],
+            rootMatrix[1],
+            rootMatrix[2]
+        ).length()
+
+        # get points in world space
+        points = [list(point) for point in iterator.allPositions()]
+        points = deformer.transformPoints(points, list(matrix))
+
+        # get frames, the rest lengths are stored without the scale of the
+        # root
+        stretch = deformer.getStretch(
+            positions,
+            restLengths,
+            rootScale,
+            data.inputValue(DeformerNode.aScaleMultiplier).asDouble(),
+            data.inputValue(DeformerNode.aScaleClampMin).asDouble(),
+            data.inputValue(DeformerNode.aScaleClampMax).asDouble()
+        )
+        frames = deformer.getFrames(
+            positions,
+            tangents,
+            matrices,
+            forwardAxis,
+            upAxis,
+            stretch
+        )
+
+        # deform points
+        points = deformer.deformPoints(
+            bind[0],
+            bind[1],
+            bind[2],
+            frames,
+            points,
+            envelope
+        )
+        points = deformer.transformPoints(points, list(matrix.inverse()))
+        iterator.setAllPositions(
+            OpenMaya.MPointArray([list(point) for point in points])
+        )
+
+
+def creator():
+    return DeformerNode()
+
+
+def initialize():
+    nAttr = OpenMaya.MFnNumericAttribute()
+    mAttr = OpenMaya.MFnMatrixAttribute()
+    tAttr = OpenMaya.MFnTypedAttribute()
+    eAttr = OpenMaya.MFnEnumAttribute()
+    cAttr = OpenMaya.MFnCompoundAttribute()
+
+    # create curve
+    DeformerNode.aInputCurve = tAttr.create(
+        "inputCurve",
+        "ic",
+        OpenMaya.MFnData.kNurbsCurve
+    )
+    DeformerNode.aRootMatrix = mAttr.create("rootMatrix", "rm")
+
+    # create axes
+    for attr, name, short, default in [
+        ("aForwardAxis", "forwardAxis", "fa", 0),
+        ("aUpAxis", "upAxis", "ua", 1),
+    ]:
+        obj = eAttr.create(name, short, default)
+        for i, axis in enumerate(["x", "y", "z"]):
+            eAttr.addField(axis, i)
+
+        setattr(DeformerNode, attr, obj)
+
+    # create samples
+    DeformerNode.aSampleParameter = nAttr.create(
+        "sampleParameter",
+        "sp",
+        OpenMaya.MFnNumericData.kDouble,
+        0.0
+    )
+    DeformerNode.aSampleMatrix = mAttr.create("sampleMatrix", "sm")
+
+    DeformerNode.aSample = cAttr.create("sample", "s")
+    cAttr.array = True
+    cAttr.addChild(DeformerNode.aSampleParameter)
+    cAttr.addChild(DeformerNode.aSampleMatrix)
+
+    # create stretch
+    for attr, name, short, default in [
+        ("aScaleMultiplier", "scaleMultiplier", "smu", 1.0),
+        ("aScaleClampMin", "scaleClampMin", "scn", 0.1),
+        ("aScaleClampMax", "scaleClampMax", "scx", 2.0),
+    ]:
+        obj = nAttr.create(
+            name,
+            short,
+            OpenMaya.MFnNumericData.kDouble,
+            default
+        )
+        nAttr.keyable = True
+        setattr(DeformerNode, attr, obj)
+
+    # create bind
+    DeformerNode.aBindIndex = tAttr.create(
+        "bindIndex",
+        "bi",
+        OpenMaya.MFnData.kIntArray
+    )
+    DeformerNode.aBindWeight = tAttr.create(
+        "bindWeight",
+        "bw",
+        OpenMaya.MFnData.kDoubleArray
+    )
+    DeformerNode.aBindOffset = tAttr.create(
+        "bindOffset",
+        "bo",
+        OpenMaya.MFnData.kDoubleArray
+    )
+
+    DeformerNode.aBind = cAttr.create("bind", "b")
+    cAttr.array = True
+    cAttr.addChild(DeformerNode.aBindIndex)
+    cAttr.addChild(DeformerNode.aBindWeight)
+    cAttr.addChild(DeformerNode.aBindOffset)
+
+    DeformerNode.aRestLength = tAttr.create(
+        "restLength",
+        "rl",
+        OpenMaya.MFnData.kDoubleArray
+    )
+
+    # add attributes
+    outputGeometry = OpenMayaAnim.MPxDeformerNode.outputGeom
+    for attr in [
+        DeformerNode.aInputCurve,
+        DeformerNode.aRootMatrix,
+        DeformerNode.aForwardAxis,
+        DeformerNode.aUpAxis,
+        DeformerNode.aSample,
+        DeformerNode.aScaleMultiplier,
+        DeformerNode.aScaleClampMin,
+        DeformerNode.aScaleClampMax,
+        DeformerNode.aBind,
+        DeformerNode.aRestLength,
+    ]:
+        DeformerNode.addAttribute(attr)
+        DeformerNode.attributeAffects(attr, outputGeometry)
+
+
+# ----------------------------------------------------------------------------
+
+
+def initializePlugin(obj):
+    plugin = OpenMaya.MFnPlugin(obj, "Robert Joosten", "1.0", "Any")
+    try:
+        plugin.registerNode(
+            deformer.DEFORMER_NODE,
+            OpenMaya.MTypeId(deformer.DEFORMER_NODE_ID),
+            creator,
+            initialize,
+            OpenMaya.MPxNode.kDeformerNode
+        )
+    except:
+        sys.stderr.write(
+            "Failed to register node: {0}\n".format(deformer.DEFORMER_NODE)
+        )
+        raise
+
+
+def uninitializePlugin(obj):
+    plugin = OpenMaya.MFnPlugin(obj)
+    try:
+        plugin.deregisterNode(OpenMaya.MTypeId(deformer.DEFORMER_NODE_ID))
+    except:
+        sys.stderr.write(
+            "Failed to deregister node: {0}\n".format(deformer.DEFORMER_NODE)
+        )
+        raise
@@ -82,8 +82,55 @@ is called.
     * orientToCurve
     * orientRootToCurve  
 """
-from .create import SplineIK
+import sys
+import types
 
 __author__  = "Robert Joosten"
 __version__ = "0.7.0"
 __email__   = "rwm.joosten@gmail.com"
+
+
+# ----------------------------------------------------------------------------
+
+
+LAZY_ATTRIBUTES = {
+    "SplineIK": "create",
+}
+
+
+class LazyModule(types.ModuleType):
+    """
+    The lazy module imports the modules of the attributes defined in
+    :data:`LAZY_ATTRIBUTES` on first access. This keeps importing the
+    package, for example to install the shelf button on startup, free of
+    importing the create module and all of the utils.
+    """
+    def __getattr__(self, name):
+        if name not in LAZY_ATTRIBUTES:
+            raise AttributeError(
+                "module '{0}' has no attribute '{1}'".format(
+                    self.__name__,
+                    name
+                )
+            )
+
+        # import module, the attribute is cached on the package
+        module = __import__(
+            "{0}.{1}".format(self.__name__, LAZY_ATTRIBUTES[name]),
+            fromlist=[name]
+        )
+        value = getattr(module, name)
+        setattr(self, name, value)
+
+        return value
+
+    def __dir__(self):
+        return sorted(set(self.__dict__.keys()) | set(LAZY_ATTRIBUTES))
+
+
+# replace the package with a lazy module, the original module is kept
+# alive as its globals are used by the lazy module
+_module = LazyModule(__name__, __doc__)
+_module.__dict__.update(sys.modules[__name__].__dict__)
+_module._original = sys.modules[__name__]
+sys.modules[__name__] = _module
@@ -1,15 +1,27 @@
+import time
 from maya import cmds, OpenMaya
 
 from .utils import (
     attribute,
+    audit,
+    cache,
     curve, 
+    deformer,
     cluster, 
     undo, 
     math, 
     colour, 
     control, 
     controlShape,
-    motionPath
+    motionPath,
+    bezier,
+    container,
+    nodeState,
+    track,
+    trace,
+    plan,
+    skin,
+    stage
 )
 
 from .settings import (
@@ -21,6 +33,7 @@ from .settings import (
 
 
 MATRIX_PLUGIN = "matrixNodes.mll"
+OFFSET_PARENT_MATRIX_API = 20200000
 
 
 # ----------------------------------------------------------------------------
@@ -50,6 +63,10 @@ class SplineIK(Settings):
         # variables
         self._name = None
         self._curve = None
+        self._fitError = None
+        self._trace = None
+        self._container = None
+        self._batchResults = []
         
         # control variables
         self._controls = []
@@ -64,6 +81,41 @@ class SplineIK(Settings):
         # joints variables
         self._joints = []
         self._rootJoint = None
+        self._drivenJoints = None
+        self._fromJoints = False
+
+        # tracked nodes variables
+        self._jointNodes = []
+        self._segmentNodes = []
+        self._slideNodes = {}
+        self._slideParameters = {}
+
+        # level of detail variables
+        self._lowJoints = []
+        self._lowRootJoint = None
+
+        # span evaluation variables
+        self._spanCurves = []
+        self._spanKnots = []
+
+        # cache variables
+        self._cacheNodes = []
+
+        # deformer variables
+        self._deformerNode = None
+
+        # matrix output variables
+        self._matrices = []
+        self._bindPreMatrices = []
+
+        # twist variables
+        self._twistReference = None
+        self._twistReferenceMatrix = None
+        self._twistPointOnCurves = []
+
+        # switch variables
+        self._lodSwitch = None
+        self._slideSwitch = None
         
         # load matrix nodes plugin
         if not cmds.pluginInfo(MATRIX_PLUGIN, query=True, loaded=True):
@@ -97,6 +149,75 @@ class SplineIK(Settings):
     def curve(self, curve):
         self._curve = curve
 
+    @property
+    def fitError(self):
+        """
+        :return: maximum deviation of the fitted curve, None if not fitted
+        :rtype: float/None
+        """
+        return self._fitError
+
+    @property
+    def trace(self):
+        """
+        :return: trace of the last build, None if not recorded
+        :rtype: splineIK.utils.trace.Trace/None
+        """
+        return self._trace
+
+    @property
+    def batchResults(self):
+        """
+        :return: name, curve, build time and node count per spline IK of
+            the last batch
+        :rtype: list
+        """
+        return self._batchResults
+
+    @property
+    def container(self):
+        """
+        :return: container holding all nodes of the spline IK
+        :rtype: str/None
+        """
+        return self._container
+
+    @property
+    def visible(self):
+        """
+        :return: visibility of all nodes of the spline IK
+        :rtype: bool
+        """
+        return cmds.getAttr(
+            "{0}.{1}".format(self.container, container.VISIBILITY_ATTR)
+        )
+
+    @visible.setter
+    def visible(self, state):
+        cmds.setAttr(
+            "{0}.{1}".format(self.container, container.VISIBILITY_ATTR),
+            state
+        )
+
+    @property
+    def frozen(self):
+        """
+        :return: frozen state of all nodes of the spline IK
+        :rtype: bool
+        """
+        return cmds.getAttr(
+            "{0}.{1}".format(self.container, container.FROZEN_ATTR)
+        )
+
+    @frozen.setter
+    def frozen(self, state):
+        cmds.setAttr(
+            "{0}.{1}".format(self.container, container.FROZEN_ATTR),
+            state
+        )
+
+    # ------------------------------------------------------------------------
+
     @property
     def curveShape(self):
         """
@@ -174,13 +295,84 @@ class SplineIK(Settings):
         :rtype: list
         """
         return self._joints
+
+    @property
+    def lowRootJoint(self):
+        """
+        :return: name of low resolution root joint
+        :rtype: str
+        """
+        return self._lowRootJoint
+
+    @property
+    def lowJoints(self):
+        """
+        :return: list of low resolution joints that are attached to the curve
+        :rtype: list
+        """
+        return self._lowJoints
+
+    @property
+    def cacheNode(self):
+        """
+        :return: cache node of the joints, when a level of detail is used
+            the cache node of the high resolution joints
+        :rtype: str/None
+        """
+        return self._cacheNodes[-1] if self._cacheNodes else None
+
+    @property
+    def cacheNodes(self):
+        """
+        :return: cache nodes of all joint sets
+        :rtype: list
+        """
+        return self._cacheNodes
+
+    @property
+    def deformerNode(self):
+        """
+        :return: deformer node when the output is a deformer
+        :rtype: str/None
+        """
+        return self._deformerNode
+
+    @property
+    def matrices(self):
+        """
+        :return: world matrix attributes when the output is matrices
+        :rtype: list
+        """
+        return self._matrices
+
+    @property
+    def bindPreMatrices(self):
+        """
+        :return: inverse rest matrices when the output is matrices
+        :rtype: list
+        """
+        return self._bindPreMatrices
         
     # ------------------------------------------------------------------------
     
-    def __orientControl(self, offset):
-        # get position
-        pos = cmds.xform(offset, q=True, ws=True, t=True)
+    def __getCurveUp(self, forward):
+        # get up vector perpendicular to the tangent, facing the same
+        # direction as the up vector
+        up = OpenMaya.MVector(*self.upVector)
+
+        right = up^forward
+        right.normalize()
+
+        up = right^forward
+        up.normalize()
+
+        orient = up*OpenMaya.MVector(*self.upVector)
+        if orient <= 0:
+            up = up * -1
 
+        return up
+
+    def __getOrientation(self, pos):
         # get closest parameter on curve
         parameter, _ = curve.nearestPointOnCurve(self.curveShape, pos)
 
@@ -193,17 +385,7 @@ class SplineIK(Settings):
 
         # get up
         forward = OpenMaya.MVector(*forward)
-        up = OpenMaya.MVector(*self.upVector)
-
-        right = up^forward
-        right.normalize()
-
-        up = right^forward
-        up.normalize()
-
-        orient = up*OpenMaya.MVector(*self.upVector)
-        if orient <= 0:
-            up = up * -1
+        up = self.__getCurveUp(forward)
 
         # construct quaternion
         quaternion = math.lookRotation(up, forward)
@@ -217,16 +399,35 @@ class SplineIK(Settings):
             math.degrees(euler.z),
         ]
 
+        return rot
+
+    def __orientControl(self, offset):
+        # get position
+        pos = cmds.xform(offset, q=True, ws=True, t=True)
+
         # set euler
-        cmds.xform(offset, ws=True, ro=rot)
+        cmds.xform(offset, ws=True, ro=self.__getOrientation(pos))
     
+    def __getControlOffset(self, ctrl):
+        # in offset parent matrix mode the control is its own offset
+        if self.offsetParentMatrix:
+            return ctrl
+
+        return cmds.listRelatives(ctrl, p=True, f=True)[0]
+
+    def __bakeControlOffset(self, ctrl):
+        # move the rest transform into the offset parent matrix
+        if self.offsetParentMatrix:
+            control.bakeOffsetParentMatrix(ctrl)
+
     def __createControl(self, cls, shape, clr, i=None, suffix=""):
         # create root control
         offset, ctrl = control.createControlShape(
             "{0}{1}".format(self.name, suffix),
             shape,
             clr,
-            i
+            i,
+            offset=not self.offsetParentMatrix
         )
         
         # position control
@@ -291,7 +492,8 @@ class SplineIK(Settings):
         rootOffset, root = control.createControlShape(
             "{0}_root".format(self.name),
             self.rootControlShape,
-            self.rootControlColour
+            self.rootControlColour,
+            offset=not self.offsetParentMatrix
         )
 
         # position root control
@@ -301,6 +503,8 @@ class SplineIK(Settings):
         # orient root controls
         if self.orientRootToCurve:
             self.__orientControl(rootOffset)
+
+        self.__bakeControlOffset(root)
         
         # create controls
         controls = []
@@ -336,19 +540,23 @@ class SplineIK(Settings):
             if self.orientToCurve:
                 self.__orientControl(ctrlOffset)
                 
-            # create read group
-            grp = cmds.group(
-                world=True,
-                empty=True,
-                n="{0}_read_{1:03d}".format(self.name, i+1)
-            )
-            
+            # create read group, in offset parent matrix mode the read
+            # matrix is calculated without a transform
             pos = cluster.getClusterPosition(cls)
-            cmds.setAttr("{0}.translate".format(grp), *pos)
-            
+            if self.offsetParentMatrix:
+                self.__createReadMatrix(ctrl, pos, i)
+            else:
+                grp = cmds.group(
+                    world=True,
+                    empty=True,
+                    n="{0}_read_{1:03d}".format(self.name, i+1)
+                )
+                cmds.setAttr("{0}.translate".format(grp), *pos)
+                cmds.parent(grp, ctrl)
+
             # parent control
-            cmds.parent(grp, ctrl)
-            cmds.parent(ctrlOffset, root)  
+            cmds.parent(ctrlOffset, root)
+            self.__bakeControlOffset(ctrl)
 
             # create tangent controls
             for side, j, rot in zip(["a", "b"], [before, after], [180, 0]):
@@ -369,6 +577,7 @@ class SplineIK(Settings):
                 # rotate tangent control
                 rotate = [a*rot for a in self.aimVector]
                 cmds.setAttr("{0}.rotate".format(tCtrlOffset), *rotate)
+                self.__bakeControlOffset(tCtrl)
                 
                 # add to list
                 tangentControls.append(tCtrl)
@@ -377,21 +586,171 @@ class SplineIK(Settings):
         
     # ------------------------------------------------------------------------
 
-    def __getParameters(self):
+    def __setReadMatrix(self, mm, ctrl, pos):
+        # the read matrix holds the world matrix of the control without
+        # its rest orientation, the same as the read group would
+        translate = math.listToMatrix(
+            [1, 0, 0, 0, 0, 1, 0, 0, 0, 0, 1, 0] + list(pos) + [1]
+        )
+        inverse = math.listToMatrix(
+            cmds.getAttr("{0}.worldInverseMatrix[0]".format(ctrl))
+        )
+
+        cmds.setAttr(
+            "{0}.matrixIn[0]".format(mm),
+            math.matrixToList(translate * inverse),
+            type="matrix"
+        )
+
+    def __createReadMatrix(self, ctrl, pos, i):
+        mm = cmds.createNode(
+            "multMatrix",
+            n="{0}_read_mm_{1:03d}".format(self.name, i+1)
+        )
+
+        self.__setReadMatrix(mm, ctrl, pos)
+        cmds.connectAttr(
+            "{0}.worldMatrix[0]".format(ctrl),
+            "{0}.matrixIn[1]".format(mm)
+        )
+
+        return mm
+
+    def __getReadNode(self, ctrl):
+        # get read matrix
+        if self.offsetParentMatrix:
+            return [
+                node
+                for node in cmds.listConnections(
+                    "{0}.worldMatrix[0]".format(ctrl),
+                    source=False,
+                    destination=True,
+                    type="multMatrix"
+                ) or []
+                if node.count("_read_")
+            ][0]
+
+        # get read group
+        children = cmds.listRelatives(ctrl, c=True, f=True)
+        return [c for c in children if c.count("_read_")][0]
+
+    def __getReadPlug(self, ctrl):
+        if self.offsetParentMatrix:
+            return "{0}.matrixSum".format(self.__getReadNode(ctrl))
+
+        return "{0}.worldMatrix[0]".format(self.__getReadNode(ctrl))
+
+    # ------------------------------------------------------------------------
+
+    def __rebindControl(self, offset, cls, orient):
+        # position control
+        pos = cluster.getClusterPosition(cls)
+        cmds.xform(offset, ws=True, t=pos)
+
+        # orient control
+        if orient:
+            self.__orientControl(offset)
+        else:
+            cmds.xform(offset, ws=True, ro=[0, 0, 0])
+
+        self.__bakeControlOffset(offset)
+
+        return pos
+
+    def __rebindControls(self):
+        # position root control
+        rootOffset = self.__getControlOffset(self.rootControl)
+        self.__rebindControl(
+            rootOffset,
+            self.controlClusters[0],
+            self.orientRootToCurve
+        )
+
+        # position controls
+        tangentControls = iter(self.tangentControls)
+        for i, (cls, ctrl) in enumerate(
+            zip(self.controlClusters, self.controls)
+        ):
+            # position control
+            ctrlOffset = self.__getControlOffset(ctrl)
+            pos = self.__rebindControl(ctrlOffset, cls, self.orientToCurve)
+
+            # position read group, the read group has no world rotation
+            # the same as when it is created, otherwise it inherits the
+            # difference in orientation of the control
+            read = self.__getReadNode(ctrl)
+            if self.offsetParentMatrix:
+                self.__setReadMatrix(read, ctrl, pos)
+            else:
+                cmds.xform(read, ws=True, t=pos, ro=[0, 0, 0])
+
+            # parent cluster
+            cmds.parent(cls, ctrl)
+
+            # position tangent controls, in the same order as created
+            for j in [i*3-1, i*3+1]:
+                if j <= 0 or j >= len(self.clusters):
+                    continue
+
+                tCtrl = next(tangentControls)
+                tCtrlOffset = self.__getControlOffset(tCtrl)
+
+                pos = cluster.getClusterPosition(self.clusters[j])
+                cmds.xform(tCtrlOffset, ws=True, t=pos)
+                self.__bakeControlOffset(tCtrlOffset)
+                cmds.parent(self.clusters[j], tCtrl)
+
+    # ------------------------------------------------------------------------
+
+    def __getParameters(self, numControls=None):
         # cluster parameters
-        num = len(self.controlClusters)
+        num = numControls or len(self.controlClusters)
         p1 = curve.splitCurveToParametersByParameter(
             self.curveShape, 
             num
         )
 
         # locator parameters
-        p2 = curve.splitCurveToParametersByLength(
+        p2 = self.__getJointParameters()
+
+        return p1, p2
+
+    def __getJointParameters(self):
+        if self._drivenJoints:
+            return self.__getDrivenJointParameters()
+        elif self.jointDistribution == "curvature":
+            return curve.splitCurveToParametersByCurvature(
+                self.curveShape,
+                self.numJoints,
+                self.curvatureBias
+            )
+
+        return curve.splitCurveToParametersByLength(
             self.curveShape,
             self.numJoints
         )
 
-        return p1, p2
+    def __getDrivenJointParameters(self):
+        # get closest parameters of the driven joints
+        parameters = []
+        for jnt in self._drivenJoints:
+            pos = cmds.xform(jnt, q=True, ws=True, t=True)
+            parameter, _ = curve.nearestPointOnCurve(self.curveShape, pos)
+            parameters.append(parameter)
+
+        # normalize
+        factor = curve.parameterLength(self.curveShape)
+        parameters = [min(max(p / factor, 0), 1) for p in parameters]
+        parameters[0] = 0
+        parameters[-1] = 1
+
+        return parameters
+
+    def __getDistributionBias(self):
+        if self.jointDistribution == "curvature":
+            return self.curvatureBias
+
+        return 0
 
     def __getWeighting(self):
         return math.remapWeighting(
@@ -401,279 +760,682 @@ class SplineIK(Settings):
         
     # ------------------------------------------------------------------------
         
-    def __createUpVectors(self):
-        # variables
-        ups = []
-        blends = []
-
-        # loop weights
-        for i, weight in enumerate(self.weights):
-            # create blend matrix
-            bm = cmds.createNode(
-                "wtAddMatrix",
-                n="{0}_bm_{1:03d}".format(self.name, i+1)
+    def __connectUpVectorWeights(self, bm, weight):
+        # remove existing weights
+        indices = cmds.getAttr("{0}.wtMatrix".format(bm), multiIndices=True)
+        for index in indices or []:
+            cmds.removeMultiInstance(
+                "{0}.wtMatrix[{1}]".format(bm, index),
+                b=True
             )
-            
-            # blend cluster weights
-            for j, k in enumerate(weight.keys()):
-                # get control
-                control = self.controls[k]
-
-                # get read group
-                children = cmds.listRelatives(control, c=True, f=True)
-                group = [c for c in children if c.count("_read_")][0]
-                
-                # set blend weight
-                cmds.setAttr(
-                    "{0}.wtMatrix[{1}].weightIn".format(bm, j), 
-                    weight[k]
-                )
-                
-                # connect to control
-                cmds.connectAttr(
-                    "{0}.worldMatrix[0]".format(group), 
-                    "{0}.wtMatrix[{1}].matrixIn".format(bm, j)
-                )
 
-            # multiply up vector
-            pmm = cmds.createNode(
-                "pointMatrixMult",
-                n="{0}_up_pmm_{1:03d}".format(self.name, i+1)
-            )
+        # blend cluster weights
+        for j, k in enumerate(weight.keys()):
+            # get read plug
+            plug = self.__getReadPlug(self.controls[k])
             
-            cmds.setAttr("{0}.vectorMultiply".format(pmm), 1)
-            cmds.setAttr("{0}.inPoint{1}".format(pmm, self.upDirection.upper()), 100)
-            cmds.connectAttr(
-                "{0}.matrixSum".format(bm),
-                "{0}.inMatrix".format(pmm),
-            )
-
-            # decompose blend matrix
-            dm = cmds.createNode(
-                "decomposeMatrix",
-                n="{0}_up_dm_{1:03d}".format(self.name, i+1)
+            # set blend weight
+            cmds.setAttr(
+                "{0}.wtMatrix[{1}].weightIn".format(bm, j),
+                weight[k]
             )
             
+            # connect to control
             cmds.connectAttr(
-                "{0}.matrixSum".format(bm),
-                "{0}.inputMatrix".format(dm),
+                plug,
+                "{0}.wtMatrix[{1}].matrixIn".format(bm, j)
             )
 
-            # add up with blend
-            pma = cmds.createNode(
-                "plusMinusAverage",
-                n="{0}_up_pma_{1:03d}".format(self.name, i+1)
-            )
-            
-            cmds.connectAttr(
-                "{0}.output".format(pmm),
-                "{0}.input3D[0]".format(pma),
-            )
-            
-            cmds.connectAttr(
-                "{0}.outputTranslate".format(dm),
-                "{0}.input3D[1]".format(pma),
-            )
-            
-            # store nodes
-            blends.append(bm)
-            ups.append(pma)
+    def __createUpVector(self, i):
+        # create blend matrix
+        bm = cmds.createNode(
+            "wtAddMatrix",
+            n="{0}_bm_{1:03d}".format(self.name, i+1)
+        )
+        
+        # blend cluster weights
+        self.__connectUpVectorWeights(bm, self.weights[i])
 
-        return blends, ups
+        # multiply up vector
+        pmm = cmds.createNode(
+            "pointMatrixMult",
+            n="{0}_up_pmm_{1:03d}".format(self.name, i+1)
+        )
         
-    # ------------------------------------------------------------------------
+        cmds.setAttr("{0}.vectorMultiply".format(pmm), 1)
+        cmds.setAttr("{0}.inPoint{1}".format(pmm, self.upDirection.upper()), 100)
+        cmds.connectAttr(
+            "{0}.matrixSum".format(bm),
+            "{0}.inMatrix".format(pmm),
+        )
+
+        # decompose blend matrix
+        dm = cmds.createNode(
+            "decomposeMatrix",
+            n="{0}_up_dm_{1:03d}".format(self.name, i+1)
+        )
         
-    def __createPointOnCurves(self):
-        pocs = []
-        aims = []
+        cmds.connectAttr(
+            "{0}.matrixSum".format(bm),
+            "{0}.inputMatrix".format(dm),
+        )
 
-        for i, parameter in enumerate(self.jParameters):
-            # create follicle
-            loc, poc, aim = curve.createFollicle(
-                "{0}_{1:03d}".format(self.name, i + 1),
-                self.curve,
-                parameter=parameter,
-                upDirection=self.upDirection,
-                forwardDirection=self.forwardDirection,
-                overrideNormal="{0}.output3D".format(self.ups[i]),
-                subtractPositionFromNormal=True
-            )
+        # add up with blend
+        pma = cmds.createNode(
+            "plusMinusAverage",
+            n="{0}_up_pma_{1:03d}".format(self.name, i+1)
+        )
+        
+        cmds.connectAttr(
+            "{0}.output".format(pmm),
+            "{0}.input3D[0]".format(pma),
+        )
+        
+        cmds.connectAttr(
+            "{0}.outputTranslate".format(dm),
+            "{0}.input3D[1]".format(pma),
+        )
 
-            aims.append(aim)
-            pocs.append(poc)
+        return bm, pma
 
-            cmds.parent(aim, world=True)
+    # ------------------------------------------------------------------------
 
-            # remove locator, will be replaced with joint later
-            cmds.delete(loc)
+    def __createTwistReference(self):
+        # the reference up vector is the up axis of the root control
+        # without its rest orientation, at rest it is the same as the up
+        # axis of the read matrices of the controls
+        mm = cmds.createNode(
+            "multMatrix",
+            n="{0}_twist_ref_mm".format(self.name)
+        )
 
-        return pocs, aims
-        
-    # ------------------------------------------------------------------------
-        
-    def __createJoints(self):
+        pos = cmds.xform(self.rootControl, q=True, ws=True, t=True)
+        self.__setReadMatrix(mm, self.rootControl, pos)
+        cmds.connectAttr(
+            "{0}.worldMatrix[0]".format(self.rootControl),
+            "{0}.matrixIn[1]".format(mm)
+        )
+
+        vp = cmds.createNode(
+            "vectorProduct",
+            n="{0}_twist_ref_vp".format(self.name)
+        )
+
+        cmds.setAttr("{0}.operation".format(vp), 3)
+        cmds.setAttr("{0}.input1".format(vp), *self.upVector)
+        cmds.setAttr("{0}.normalizeOutput".format(vp), 1)
+        cmds.connectAttr(
+            "{0}.matrixSum".format(mm),
+            "{0}.matrix".format(vp)
+        )
+
+        return mm, "{0}.output".format(vp)
+
+    def __createTwist(self, k):
         # variables
-        joints = []
-        
-        # clear selection
-        cmds.select(clear=True)
+        name = "{0}_twist_{{0}}_{1:03d}".format(self.name, k + 1)
 
-        # create root joint
-        root = cmds.joint(n="{0}_root_jnt".format(self.name))
-        cmds.setAttr("{0}.drawStyle".format(root), 2)
+        # get tangent at the control, when evaluated per span the span
+        # curve the control lies on is used
+        crv, parameter = self.__getCurveInput(self.cParameters[k])
+        poc = cmds.createNode("pointOnCurveInfo", n=name.format("poc"))
+        tangent = "{0}.normalizedTangent".format(poc)
 
-        # position root joint
-        pos = cmds.getAttr("{0}.result.position".format(self.pointOnCurves[0]))
-        cmds.setAttr("{0}.translate".format(root), *pos[0])
+        cmds.setAttr("{0}.turnOnPercentage".format(poc), 1)
+        cmds.setAttr("{0}.parameter".format(poc), parameter)
+        cmds.connectAttr(
+            "{0}.worldSpace".format(crv),
+            "{0}.inputCurve".format(poc)
+        )
 
-        # create curve joints
-        for i, _ in enumerate(self.pointOnCurves):
-            cmds.select(root)
+        # get up vector of the control
+        up = cmds.createNode("vectorProduct", n=name.format("up_vp"))
 
-            jnt = cmds.joint(n="{0}_jnt_{1:03d}".format(self.name, i + 1))
-            #cmds.setAttr("{0}.displayLocalAxis".format(jnt), 1)
-            cmds.setAttr("{0}.inheritsTransform".format(jnt), 0)
-            cmds.setAttr("{0}.segmentScaleCompensate".format(jnt), 0)
-            cmds.setAttr("{0}.radius".format(jnt), 0.1)
+        cmds.setAttr("{0}.operation".format(up), 3)
+        cmds.setAttr("{0}.input1".format(up), *self.upVector)
+        cmds.connectAttr(
+            self.__getReadPlug(self.controls[k]),
+            "{0}.matrix".format(up)
+        )
 
-            joints.append(jnt)
-            
-        return root, joints
-        
-    # ------------------------------------------------------------------------
-        
-    def __connectTranslateJoints(self):
-        # connect translate of joint
-        for poc, jnt in zip(self.pointOnCurves, self.joints):
-            cmds.connectAttr(
-                "{0}.result.position".format(poc), 
-                "{0}.translate".format(jnt)
+        # cross the up vectors with the tangent, the result is
+        # perpendicular to the up vectors projected onto the plane of the
+        # tangent which means the angle between them is the same
+        vectors = []
+        for suffix, source in [
+            ("ref", self._twistReference),
+            ("ctrl", "{0}.output".format(up))
+        ]:
+            vp = cmds.createNode(
+                "vectorProduct",
+                n=name.format("{0}_vp".format(suffix))
             )
 
-    def __connectRotateJoints(self):
-        # connect rotation of joint
-        for aim, jnt in zip(self.aimOnCurves, self.joints):
-            cmds.parent(aim, jnt)
-            cmds.connectAttr(
-                "{0}.constraintRotate".format(aim), 
-                "{0}.rotate".format(jnt)
-            )
-            
-    def __scaleConstraintJoints(self):
-        # variable
-        constraints = []
-        
-        # loop clusters
-        for i, weight in enumerate(self.weights):
-            # get cluster drivers
-            drivers = [self.controlClusters[k] for k, v in weight.iteritems()]
-
-            # constraint grp to clusters
-            c = cmds.scaleConstraint(
-                drivers, 
-                self.joints[i],
-                n="{0}_scale_{1:03d}".format(self.name, i+1),
-                mo=False
-            )[0]
-
-            # set weighting
-            aliases = cmds.scaleConstraint(
-                c, 
-                query=True, 
-                weightAliasList=True
-            )
-            aliasesData = [
-                (aliases[i], weight.values()[i]) 
-                for i in range(len(weight.keys()))
-            ]
+            cmds.setAttr("{0}.operation".format(vp), 2)
+            cmds.connectAttr(tangent, "{0}.input1".format(vp))
+            cmds.connectAttr(source, "{0}.input2".format(vp))
+            vectors.append("{0}.output".format(vp))
+
+        # get signed angle, the axis of the angle points along or against
+        # the tangent
+        ab = cmds.createNode("angleBetween", n=name.format("ab"))
+        cmds.connectAttr(vectors[0], "{0}.vector1".format(ab))
+        cmds.connectAttr(vectors[1], "{0}.vector2".format(ab))
+
+        sign = cmds.createNode("vectorProduct", n=name.format("sign_vp"))
+        cmds.setAttr("{0}.operation".format(sign), 1)
+        cmds.setAttr("{0}.normalizeOutput".format(sign), 1)
+        cmds.connectAttr("{0}.axis".format(ab), "{0}.input1".format(sign))
+        cmds.connectAttr(tangent, "{0}.input2".format(sign))
+
+        mdl = cmds.createNode("multDoubleLinear", n=name.format("mdl"))
+        cmds.connectAttr("{0}.angle".format(ab), "{0}.input1".format(mdl))
+        cmds.connectAttr(
+            "{0}.outputX".format(sign),
+            "{0}.input2".format(mdl)
+        )
 
-            # set scale constraint
-            for attr, value in aliasesData:
-                cmds.setAttr("{0}.{1}".format(c, attr), value)
+        return poc, "{0}.output".format(mdl)
+
+    def __updateTwists(self):
+        # update the rest orientation of the reference and the parameters
+        # of the controls
+        pos = cmds.xform(self.rootControl, q=True, ws=True, t=True)
+        self.__setReadMatrix(self._twistReferenceMatrix, self.rootControl, pos)
+
+        for poc, parameter in zip(self._twistPointOnCurves, self.cParameters):
+            self.__setPointOnCurveParameter(poc, parameter)
+
+    def __connectTwistWeights(self, bw, weight):
+        # remove existing weights
+        indices = cmds.getAttr("{0}.input".format(bw), multiIndices=True)
+        for index in indices or []:
+            for attr in ["input", "weight"]:
+                cmds.removeMultiInstance(
+                    "{0}.{1}[{2}]".format(bw, attr, index),
+                    b=True
+                )
 
-            constraints.append(c)
+        # blend control twists
+        for j, k in enumerate(weight.keys()):
+            cmds.setAttr("{0}.weight[{1}]".format(bw, j), weight[k])
+            cmds.connectAttr(self.twists[k], "{0}.input[{1}]".format(bw, j))
 
-        return constraints
-            
-    # ------------------------------------------------------------------------
-        
-    def __connectJoints(self):
-        # constraint root
-        cmds.parentConstraint(self.rootControl, self.rootJoint, mo=False)
-        cmds.scaleConstraint(self.rootControl, self.rootJoint, mo=False)
-
-        # constraint joints
-        self.__connectTranslateJoints()
-        self.__connectRotateJoints()
+    def __createTwistBlend(self, i):
+        bw = cmds.createNode(
+            "blendWeighted",
+            n="{0}_twist_bw_{1:03d}".format(self.name, i + 1)
+        )
 
-        return self.__scaleConstraintJoints()
+        self.__connectTwistWeights(bw, self.weights[i])
+        return bw
         
     # ------------------------------------------------------------------------
         
-    def __createScaleReaders(self):
-        readers = []
+    def __createSpanCurve(self, i):
+        # variables
+        clusters = self.clusters[i * 3:i * 3 + 4]
+        points = [cluster.getClusterPosition(cls) for cls in clusters]
+
+        # create span curve, a span of a bezier curve is a cubic curve
+        # with the four control points of the span
+        crv = cmds.curve(
+            degree=3,
+            point=points,
+            knot=[0, 0, 0, 1, 1, 1],
+            n="{0}_span_crv_{1:03d}".format(self.name, i + 1)
+        )
+        shape = cmds.listRelatives(crv, s=True, f=True)[0]
+        shape = cmds.rename(shape, "{0}Shape".format(crv))
 
-        # get root offset position
-        rootPos = cmds.getAttr("{0}.translate".format(self.rootJoint))[0]
+        cmds.setAttr("{0}.inheritsTransform".format(crv), 0)
+        cmds.setAttr("{0}.visibility".format(crv), 0)
+        cmds.parent(crv, self.rootControl, relative=True)
 
-        # loop locators
-        for i, poc in enumerate(self.pointOnCurves):
-            # multiply up vector
+        # drive control points with the clusters, the clusters are in
+        # world space which means the rest position can be multiplied
+        # with the world matrix of the cluster
+        for j, cls in enumerate(clusters):
             pmm = cmds.createNode(
                 "pointMatrixMult",
-                n="{0}_scale_pmm_{1:03d}".format(self.name, i+1)
+                n="{0}_span_pmm_{1}_{2:03d}".format(self.name, j, i + 1)
             )
-            
-            locPos = cmds.getAttr("{0}.result.position".format(poc))[0]
-            pos = [
-                locPos[0] - rootPos[0],
-                locPos[1] - rootPos[1],
-                locPos[2] - rootPos[2],
-            ]
 
-            cmds.setAttr("{0}.inPoint".format(pmm), *pos)
+            cmds.setAttr("{0}.inPoint".format(pmm), *points[j])
+            cmds.connectAttr(
+                "{0}.worldMatrix[0]".format(cls),
+                "{0}.inMatrix".format(pmm)
+            )
             cmds.connectAttr(
-                "{0}.worldMatrix[0]".format(self.rootJoint), 
-                "{0}.inMatrix".format(pmm), 
+                "{0}.output".format(pmm),
+                "{0}.controlPoints[{1}]".format(shape, j)
             )
 
-            readers.append(pmm)
-        
-        return readers
+        return shape
+
+    def __createSpanCurves(self):
+        self._spanKnots = curve.getSpanKnots(self.curveShape)
+        return [
+            self.__createSpanCurve(i)
+            for i in range(len(self.controlClusters) - 1)
+        ]
+
+    def __updateSpanCurves(self):
+        # update the rest positions and reconnect the clusters, the
+        # clusters are recreated when the curve is rebound
+        self._spanKnots = curve.getSpanKnots(self.curveShape)
+        for i in range(len(self._spanCurves)):
+            clusters = self.clusters[i * 3:i * 3 + 4]
+            for j, cls in enumerate(clusters):
+                pmm = "{0}_span_pmm_{1}_{2:03d}".format(self.name, j, i + 1)
+                cmds.setAttr(
+                    "{0}.inPoint".format(pmm),
+                    *cluster.getClusterPosition(cls)
+                )
+                cmds.connectAttr(
+                    "{0}.worldMatrix[0]".format(cls),
+                    "{0}.inMatrix".format(pmm),
+                    force=True
+                )
+
+    def __getCurveInput(self, parameter):
+        # get curve and parameter to evaluate, when evaluated per span
+        # the span curve the parameter lies in is used
+        if not self.spanEvaluation:
+            return self.curve, parameter
+
+        span, parameter = curve.splitParametersToSpans(
+            [parameter],
+            self._spanKnots
+        )[0]
+
+        return self._spanCurves[span], parameter
+
+    def __setPointOnCurveParameter(self, poc, parameter):
+        crv, parameter = self.__getCurveInput(parameter)
+        cmds.setAttr("{0}.parameter".format(poc), parameter)
+
+        # connect span curve when the parameter moved to another span
+        source = "{0}.worldSpace[0]".format(crv)
+        destination = "{0}.inputCurve".format(poc)
+        if self.spanEvaluation and not cmds.isConnected(source, destination):
+            cmds.connectAttr(source, destination, force=True)
+
+    def __createPointOnCurve(self, i):
+        # get curve input
+        crv, parameter = self.__getCurveInput(self.jParameters[i])
+
+        # get up vector, when blending twist the reference is used as up
+        # vector which is already a direction
+        normal = self._twistReference
+        if not self.twistBlending:
+            normal = "{0}.output3D".format(self.ups[i])
+
+        # create follicle
+        loc, poc, aim = curve.createFollicle(
+            "{0}_{1:03d}".format(self.name, i + 1),
+            crv,
+            parameter=parameter,
+            upDirection=self.upDirection,
+            forwardDirection=self.forwardDirection,
+            overrideNormal=normal,
+            subtractPositionFromNormal=not self.twistBlending
+        )
+
+        cmds.parent(aim, world=True)
+
+        # twist around the aim vector, the offset is applied after aiming
+        if self.twistBlending:
+            cmds.connectAttr(
+                "{0}.output".format(self.blends[i]),
+                "{0}.offset{1}".format(aim, self.forwardDirection.upper())
+            )
+
+        # remove locator, will be replaced with joint later
+        cmds.delete(loc)
+
+        return poc, aim
         
     # ------------------------------------------------------------------------
-    
-    def __createDistanceBetween(self, nodes, suffix, attr):
-        num = len(nodes)
-        distances = []
-
-        for i in range(num-1):
-            # create node
-            db = cmds.createNode(
-                "distanceBetween",
-                n="{0}_scale_{1}_db_{2:03d}".format(
-                    self.name,
-                    suffix,
-                    i
-                )
+
+    def __createRootJoint(self):
+        # clear selection
+        cmds.select(clear=True)
+
+        # create root joint, when the output is matrices a transform
+        # takes the place of the root joint
+        if self.output == "matrices":
+            root = cmds.createNode(
+                "transform",
+                n="{0}_root_grp".format(self.name)
             )
+        else:
+            root = cmds.joint(n="{0}_root_jnt".format(self.name))
+            cmds.setAttr("{0}.drawStyle".format(root), 2)
+
+        # position root joint
+        pos = cmds.pointOnCurve(
+            self.curveShape,
+            parameter=self.jParameters[0],
+            turnOnPercentage=True,
+            position=True
+        )
+        cmds.setAttr("{0}.translate".format(root), *pos)
 
-            # connect input
+        # constraint root, in offset parent matrix mode the root control
+        # drives the root joint directly
+        if self.offsetParentMatrix:
+            cmds.setAttr("{0}.translate".format(root), 0, 0, 0)
             cmds.connectAttr(
-                "{0}.{1}".format(nodes[i], attr),
-                "{0}.point1".format(db)
+                "{0}.worldMatrix[0]".format(self.rootControl),
+                "{0}.offsetParentMatrix".format(root)
             )
-            cmds.connectAttr(
-                "{0}.{1}".format(nodes[i + 1], attr),
-                "{0}.point2".format(db)
+        else:
+            cmds.parentConstraint(self.rootControl, root, mo=False)
+            cmds.scaleConstraint(self.rootControl, root, mo=False)
+
+        return root
+        
+    def __createJoint(self, i):
+        # reuse driven joints, the joints are parented to the root joint
+        # as the joints are driven in world space.
+        if self._drivenJoints:
+            jnt = cmds.parent(self._drivenJoints[i], self.rootJoint)[0]
+            cmds.setAttr("{0}.inheritsTransform".format(jnt), 0)
+            cmds.setAttr("{0}.segmentScaleCompensate".format(jnt), 0)
+            cmds.setAttr("{0}.jointOrient".format(jnt), 0, 0, 0)
+
+            return jnt
+
+        # create curve joint
+        cmds.select(self.rootJoint)
+
+        jnt = cmds.joint(n="{0}_jnt_{1:03d}".format(self.name, i + 1))
+        #cmds.setAttr("{0}.displayLocalAxis".format(jnt), 1)
+        cmds.setAttr("{0}.inheritsTransform".format(jnt), 0)
+        cmds.setAttr("{0}.segmentScaleCompensate".format(jnt), 0)
+        cmds.setAttr("{0}.radius".format(jnt), 0.1)
+
+        return jnt
+        
+    # ------------------------------------------------------------------------
+        
+    def __connectJoint(self, i):
+        # variables
+        poc = self.pointOnCurves[i]
+        aim = self.aimOnCurves[i]
+        jnt = self.joints[i]
+
+        # connect translate of joint
+        cmds.connectAttr(
+            "{0}.result.position".format(poc),
+            "{0}.translate".format(jnt)
+        )
+
+        # connect rotation of joint
+        cmds.parent(aim, jnt)
+        cmds.connectAttr(
+            "{0}.constraintRotate".format(aim),
+            "{0}.rotate".format(jnt)
+        )
+
+        return self.__createScaleConstraint(i, jnt)
+
+    def __createMatrixOutput(self, i):
+        # variables
+        poc = self.pointOnCurves[i]
+        aim = self.aimOnCurves[i]
+
+        # parent aim constraint to the root, the aim constraint takes the
+        # place of the joint, this makes its scale constraint output the
+        # same scale as the joint would have
+        aim = cmds.parent(aim, self.rootJoint)[0]
+        cmds.setAttr("{0}.inheritsTransform".format(aim), 0)
+        self.aimOnCurves[i] = aim
+
+        # compose world matrix, the joints don't inherit transforms which
+        # means their world matrix is their local matrix
+        cm = cmds.createNode(
+            "composeMatrix",
+            n="{0}_cm_{1:03d}".format(self.name, i + 1)
+        )
+
+        cmds.connectAttr(
+            "{0}.result.position".format(poc),
+            "{0}.inputTranslate".format(cm)
+        )
+        cmds.connectAttr(
+            "{0}.constraintRotate".format(aim),
+            "{0}.inputRotate".format(cm)
+        )
+
+        c = self.__createScaleConstraint(i, aim)
+        cmds.connectAttr(
+            "{0}.scale".format(aim),
+            "{0}.inputScale".format(cm)
+        )
+
+        return "{0}.outputMatrix".format(cm), c
+
+    def __getBindPreMatrices(self):
+        # the bind pre matrices are the inverse of the rest matrices
+        return [
+            math.matrixToList(
+                math.listToMatrix(cmds.getAttr(matrix)).inverse()
+            )
+            for matrix in self.matrices
+        ]
+
+    def __connectScaleConstraintWeights(self, c, weight):
+        # map weights to cluster drivers
+        values = {
+            self.controlClusters[k].split("|")[-1]: v
+            for k, v in weight.items()
+        }
+
+        # set weighting
+        aliases = cmds.scaleConstraint(
+            c,
+            query=True,
+            weightAliasList=True
+        )
+        targets = cmds.scaleConstraint(
+            c,
+            query=True,
+            targetList=True
+        )
+
+        # set scale constraint
+        for attr, target in zip(aliases, targets):
+            value = values.get(target.split("|")[-1], 0)
+            cmds.setAttr("{0}.{1}".format(c, attr), value)
+            
+    def __createScaleConstraint(self, i, node):
+        # get cluster drivers
+        weight = self.weights[i]
+        drivers = [self.controlClusters[k] for k in weight.keys()]
+
+        # constraint grp to clusters
+        c = cmds.scaleConstraint(
+            drivers,
+            node,
+            n="{0}_scale_{1:03d}".format(self.name, i+1),
+            mo=False
+        )[0]
+
+        # set weighting
+        self.__connectScaleConstraintWeights(c, weight)
+
+        return c
+
+    def __updateScaleConstraint(self, i):
+        # variables
+        c = self.scaleConstraints[i]
+        jnt = self.joints[i]
+
+        # get cluster drivers
+        weight = self.weights[i]
+        drivers = [self.controlClusters[k] for k in weight.keys()]
+        names = [d.split("|")[-1] for d in drivers]
+
+        # get existing drivers
+        targets = cmds.scaleConstraint(c, query=True, targetList=True) or []
+        existing = [t.split("|")[-1] for t in targets]
+
+        # add new targets before removing the old targets, removing all
+        # targets of a constraint will delete the constraint.
+        add = [d for d, n in zip(drivers, names) if n not in existing]
+        if add:
+            cmds.scaleConstraint(add, jnt, mo=False)
+
+        remove = [t for t, n in zip(targets, existing) if n not in names]
+        if remove:
+            cmds.scaleConstraint(remove, jnt, edit=True, remove=True)
+
+        # set weighting
+        self.__connectScaleConstraintWeights(c, weight)
+        
+    # ------------------------------------------------------------------------
+
+    def __getScaleReaderPoint(self, i):
+        # get root offset position
+        rootPos = cmds.getAttr("{0}.translate".format(self.rootJoint))[0]
+
+        # get locator position
+        poc = self.pointOnCurves[i]
+        locPos = cmds.getAttr("{0}.result.position".format(poc))[0]
+
+        return [
+            locPos[0] - rootPos[0],
+            locPos[1] - rootPos[1],
+            locPos[2] - rootPos[2],
+        ]
+        
+    def __createScaleReader(self, i):
+        # multiply up vector
+        pmm = cmds.createNode(
+            "pointMatrixMult",
+            n="{0}_scale_pmm_{1:03d}".format(self.name, i+1)
+        )
+
+        cmds.setAttr("{0}.inPoint".format(pmm), *self.__getScaleReaderPoint(i))
+        cmds.connectAttr(
+            "{0}.worldMatrix[0]".format(self.rootJoint),
+            "{0}.inMatrix".format(pmm),
+        )
+
+        # block when stretch and squash is disabled
+        nodeState.connectNodeState(self._scaleSwitch, [pmm])
+
+        return pmm
+        
+    # ------------------------------------------------------------------------
+
+    def __createJointSubnetwork(self, i):
+        # create up vector, when blending twist there is no up vector per
+        # joint
+        if self.twistBlending:
+            bm, up = self.__createTwistBlend(i), None
+        else:
+            bm, up = self.__createUpVector(i)
+
+        self.blends.append(bm)
+        self.ups.append(up)
+
+        # create point on curve
+        poc, aim = self.__createPointOnCurve(i)
+        self.pointOnCurves.append(poc)
+        self.aimOnCurves.append(aim)
+
+        # create matrix, the joints are skipped when the output is
+        # matrices
+        if self.output == "matrices":
+            matrix, c = self.__createMatrixOutput(i)
+            self._matrices.append(matrix)
+            self.scaleConstraints.append(c)
+        else:
+            self._joints.append(self.__createJoint(i))
+            self.scaleConstraints.append(self.__connectJoint(i))
+
+        # create scale reader
+        if self.stretchAndSquash:
+            self.scaleReaders.append(self.__createScaleReader(i))
+
+    def __addJoint(self, i):
+        with track.NodeTracker() as tracker:
+            self.__createJointSubnetwork(i)
+
+        self._jointNodes.append(tracker.nodes)
+
+    def __updateJoint(self, i, weight):
+        # update parameter
+        parameter = self.jParameters[i]
+        if i in self._slideNodes:
+            self.__setSlideParameter(i, parameter)
+        else:
+            self.__setPointOnCurveParameter(self.pointOnCurves[i], parameter)
+
+        # update weights
+        if weight != self.weights[i]:
+            if self.twistBlending:
+                self.__connectTwistWeights(self.blends[i], self.weights[i])
+            else:
+                self.__connectUpVectorWeights(
+                    self.blends[i],
+                    self.weights[i]
+                )
+
+            self.__updateScaleConstraint(i)
+
+        # update scale reader
+        if self.stretchAndSquash:
+            cmds.setAttr(
+                "{0}.inPoint".format(self.scaleReaders[i]),
+                *self.__getScaleReaderPoint(i)
+            )
+
+    def __removeJoint(self, i):
+        self.__deleteNodes(self._jointNodes.pop(i))
+
+        # remove from lists
+        for nodes in [
+            self.blends,
+            self.ups,
+            self.pointOnCurves,
+            self.aimOnCurves,
+            self._joints,
+            self.scaleConstraints,
+            self.scaleReaders
+        ]:
+            if len(nodes) > i:
+                nodes.pop(i)
+            
+    # ------------------------------------------------------------------------
+    
+    def __createDistanceBetween(self, nodes, suffix, attr, i):
+        # create node
+        db = cmds.createNode(
+            "distanceBetween",
+            n="{0}_scale_{1}_db_{2:03d}".format(
+                self.name,
+                suffix,
+                i
             )
+        )
 
-            # append attribute
-            distances.append("{0}.distance".format(db))
+        # connect input
+        cmds.connectAttr(
+            "{0}.{1}".format(nodes[i], attr),
+            "{0}.point1".format(db)
+        )
+        cmds.connectAttr(
+            "{0}.{1}".format(nodes[i + 1], attr),
+            "{0}.point2".format(db)
+        )
 
-        return distances
+        return "{0}.distance".format(db)
         
-    def __createDistanceBetweenConnection(self, base, scale, i):
+    def __createDistanceBetweenConnection(self, base, scale, multiplier, i):
         # get scale average from distances
         mult = cmds.createNode(
             "multiplyDivide",
@@ -706,10 +1468,7 @@ class SplineIK(Settings):
             "{0}.output".format(adl01),
             "{0}.input1".format(mdl)
         )
-        cmds.connectAttr(
-            "{0}.scale_multiplier".format(self.rootControl),
-            "{0}.input2".format(mdl)
-        )
+        cmds.connectAttr(multiplier, "{0}.input2".format(mdl))
 
         # bring value up by one
         adl02 = cmds.createNode(
@@ -742,24 +1501,64 @@ class SplineIK(Settings):
             "{0}.inputR".format(clamp)
         )
 
-        return "{0}.outputR".format(clamp)
-        
-    def __createDistanceBetweenConnections(self):
-        # connect scales
-        connections = []
-        indices = range(len(self.bDistances))
-
-        # loop distances
-        for i, base, scale in zip(indices, self.bDistances, self.sDistances):
-            connections.append(
-                self.__createDistanceBetweenConnection(
-                    base, scale, i+1
-                )
-            )
+        return "{0}.outputR".format(clamp), [mult, adl01]
+
+    def __createStretchSegment(self, i):
+        # create distance between nodes
+        base = self.__createDistanceBetween(
+            self.pointOnCurves, 
+            "base", 
+            "result.position",
+            i
+        )
+        scale = self.__createDistanceBetween(
+            self.scaleReaders, 
+            "scale", 
+            "output",
+            i
+        )
+
+        # create user input hierarchy
+        connection, nodes = self.__createDistanceBetweenConnection(
+            base, scale, self._scaleMultiplier, i+1
+        )
+
+        # block the expensive part of the network when disabled, the
+        # remaining nodes will output a static value of one as they no
+        # longer receive dirty messages from the blocked nodes.
+        nodes.extend([base.split(".")[0], scale.split(".")[0]])
+        nodeState.connectNodeState(self._scaleSwitch, nodes)
+
+        return connection
+
+    def __addStretchSegment(self, i):
+        with track.NodeTracker() as tracker:
+            self.scaleSegments.append(self.__createStretchSegment(i))
+
+        self._segmentNodes.append(tracker.nodes)
 
-        # duplicate last distance
-        connections.append(connections[-1])
-        return connections
+    def __removeStretchSegment(self, i):
+        self.__deleteNodes(self._segmentNodes.pop(i))
+        self.scaleSegments.pop(i)
+
+    def __connectStretchSegment(self, i):
+        # the last joint uses the segment of the previous joint
+        connection = self.scaleSegments[min(i, len(self.scaleSegments) - 1)]
+
+        # determine axis to scale
+        axis = ["X", "Y", "Z"]
+        axis.remove(self.forwardDirection.upper())
+
+        # connect to scale constraint
+        for a in axis:
+            cmds.connectAttr(
+                connection,
+                "{0}.offset{1}".format(
+                    self.scaleConstraints[i],
+                    a
+                ),
+                force=True
+            )
 
     # ------------------------------------------------------------------------
         
@@ -777,36 +1576,41 @@ class SplineIK(Settings):
         attribute.addAttr(
             self.rootControl, "scale_clamp_max", defaultValue=2, minValue=0
         )
-        
-        # create distance between nodes
-        self.bDistances = self.__createDistanceBetween(
-            self.pointOnCurves, 
-            "base", 
-            "result.position"
+        attribute.addAttr(
+            self.rootControl, "scale_enable", at="bool", defaultValue=1
         )
-        self.sDistances = self.__createDistanceBetween(
-            self.scaleReaders, 
-            "scale", 
-            "output"
+
+        # multiply user value with enable state, when disabled the output
+        # of the stretch network will always be one
+        mdl = cmds.createNode(
+            "multDoubleLinear",
+            n="{0}_scale_enable_mdl".format(self.name)
         )
 
-        # create user input hierarchy
-        connections = self.__createDistanceBetweenConnections()
+        cmds.connectAttr(
+            "{0}.scale_multiplier".format(self.rootControl),
+            "{0}.input1".format(mdl)
+        )
+        cmds.connectAttr(
+            "{0}.scale_enable".format(self.rootControl),
+            "{0}.input2".format(mdl)
+        )
 
-        # determine axis to scale
-        axis = ["X", "Y", "Z"]
-        axis.remove(self.forwardDirection.upper())
+        self._scaleMultiplier = "{0}.output".format(mdl)
 
-        # connect to scale constraint
-        for i, connection in enumerate(connections):
-            for a in axis:
-                cmds.connectAttr(
-                    connection,
-                    "{0}.offset{1}".format(
-                        self.scaleConstraints[i],
-                        a
-                    )
-                )
+        # create switch
+        self._scaleSwitch = nodeState.createNodeStateSwitch(
+            "{0}_scale_enable_cd".format(self.name),
+            "{0}.scale_enable".format(self.rootControl),
+            state=self._lodSwitch
+        )
+
+    # ------------------------------------------------------------------------
+
+    def __deleteNodes(self, nodes):
+        nodes = [n for n in nodes if cmds.objExists(n)]
+        if nodes:
+            cmds.delete(nodes)
 
     # ------------------------------------------------------------------------
     
@@ -823,7 +1627,8 @@ class SplineIK(Settings):
                 self.slideControlColour
             )
             
-            # scale constraint
+            # scale constraint, the offsets don't inherit the transform of
+            # the root control once attached to the motion path
             cmds.scaleConstraint(self.rootControl, ctrlOffset)
 
             # append to list
@@ -901,6 +1706,7 @@ class SplineIK(Settings):
         
     def __connectSlideControls(self):
         # variables
+        nodes = []
         clampAttributes = []
         motionPathAttributes = []
         
@@ -912,6 +1718,7 @@ class SplineIK(Settings):
         
         cmds.setAttr("{0}.input1".format(mdl), -1)
         cmds.connectAttr(self.shiftNorm, "{0}.input2".format(mdl))
+        nodes.append(mdl)
 
         # add to center
         attributes = ["shift", "shift_ctrl", "shift_min", "shift_max"]
@@ -963,6 +1770,7 @@ class SplineIK(Settings):
 
             clampAttributes.append("{0}.outputR".format(clamp))
             motionPathAttributes.append("{0}.output".format(mdl))
+            nodes.extend([adl, clamp, mdl])
 
         # get motion path attributes
         clamp, clampCtrl, clampMin, clampMax = motionPathAttributes
@@ -974,13 +1782,13 @@ class SplineIK(Settings):
 
         # get clamp attributes
         clamp, clampCtrl, clampMin, clampMax = clampAttributes
-        return clamp, clampMin, clampMax
+        return clamp, clampMin, clampMax, nodes
         
     # ------------------------------------------------------------------------
     
-    def __connectSlideToJoint(self, poc, i):
+    def __connectSlideToJoint(self, attr, i):
         # get parameter
-        parameter = cmds.getAttr("{0}.parameter".format(poc))
+        parameter = cmds.getAttr(attr)
 
         # create ramp node
         ramp = cmds.createNode(
@@ -1058,7 +1866,14 @@ class SplineIK(Settings):
             cmds.setAttr("{0}.colorIfTrueR".format(cd), 1)
             cmds.setAttr("{0}.colorIfFalseR".format(cd), 0)
 
-            conditions.append("{0}.outColorR".format(cd))
+            conditions.append(cd)
+
+        # connect enable state, when disabled the joint will always use
+        # its default parameter
+        cmds.connectAttr(
+            "{0}.slide_enable".format(self.rootControl),
+            "{0}.colorIfTrueR".format(conditions[0])
+        )
 
         # multiply output to see if value is between min and max parameter
         mdl = cmds.createNode(
@@ -1066,8 +1881,14 @@ class SplineIK(Settings):
             n="{0}_slide_mdl_{1:03d}".format(self.name, i)
         )
         
-        cmds.connectAttr(conditions[0], "{0}.input1".format(mdl))
-        cmds.connectAttr(conditions[1], "{0}.input2".format(mdl))
+        cmds.connectAttr(
+            "{0}.outColorR".format(conditions[0]),
+            "{0}.input1".format(mdl)
+        )
+        cmds.connectAttr(
+            "{0}.outColorR".format(conditions[1]),
+            "{0}.input2".format(mdl)
+        )
 
         # condition parameter to use ramped or default value
         cd = cmds.createNode(
@@ -1086,15 +1907,48 @@ class SplineIK(Settings):
             "{0}.colorIfFalseR".format(cd)
         )
 
-        # connect result to point on curve node
-        cmds.connectAttr(
-            "{0}.outColorR".format(cd), 
-            "{0}.parameter".format(poc)
-        )
+        # connect result to parameter
+        cmds.connectAttr("{0}.outColorR".format(cd), attr)
+
+        # store the attributes that hold the default parameter
+        parameters = [
+            "{0}.input2".format(adl),
+            "{0}.secondTerm".format(conditions[0]),
+            "{0}.secondTerm".format(conditions[1]),
+            "{0}.colorIfTrueR".format(cd),
+        ]
+
+        return [ramp, adl, conditions[1]], parameters
     
-    def __connectSlideToJoints(self):
-        for i, poc in enumerate(self.pointOnCurves[1:-1]):
-            self.__connectSlideToJoint(poc, i+1)
+    def __setSlideParameter(self, i, parameter):
+        # update the default parameter of the slide network
+        for attr in self._slideParameters[i]:
+            cmds.setAttr(attr, parameter)
+
+    def __getParameterAttr(self, i):
+        # the parameter of a deformer sample is stored on the deformer
+        if self.deformerNode:
+            return "{0}.sample[{1}].sampleParameter".format(
+                self.deformerNode,
+                i
+            )
+
+        return "{0}.parameter".format(self.pointOnCurves[i])
+
+    def __addSlideJoint(self, i):
+        with track.NodeTracker() as tracker:
+            nodes, parameters = self.__connectSlideToJoint(
+                self.__getParameterAttr(i),
+                i
+            )
+
+        nodeState.connectNodeState(self._slideJointSwitch, nodes)
+        self._slideNodes[i] = tracker.nodes
+        self._slideParameters[i] = parameters
+
+    def __removeSlideJoint(self, i):
+        self.__deleteNodes(self._slideNodes.pop(i))
+        self._slideParameters.pop(i)
     
     # ------------------------------------------------------------------------
     
@@ -1119,6 +1973,12 @@ class SplineIK(Settings):
         attribute.addAttr(
             self.slideControl, "slide_shift_max", dv=10, min=0, max=10
         )
+
+        # create enable attribute
+        attribute.addSpacerAttr(self.rootControl)
+        attribute.addAttr(
+            self.rootControl, "slide_enable", at="bool", defaultValue=1
+        )
         
         # attach to motionPath
         self.mp, \
@@ -1134,84 +1994,2743 @@ class SplineIK(Settings):
         # connect controls
         self.clamp, \
         self.clampMin, \
-        self.clampMax = self.__connectSlideControls()
+        self.clampMax, \
+        nodes = self.__connectSlideControls()
+
+        # block the slide network when disabled, the slide controls are
+        # hidden as they will no longer follow the curve
+        nodes.extend([self.mp, self.mpMin, self.mpMax])
+        nodes.extend([
+            n.split(".")[0]
+            for n in [
+                self.centerNorm,
+                self.shiftNorm,
+                self.shiftMinNorm,
+                self.shiftMaxNorm
+            ]
+        ])
+
+        self._slideSwitch = nodeState.createNodeStateSwitch(
+            "{0}_slide_enable_cd".format(self.name),
+            "{0}.slide_enable".format(self.rootControl)
+        )
+        nodeState.connectNodeState(self._slideSwitch, nodes)
+
+        for ctrl in [
+            self.slideControl,
+            self.slideMinControl,
+            self.slideMaxControl
+        ]:
+            offset = cmds.listRelatives(ctrl, p=True, f=True)[0]
+            cmds.connectAttr(
+                "{0}.slide_enable".format(self.rootControl),
+                "{0}.visibility".format(offset)
+            )
+
+    def __createSlideJoints(self):
+        # get switch, when a level of detail is used the switch is
+        # chained with the level of detail switch
+        self._slideJointSwitch = self._slideSwitch
+        if self._lodSwitch:
+            self._slideJointSwitch = nodeState.createNodeStateSwitch(
+                "{0}_slide_lod_cd".format(self.name),
+                "{0}.slide_enable".format(self.rootControl),
+                state=self._lodSwitch
+            )
+
+        # connect to parameters, the first and last joint are not able
+        # to slide
+        num = len(self.jParameters) - 2
+        for i in range(1, num + 1):
+            self.__addSlideJoint(i)
+            yield "slide", i / float(num)
 
-        # connect to locators
-        self.__connectSlideToJoints()
-        
     # ------------------------------------------------------------------------
-        
-    def create(
-            self, 
-            name,
-            curve_,
-            numJoints, 
-            upDirection="y", 
-            worldUpDirection="y", 
-            forwardDirection="x"
-        ):
-        """
-        Create the spline IK, besides changing attributes from the
-        Settings class, the create function itself can also be
-        parsed with various variables to customise the result.
-        
-        :param name: name that is used to prefix all nodes
-        :param curve_: curve to attach the Spline IK to.
-        :param numJoints: number of joints to be distributed on the curve
-        :param upDirection: "x", "y" or "z", default "y"
-        :param worldUpDirection: "x", "y" or "z", default "y"
-        :param forwardDirection: "x", "y" or "z", default "x"
-        """
-        # variables
-        self.name = name
-        self.curve = curve_
-        self.numJoints = numJoints
-        self.upDirection = upDirection
-        self.forwardDirection = forwardDirection
 
-        # vector variables
-        self.upVector = math.convertAxisToVector(upDirection)
-        self.aimVector = math.convertAxisToVector(forwardDirection)
-        self.worldUpVector = math.convertAxisToVector(worldUpDirection)
-        
-        # run the rest of the code in a single undo chunk
-        with undo.UndoChunkContext():
-            # convert curve to bezier curve
-            curve.convertToBezierCurve(self.curve)
-            
-            # create clusters
-            self.clusters = cluster.clusterCurve(self.curve, self.name)
-            self.controlClusters = self.clusters[::3]
-            
-            # create controls
-            self._rootControl, \
-            self._controls, \
-            self._tangentControls = self.__createControls()
-            
+    def __getCacheInputs(self):
+        # the cache is keyed on the world matrices of the controls and
+        # the attributes that drive the joint network
+        matrices = [
+            "{0}.worldMatrix[0]".format(ctrl)
+            for ctrl in [self.rootControl] +
+            self.controls +
+            self.tangentControls
+        ]
+
+        values = []
+        if self.stretchAndSquash:
+            values.extend(
+                "{0}.{1}".format(self.rootControl, attr)
+                for attr in [
+                    "scale_multiplier",
+                    "scale_clamp_min",
+                    "scale_clamp_max",
+                    "scale_enable"
+                ]
+            )
+        if self.slide:
+            values.append("{0}.slide_enable".format(self.rootControl))
+            values.extend(
+                "{0}.{1}".format(self.slideControl, attr)
+                for attr in [
+                    "slide_center",
+                    "slide_shift",
+                    "slide_shift_min",
+                    "slide_shift_max"
+                ]
+            )
+
+        return matrices, values
+
+    def __createCache(self):
+        matrices, values = self.__getCacheInputs()
+        return cache.createCache(
+            "{0}_cache".format(self.name),
+            self.joints,
+            matrices,
+            values,
+            self.evaluationCacheSize
+        )
+
+    # ------------------------------------------------------------------------
+
+    def __createJointNetwork(self):
+        # get parameters
+        self.cParameters, self.jParameters = self.__getParameters()
+
+        # get weight mapping between clusters and locators, the weights
+        # don't interact with the scene and are calculated in a job
+        job = stage.Job(self.__getWeighting)
+        yield job
+        self.weights = job.result
+
+        # variables
+        self.blends = []
+        self.ups = []
+        self.pointOnCurves = []
+        self.aimOnCurves = []
+        self.scaleConstraints = []
+        self.scaleReaders = []
+        self.scaleSegments = []
+        self._joints = []
+        self._matrices = []
+
+        # tracked nodes per joint, segment and slide, this makes it
+        # possible to update the number of joints without rebuilding
+        self._jointNodes = []
+        self._segmentNodes = []
+        self._slideNodes = {}
+        self._slideParameters = {}
+
+        # create stretch and squash attributes
+        if self.stretchAndSquash:
+            self.__createStretchAndSquash()
+
+        # create twists, the twist of every control is extracted once and
+        # blended per joint
+        if self.twistBlending:
+            self._twistReferenceMatrix, \
+            self._twistReference = self.__createTwistReference()
+
+            twists = [
+                self.__createTwist(k)
+                for k in range(len(self.controls))
+            ]
+            self._twistPointOnCurves = [poc for poc, _ in twists]
+            self.twists = [twist for _, twist in twists]
+
+        # create root joint
+        self._rootJoint = self.__createRootJoint()
+
+        # create joints
+        num = len(self.jParameters)
+        for i in range(num):
+            self.__addJoint(i)
+            yield "joints", (i + 1) / float(num)
+
+        # create stretch and squash
+        if self.stretchAndSquash:
+            for i in range(num - 1):
+                self.__addStretchSegment(i)
+                yield "stretch", (i + 1) / float(max(num - 1, 1))
+            for i in range(num):
+                self.__connectStretchSegment(i)
+
+        # create slide
+        if self.slide:
+            for item in self.__createSlideJoints():
+                yield item
+
+        # create cache
+        if self.evaluationCache:
+            self._cacheNodes.append(self.__createCache())
+
+        # get bind pre matrices, the rig is in its rest pose
+        if self.output == "matrices":
+            self._bindPreMatrices = self.__getBindPreMatrices()
+
+    def __createDeformerNetwork(self):
+        # get parameters
+        self.cParameters, self.jParameters = self.__getParameters()
+
+        # get weight mapping between clusters and samples
+        job = stage.Job(self.__getWeighting)
+        yield job
+        self.weights = job.result
+
+        # variables
+        self.blends = []
+        self._joints = []
+        self._slideNodes = {}
+        self._slideParameters = {}
+
+        # create stretch and squash attributes, the stretch itself is
+        # calculated by the deformer
+        if self.stretchAndSquash:
+            self.__createStretchAndSquash()
+
+        # create deformer
+        dfm = deformer.createDeformer(
+            "{0}_dfm".format(self.name),
+            self.geometry
+        )
+        self._deformerNode = dfm
+
+        cmds.connectAttr(
+            "{0}.worldSpace[0]".format(self.curveShape),
+            "{0}.inputCurve".format(dfm)
+        )
+        cmds.connectAttr(
+            "{0}.worldMatrix[0]".format(self.rootControl),
+            "{0}.rootMatrix".format(dfm)
+        )
+        for attr, direction in zip(
+            ["forwardAxis", "upAxis"],
+            [self.forwardDirection, self.upDirection]
+        ):
+            cmds.setAttr(
+                "{0}.{1}".format(dfm, attr),
+                "xyz".index(direction.lower())
+            )
+
+        # connect stretch and squash
+        if self.stretchAndSquash:
+            cmds.connectAttr(
+                self._scaleMultiplier,
+                "{0}.scaleMultiplier".format(dfm)
+            )
+            for attr in ["Min", "Max"]:
+                cmds.connectAttr(
+                    "{0}.scale_clamp_{1}".format(
+                        self.rootControl,
+                        attr.lower()
+                    ),
+                    "{0}.scaleClamp{1}".format(dfm, attr)
+                )
+        else:
+            cmds.setAttr("{0}.scaleMultiplier".format(dfm), 0)
+
+        # create samples, the up vectors are blended the same as the up
+        # vectors of the joint network
+        num = len(self.jParameters)
+        for i, parameter in enumerate(self.jParameters):
+            bm = cmds.createNode(
+                "wtAddMatrix",
+                n="{0}_bm_{1:03d}".format(self.name, i + 1)
+            )
+            self.__connectUpVectorWeights(bm, self.weights[i])
+            self.blends.append(bm)
+
+            cmds.setAttr(self.__getParameterAttr(i), parameter)
+            cmds.connectAttr(
+                "{0}.matrixSum".format(bm),
+                "{0}.sample[{1}].sampleMatrix".format(dfm, i)
+            )
+
+            yield "samples", (i + 1) / float(num)
+
+        # create slide
+        if self.slide:
+            for item in self.__createSlideJoints():
+                yield item
+
+        # bind geometry, the rig is in its rest pose
+        deformer.bindDeformer(dfm)
+
+    def __validateLod(self):
+        if self.lodNumJoints and self.lodNumJoints >= self.numJoints:
+            raise ValueError(
+                "Level of detail number of joints should be lower than the "
+                "number of joints!"
+            )
+
+    def __createLod(self):
+        # add level of detail attribute, by default the low resolution
+        # joint set is active so playback is as cheap as possible.
+        attribute.addSpacerAttr(self.rootControl)
+        attribute.addAttr(
+            self.rootControl, "lod", at="enum", enumName="low:high"
+        )
+
+        # variables
+        name = self.name
+        numJoints = self.numJoints
+
+        # create joint networks, the high resolution network is created
+        # last so it will be stored as the default joint network
+        for value, suffix, num in zip(
+            [0, 1],
+            ["_low", ""],
+            [self.lodNumJoints, numJoints]
+        ):
+            self.name = "{0}{1}".format(name, suffix)
+            self.numJoints = num
+
+            # create switch
+            self._lodSwitch = nodeState.createNodeStateSwitch(
+                "{0}_lod_cd".format(self.name),
+                "{0}.lod".format(self.rootControl),
+                value
+            )
+
+            # create network, the nodes are only tracked while the build
+            # is continued
+            tracker = track.NodeTracker()
+            network = self.__createJointNetwork()
+            for item in stage.trackNodes(network, tracker):
+                yield item
+
+            # block all nodes that are not blocked by a subsystem switch,
+            # the inactive joints stay frozen in their last position. The
+            # subsystem switches are chained with the level of detail
+            # switch and are left out, a blocked switch would keep the
+            # state of its subsystem frozen at normal.
+            switches = set()
+            if self.stretchAndSquash:
+                switches.add(self._scaleSwitch.split(".")[0])
+            if self.slide:
+                switches.add(self._slideJointSwitch.split(".")[0])
+
+            nodes = [
+                node
+                for node in tracker.nodes
+                if node not in switches
+                and not cmds.listConnections(
+                    "{0}.nodeState".format(node),
+                    source=True,
+                    destination=False
+                )
+            ]
+            nodeState.connectNodeState(self._lodSwitch, nodes)
+
+            # hide inactive joints
+            cd = self._lodSwitch.split(".")[0]
+            cmds.setAttr("{0}.colorIfTrueG".format(cd), 1)
+            cmds.setAttr("{0}.colorIfFalseG".format(cd), 0)
+            cmds.connectAttr(
+                "{0}.outColorG".format(cd),
+                "{0}.visibility".format(self.rootJoint)
+            )
+
+            # store low resolution joints
+            if not value:
+                self._lowRootJoint = self.rootJoint
+                self._lowJoints = self.joints
+
+        # reset variables
+        self.name = name
+        self.numJoints = numJoints
+        self._lodSwitch = None
+        
+    # ------------------------------------------------------------------------
+        
+    def __refresh(self):
+        # unparent clusters, this makes it possible to position the
+        # controls without deforming the curve
+        for cls in self.clusters:
+            if cmds.listRelatives(cls, p=True):
+                cmds.parent(cls, world=True)
+
+        # position controls
+        self.__rebindControls()
+
+        # update span curves
+        if self.spanEvaluation:
+            self.__updateSpanCurves()
+
+        # update slide parameter length
+        if self.slide:
+            parameterLength = curve.parameterLength(self.curveShape)
+            for attr in ["shift", "shift_ctrl", "shift_min", "shift_max"]:
+                cmds.setAttr(
+                    "{0}_slide_{1}_mdl.input1".format(self.name, attr),
+                    parameterLength
+                )
+
+        # get parameters
+        self.numJoints = len(self.joints)
+        self.cParameters, self.jParameters = self.__getParameters()
+
+        # update twists
+        if self.twistBlending:
+            self.__updateTwists()
+
+        # get weight mapping between clusters and locators
+        weights = self.weights
+        self.weights = self.__getWeighting()
+
+        # update joints
+        for i in range(len(self.joints)):
+            self.__updateJoint(i, weights[i])
+
+    # ------------------------------------------------------------------------
+
+    def __getPlanControlPositions(self):
+        # get control positions of the fitted curve
+        refit, maxControls = self.__getFitControls()
+        if refit:
+            points, tangents = curve.getFitSamples(self.curve)
+            cvs, error = bezier.fitSplineToControls(
+                points,
+                maxControls,
+                self.fitTolerance,
+                tangents
+            )
+
+            return cvs[::3], cvs, error
+
+        # get control positions of the curve, nurbs curves are converted
+        # to a bezier segment per span
+        num = curve.numControls(self.curve)
+        positions = [
+            tuple(
+                cmds.pointOnCurve(
+                    self.curveShape,
+                    parameter=parameter,
+                    turnOnPercentage=True,
+                    position=True
+                )
+            )
+            for parameter in curve.splitCurveToParametersByParameter(
+                self.curveShape,
+                num
+            )
+        ]
+
+        return positions, None, None
+
+    def __createPlanCurve(self, cvs):
+        # the fitted curve is created on a copy of the curve, the same way
+        # create replaces the shape of the curve. The copy is not recorded
+        # in the undo queue.
+        with undo.UndoSuspendContext():
+            crv = cmds.duplicate(self.curve, returnRootsOnly=True)[0]
+            curve.setBezierCurve(crv, cvs)
+
+        return crv
+
+    def __deletePlanCurve(self, crv):
+        with undo.UndoSuspendContext():
+            cmds.delete(crv)
+
+    # ------------------------------------------------------------------------
+
+    def __planSwitch(self, p, subsystem, name, attr, state=None):
+        cd = p.addNode(subsystem, name, "condition")
+        p.addConnection(subsystem, attr, "{0}.firstTerm".format(cd))
+
+        if state:
+            p.addConnection(subsystem, state, "{0}.colorIfTrueR".format(cd))
+
+        return "{0}.outColorR".format(cd)
+
+    def __planNodeState(self, p, subsystem, switch, nodes):
+        p.addConnections(
+            subsystem,
+            switch,
+            ["{0}.nodeState".format(node) for node in nodes]
+        )
+
+    def __planUnitConversion(self, p, subsystem, source, destination):
+        # connecting an angle to a unitless attribute or the other way
+        # around inserts a unit conversion node
+        uc = p.addNode(subsystem, "unitConversion", "unitConversion")
+        p.addConnection(subsystem, source, "{0}.input".format(uc))
+        p.addConnection(subsystem, "{0}.output".format(uc), destination)
+
+        return uc
+
+    def __planConstraint(
+            self,
+            p,
+            subsystem,
+            name,
+            nodeType,
+            drivers,
+            driven,
+            attributes
+        ):
+        c = p.addNode(subsystem, name, nodeType)
+
+        # connect drivers
+        for i, driver in enumerate(drivers):
+            for attr in attributes:
+                p.addConnection(
+                    subsystem,
+                    "{0}.{1}".format(driver, attr),
+                    "{0}.target[{1}].target{2}".format(
+                        c,
+                        i,
+                        attr[0].upper() + attr[1:]
+                    )
+                )
+
+            p.addConnection(
+                subsystem,
+                "{0}.parentMatrix[0]".format(driver),
+                "{0}.target[{1}].targetParentMatrix".format(c, i)
+            )
+
+        # connect driven
+        for attr in attributes:
+            p.addConnection(
+                subsystem,
+                "{0}.constraint{1}".format(c, attr[0].upper() + attr[1:]),
+                "{0}.{1}".format(driven, attr)
+            )
+
+        p.addConnection(
+            subsystem,
+            "{0}.parentInverseMatrix[0]".format(driven),
+            "{0}.constraintParentInverseMatrix".format(c)
+        )
+
+        return c
+
+    # ------------------------------------------------------------------------
+
+    def __planControls(self, p, numControls):
+        # variables
+        subsystem = "controls"
+        clusters = []
+        controls = []
+        tangentControls = []
+        reads = []
+
+        # create clusters
+        for i in range((numControls - 1) * 3 + 1):
+            cls = p.addNode(
+                subsystem,
+                "{0}_clusterShape_{1:03d}".format(self.name, i+1),
+                "cluster"
+            )
+            handle = p.addNode(
+                subsystem,
+                "{0}_cluster_{1:03d}".format(self.name, i+1),
+                "transform"
+            )
+            p.addNode(subsystem, "{0}Shape".format(handle), "clusterHandle")
+
+            p.addConnection(
+                subsystem,
+                "{0}.worldMatrix[0]".format(handle),
+                "{0}.matrix".format(cls)
+            )
+
+            clusters.append(handle)
+
+        # create root control
+        rootControl = "{0}_root_ctrl".format(self.name)
+        if not self.offsetParentMatrix:
+            p.addNode(
+                subsystem,
+                "{0}_root_ctrl_offset".format(self.name),
+                "transform"
+            )
+        p.addNode(subsystem, rootControl, "transform")
+        p.addNode(subsystem, "{0}Shape".format(rootControl), "nurbsCurve")
+
+        # create controls
+        for i in range(numControls):
+            ctrl = "{0}_ctrl_{1:03d}".format(self.name, i)
+            if not self.offsetParentMatrix:
+                p.addNode(
+                    subsystem,
+                    "{0}_ctrl_offset_{1:03d}".format(self.name, i),
+                    "transform"
+                )
+            p.addNode(subsystem, ctrl, "transform")
+            p.addNode(subsystem, "{0}Shape".format(ctrl), "nurbsCurve")
+
+            # create read group, in offset parent matrix mode the read
+            # matrix is calculated without a transform
+            if self.offsetParentMatrix:
+                mm = p.addNode(
+                    subsystem,
+                    "{0}_read_mm_{1:03d}".format(self.name, i+1),
+                    "multMatrix"
+                )
+                p.addConnection(
+                    subsystem,
+                    "{0}.worldMatrix[0]".format(ctrl),
+                    "{0}.matrixIn[1]".format(mm)
+                )
+                reads.append("{0}.matrixSum".format(mm))
+            else:
+                group = p.addNode(
+                    subsystem,
+                    "{0}_read_{1:03d}".format(self.name, i+1),
+                    "transform"
+                )
+                reads.append("{0}.worldMatrix[0]".format(group))
+
+            # create tangent controls
+            for side, j in zip(["a", "b"], [i*3-1, i*3+1]):
+                if j <= 0 or j >= len(clusters):
+                    continue
+
+                tCtrl = "{0}_{1}_ctrl_{2:03d}".format(self.name, side, i)
+                tCtrlOffset = tCtrl
+                if not self.offsetParentMatrix:
+                    tCtrlOffset = p.addNode(
+                        subsystem,
+                        "{0}_{1}_ctrl_offset_{2:03d}".format(
+                            self.name,
+                            side,
+                            i
+                        ),
+                        "transform"
+                    )
+                p.addNode(subsystem, tCtrl, "transform")
+                p.addNode(subsystem, "{0}Shape".format(tCtrl), "nurbsCurve")
+                tangentControls.append(tCtrl)
+
+                p.addConnection(
+                    subsystem,
+                    "{0}.tangent_vis".format(ctrl),
+                    "{0}.visibility".format(tCtrlOffset)
+                )
+
+                # create line
+                line = tCtrl.replace("ctrl", "line")
+                p.addNode(subsystem, line, "transform")
+                p.addNode(subsystem, "{0}Shape".format(line), "nurbsCurve")
+
+                for k, driver in enumerate([tCtrl, ctrl]):
+                    dm = p.addNode(
+                        subsystem,
+                        "{0}_dm_{1:03d}".format(line, k+1),
+                        "decomposeMatrix"
+                    )
+                    p.addConnection(
+                        subsystem,
+                        "{0}.worldMatrix".format(driver),
+                        "{0}.inputMatrix".format(dm)
+                    )
+                    p.addConnection(
+                        subsystem,
+                        "{0}.outputTranslate".format(dm),
+                        "{0}.controlPoints[{1}]".format(line, k)
+                    )
+
+            controls.append(ctrl)
+
+        # store control names, the names are used to plan the inputs of
+        # the cache the same way the build gets them
+        self._rootControl = rootControl
+        self._controls = controls
+        self._tangentControls = tangentControls
+
+        return rootControl, controls, reads, clusters
+
+    # ------------------------------------------------------------------------
+
+    def __planSpanCurves(self, p, clusters):
+        # variables
+        subsystem = "follicles"
+        curves = []
+
+        # create span curves
+        for i in range((len(clusters) - 1) // 3):
+            crv = p.addNode(
+                subsystem,
+                "{0}_span_crv_{1:03d}".format(self.name, i+1),
+                "transform"
+            )
+            shape = p.addNode(subsystem, "{0}Shape".format(crv), "nurbsCurve")
+
+            for j in range(4):
+                pmm = p.addNode(
+                    subsystem,
+                    "{0}_span_pmm_{1}_{2:03d}".format(self.name, j, i+1),
+                    "pointMatrixMult"
+                )
+                p.addConnection(
+                    subsystem,
+                    "{0}.worldMatrix[0]".format(clusters[i * 3 + j]),
+                    "{0}.inMatrix".format(pmm)
+                )
+                p.addConnection(
+                    subsystem,
+                    "{0}.output".format(pmm),
+                    "{0}.controlPoints[{1}]".format(shape, j)
+                )
+
+            curves.append(shape)
+
+        # the knots of a created bezier curve are evenly spaced
+        return curves, list(range(len(curves) + 1))
+
+    def __planTwists(self, p, rootControl, reads):
+        # variables
+        subsystem = "up vectors"
+        twists = []
+
+        # create reference
+        mm, vp = [
+            p.addNode(
+                subsystem,
+                "{0}_twist_ref_{1}".format(self.name, suffix),
+                nodeType
+            )
+            for suffix, nodeType in [
+                ("mm", "multMatrix"),
+                ("vp", "vectorProduct"),
+            ]
+        ]
+
+        for source, destination in [
+            (
+                "{0}.worldMatrix[0]".format(rootControl),
+                "{0}.matrixIn[1]".format(mm)
+            ),
+            ("{0}.matrixSum".format(mm), "{0}.matrix".format(vp)),
+        ]:
+            p.addConnection(subsystem, source, destination)
+
+        reference = "{0}.output".format(vp)
+        nodes = [mm, vp]
+
+        # create twists
+        for k, read in enumerate(reads):
+            crv, _ = self.__getCurveInput(self.cParameters[k])
+            poc, up, ref, ctrl, ab, sign, mdl = [
+                p.addNode(
+                    subsystem,
+                    "{0}_twist_{1}_{2:03d}".format(self.name, suffix, k+1),
+                    nodeType
+                )
+                for suffix, nodeType in [
+                    ("poc", "pointOnCurveInfo"),
+                    ("up_vp", "vectorProduct"),
+                    ("ref_vp", "vectorProduct"),
+                    ("ctrl_vp", "vectorProduct"),
+                    ("ab", "angleBetween"),
+                    ("sign_vp", "vectorProduct"),
+                    ("mdl", "multDoubleLinear"),
+                ]
+            ]
+
+            tangent = "{0}.normalizedTangent".format(poc)
+            for source, destination in [
+                (
+                    "{0}.worldSpace".format(crv),
+                    "{0}.inputCurve".format(poc)
+                ),
+                (read, "{0}.matrix".format(up)),
+                (tangent, "{0}.input1".format(ref)),
+                (reference, "{0}.input2".format(ref)),
+                (tangent, "{0}.input1".format(ctrl)),
+                ("{0}.output".format(up), "{0}.input2".format(ctrl)),
+                ("{0}.output".format(ref), "{0}.vector1".format(ab)),
+                ("{0}.output".format(ctrl), "{0}.vector2".format(ab)),
+                ("{0}.axis".format(ab), "{0}.input1".format(sign)),
+                (tangent, "{0}.input2".format(sign)),
+                ("{0}.outputX".format(sign), "{0}.input2".format(mdl)),
+            ]:
+                p.addConnection(subsystem, source, destination)
+
+            # the angle is connected to a unitless input, which inserts a
+            # unit conversion
+            uc = self.__planUnitConversion(
+                p,
+                subsystem,
+                "{0}.angle".format(ab),
+                "{0}.input1".format(mdl)
+            )
+
+            twists.append("{0}.output".format(mdl))
+            nodes.extend([poc, up, ref, ctrl, ab, sign, mdl, uc])
+
+        return reference, twists, nodes
+
+    def __planSlide(self, p, rootControl):
+        # variables
+        subsystem = "slide"
+        nodes = []
+        motionPaths = []
+
+        # create slide controls
+        for i, suffix in enumerate(["slide", "slide_min", "slide_max"]):
+            ctrl = "{0}_{1}_ctrl".format(self.name, suffix)
+            offset = p.addNode(
+                subsystem,
+                "{0}_{1}_ctrl_offset".format(self.name, suffix),
+                "transform"
+            )
+            p.addNode(subsystem, ctrl, "transform")
+            p.addNode(subsystem, "{0}Shape".format(ctrl), "nurbsCurve")
+
+            if not i:
+                self._slideControl = ctrl
+
+            self.__planConstraint(
+                p,
+                subsystem,
+                "{0}_scaleConstraint1".format(offset),
+                "scaleConstraint",
+                [rootControl],
+                offset,
+                ["scale"]
+            )
+
+            # attach to motion path
+            mp = p.addNode(
+                subsystem,
+                "{0}_mp_{1:03d}".format(self.curve, i+1),
+                "motionPath"
+            )
+
+            for source, destination in [
+                (
+                    "{0}.worldSpace[0]".format(self.curve),
+                    "{0}.geometryPath".format(mp)
+                ),
+                (
+                    "{0}.worldMatrix[0]".format(rootControl),
+                    "{0}.worldUpMatrix".format(mp)
+                ),
+                (
+                    "{0}.allCoordinates".format(mp),
+                    "{0}.translate".format(offset)
+                ),
+                ("{0}.rotate".format(mp), "{0}.rotate".format(offset)),
+                (
+                    "{0}.rotateOrder".format(mp),
+                    "{0}.rotateOrder".format(offset)
+                ),
+                (
+                    "{0}.slide_enable".format(rootControl),
+                    "{0}.visibility".format(offset)
+                ),
+            ]:
+                p.addConnection(subsystem, source, destination)
+
+            motionPaths.append(mp)
+
+        # normalize attributes
+        normalized = []
+        for attr in [
+            "slide_center",
+            "slide_shift",
+            "slide_shift_min",
+            "slide_shift_max"
+        ]:
+            mdl = p.addNode(
+                subsystem,
+                "{0}_{1}_norm_mdl".format(self.name, attr),
+                "multDoubleLinear"
+            )
+            p.addConnection(
+                subsystem,
+                "{0}_slide_ctrl.{1}".format(self.name, attr),
+                "{0}.input2".format(mdl)
+            )
+
+            normalized.append("{0}.output".format(mdl))
+            nodes.append(mdl)
+
+        center, shift, shiftMin, shiftMax = normalized
+
+        # reverse shift attribute
+        mdl = p.addNode(
+            subsystem,
+            "{0}_slide_shift_reverse_mdl".format(self.name),
+            "multDoubleLinear"
+        )
+        p.addConnection(subsystem, shift, "{0}.input2".format(mdl))
+        nodes.append(mdl)
+
+        # add to center
+        clampAttributes = []
+        motionPathAttributes = []
+
+        for attr, input in zip(
+            ["shift", "shift_ctrl", "shift_min", "shift_max"],
+            ["{0}.output".format(mdl), shift, shiftMin, shiftMax]
+        ):
+            adl, clamp, mdl = [
+                p.addNode(
+                    subsystem,
+                    "{0}_slide_{1}_{2}".format(self.name, attr, suffix),
+                    nodeType
+                )
+                for suffix, nodeType in [
+                    ("adl", "addDoubleLinear"),
+                    ("clamp", "clamp"),
+                    ("mdl", "multDoubleLinear")
+                ]
+            ]
+
+            for source, destination in [
+                (center, "{0}.input1".format(adl)),
+                (input, "{0}.input2".format(adl)),
+                ("{0}.output".format(adl), "{0}.inputR".format(clamp)),
+                ("{0}.outputR".format(clamp), "{0}.input2".format(mdl)),
+            ]:
+                p.addConnection(subsystem, source, destination)
+
+            clampAttributes.append("{0}.outputR".format(clamp))
+            motionPathAttributes.append("{0}.output".format(mdl))
+            nodes.extend([adl, clamp, mdl])
+
+        # connect clamped values to motion path
+        for attr, mp in zip(motionPathAttributes[1:], motionPaths):
+            p.addConnection(subsystem, attr, "{0}.uValue".format(mp))
+
+        # block the slide network when disabled
+        switch = self.__planSwitch(
+            p,
+            subsystem,
+            "{0}_slide_enable_cd".format(self.name),
+            "{0}.slide_enable".format(rootControl)
+        )
+        self.__planNodeState(p, subsystem, switch, nodes + motionPaths)
+
+        clamp, _, clampMin, clampMax = clampAttributes
+        return {
+            "center": center,
+            "clamp": clamp,
+            "clampMin": clampMin,
+            "clampMax": clampMax,
+            "switch": switch,
+        }
+
+    def __planSlideJoint(self, p, rootControl, slide, switch, poc, i):
+        # variables
+        subsystem = "slide"
+
+        # create nodes
+        ramp, adl, cdA, cdB, mdl, cdC = [
+            p.addNode(
+                subsystem,
+                "{0}_slide_{1}_{2:03d}".format(self.name, suffix, i),
+                nodeType
+            )
+            for suffix, nodeType in [
+                ("ramp", "ramp"),
+                ("uv_adl", "addDoubleLinear"),
+                ("cd_a", "condition"),
+                ("cd_b", "condition"),
+                ("mdl", "multDoubleLinear"),
+                ("cd_c", "condition"),
+            ]
+        ]
+
+        # connect nodes
+        for source, destination in [
+            ("{0}.output".format(adl), "{0}.uCoord".format(ramp)),
+            ("{0}.output".format(adl), "{0}.vCoord".format(ramp)),
+            (slide["clamp"], "{0}.colorEntryList[2].position".format(ramp)),
+            (slide["center"], "{0}.colorEntryList[2].colorR".format(ramp)),
+            (slide["clampMin"], "{0}.colorEntryList[0].position".format(ramp)),
+            (slide["clampMin"], "{0}.colorEntryList[0].colorR".format(ramp)),
+            (slide["clampMax"], "{0}.colorEntryList[1].position".format(ramp)),
+            (slide["clampMax"], "{0}.colorEntryList[1].colorR".format(ramp)),
+            (slide["clampMin"], "{0}.firstTerm".format(cdA)),
+            (slide["clampMax"], "{0}.firstTerm".format(cdB)),
+            (
+                "{0}.slide_enable".format(rootControl),
+                "{0}.colorIfTrueR".format(cdA)
+            ),
+            ("{0}.outColorR".format(cdA), "{0}.input1".format(mdl)),
+            ("{0}.outColorR".format(cdB), "{0}.input2".format(mdl)),
+            ("{0}.output".format(mdl), "{0}.firstTerm".format(cdC)),
+            ("{0}.outColorR".format(ramp), "{0}.colorIfFalseR".format(cdC)),
+            ("{0}.outColorR".format(cdC), "{0}.parameter".format(poc)),
+        ]:
+            p.addConnection(subsystem, source, destination)
+
+        self.__planNodeState(p, subsystem, switch, [ramp, adl, cdB])
+
+        return [cdA, mdl, cdC]
+
+    # ------------------------------------------------------------------------
+
+    def __planJointNetwork(self, p, rootControl, reads, clusters, slide):
+        # variables
+        num = len(self.jParameters)
+        nodes = []
+
+        # create stretch and squash switch
+        if self.stretchAndSquash:
+            scaleMultiplier = p.addNode(
+                "stretch",
+                "{0}_scale_enable_mdl".format(self.name),
+                "multDoubleLinear"
+            )
+            for attr, destination in [
+                ("scale_multiplier", "input1"),
+                ("scale_enable", "input2")
+            ]:
+                p.addConnection(
+                    "stretch",
+                    "{0}.{1}".format(rootControl, attr),
+                    "{0}.{1}".format(scaleMultiplier, destination)
+                )
+
+            scaleSwitch = self.__planSwitch(
+                p,
+                "stretch",
+                "{0}_scale_enable_cd".format(self.name),
+                "{0}.scale_enable".format(rootControl),
+                self._lodSwitch
+            )
+            nodes.append(scaleMultiplier)
+
+        # create root joint
+        rootJoint = p.addNode(
+            "follicles",
+            "{0}_root_jnt".format(self.name),
+            "joint"
+        )
+        nodes.append(rootJoint)
+
+        if self.offsetParentMatrix:
+            p.addConnection(
+                "follicles",
+                "{0}.worldMatrix[0]".format(rootControl),
+                "{0}.offsetParentMatrix".format(rootJoint)
+            )
+        else:
+            for nodeType, attributes in [
+                ("parentConstraint", ["translate", "rotate"]),
+                ("scaleConstraint", ["scale"])
+            ]:
+                nodes.append(
+                    self.__planConstraint(
+                        p,
+                        "follicles",
+                        "{0}_{1}1".format(rootJoint, nodeType),
+                        nodeType,
+                        [rootControl],
+                        rootJoint,
+                        attributes
+                    )
+                )
+
+        # create twists
+        if self.twistBlending:
+            reference, twists, twistNodes = self.__planTwists(
+                p,
+                rootControl,
+                reads
+            )
+            nodes.extend(twistNodes)
+
+        # create joints
+        joints = []
+        pointOnCurves = []
+        scaleConstraints = []
+        scaleReaders = []
+
+        for i in range(num):
+            # create up vector, when blending twist only the twists of
+            # the controls are blended
+            if self.twistBlending:
+                bw = p.addNode(
+                    "up vectors",
+                    "{0}_twist_bw_{1:03d}".format(self.name, i+1),
+                    "blendWeighted"
+                )
+
+                for j, k in enumerate(self.weights[i].keys()):
+                    p.addConnection(
+                        "up vectors",
+                        twists[k],
+                        "{0}.input[{1}]".format(bw, j)
+                    )
+
+                upNodes = [bw]
+            else:
+                bm, pmm, dm, up = [
+                    p.addNode(
+                        "up vectors",
+                        "{0}_{1}_{2:03d}".format(self.name, suffix, i+1),
+                        nodeType
+                    )
+                    for suffix, nodeType in [
+                        ("bm", "wtAddMatrix"),
+                        ("up_pmm", "pointMatrixMult"),
+                        ("up_dm", "decomposeMatrix"),
+                        ("up_pma", "plusMinusAverage"),
+                    ]
+                ]
+
+                for j, k in enumerate(self.weights[i].keys()):
+                    p.addConnection(
+                        "up vectors",
+                        reads[k],
+                        "{0}.wtMatrix[{1}].matrixIn".format(bm, j)
+                    )
+
+                for source, destination in [
+                    ("{0}.matrixSum".format(bm), "{0}.inMatrix".format(pmm)),
+                    (
+                        "{0}.matrixSum".format(bm),
+                        "{0}.inputMatrix".format(dm)
+                    ),
+                    ("{0}.output".format(pmm), "{0}.input3D[0]".format(up)),
+                    (
+                        "{0}.outputTranslate".format(dm),
+                        "{0}.input3D[1]".format(up)
+                    ),
+                ]:
+                    p.addConnection("up vectors", source, destination)
+
+                upNodes = [bm, pmm, dm, up]
+
+            # create follicle
+            crv, _ = self.__getCurveInput(self.jParameters[i])
+            poc, aim, jnt = [
+                p.addNode(
+                    "follicles",
+                    "{0}_{1}_{2:03d}".format(self.name, suffix, i+1),
+                    nodeType
+                )
+                for suffix, nodeType in [
+                    ("poc", "pointOnCurveInfo"),
+                    ("aim", "aimConstraint"),
+                    ("jnt", "joint"),
+                ]
+            ]
+            follicleNodes = [poc, aim, jnt]
+
+            connections = [
+                (
+                    "{0}.worldSpace".format(crv),
+                    "{0}.inputCurve".format(poc)
+                ),
+                ("{0}.tangent".format(poc), "{0}.tg[0].tt".format(aim)),
+                (
+                    "{0}.result.position".format(poc),
+                    "{0}.translate".format(jnt)
+                ),
+                ("{0}.constraintRotate".format(aim), "{0}.rotate".format(jnt)),
+            ]
+
+            # connect up vector, the twist is applied as offset of the aim
+            # which is an angle, this inserts a unit conversion
+            if self.twistBlending:
+                connections.append(
+                    (reference, "{0}.worldUpVector".format(aim))
+                )
+                follicleNodes.append(
+                    self.__planUnitConversion(
+                        p,
+                        "follicles",
+                        "{0}.output".format(bw),
+                        "{0}.offset{1}".format(
+                            aim,
+                            self.forwardDirection.upper()
+                        )
+                    )
+                )
+            else:
+                pma = p.addNode(
+                    "follicles",
+                    "{0}_pma_{1:03d}".format(self.name, i+1),
+                    "plusMinusAverage"
+                )
+                follicleNodes.append(pma)
+
+                connections.extend([
+                    ("{0}.output3D".format(up), "{0}.input3D[0]".format(pma)),
+                    (
+                        "{0}.result.position".format(poc),
+                        "{0}.input3D[1]".format(pma)
+                    ),
+                    (
+                        "{0}.output3D".format(pma),
+                        "{0}.worldUpVector".format(aim)
+                    ),
+                ])
+
+            for source, destination in connections:
+                p.addConnection("follicles", source, destination)
+
+            # create scale constraint
+            c = self.__planConstraint(
+                p,
+                "follicles",
+                "{0}_scale_{1:03d}".format(self.name, i+1),
+                "scaleConstraint",
+                [clusters[k * 3] for k in self.weights[i].keys()],
+                jnt,
+                ["scale"]
+            )
+
+            pointOnCurves.append(poc)
+            scaleConstraints.append(c)
+            joints.append(jnt)
+            nodes.extend(upNodes + follicleNodes + [c])
+
+            # create scale reader
+            if self.stretchAndSquash:
+                pmm = p.addNode(
+                    "stretch",
+                    "{0}_scale_pmm_{1:03d}".format(self.name, i+1),
+                    "pointMatrixMult"
+                )
+                p.addConnection(
+                    "stretch",
+                    "{0}.worldMatrix[0]".format(rootJoint),
+                    "{0}.inMatrix".format(pmm)
+                )
+
+                self.__planNodeState(p, "stretch", scaleSwitch, [pmm])
+                scaleReaders.append(pmm)
+
+        # create stretch and squash
+        if self.stretchAndSquash:
+            scaleSegments = []
+            for i in range(num - 1):
+                base, scale, md, adlA, mdl, adlB, clamp = [
+                    p.addNode("stretch", name.format(self.name, i), nodeType)
+                    for name, nodeType in [
+                        ("{0}_scale_base_db_{1:03d}", "distanceBetween"),
+                        ("{0}_scale_scale_db_{1:03d}", "distanceBetween"),
+                    ]
+                ] + [
+                    p.addNode(
+                        "stretch",
+                        "{0}_scale_{1}_{2:03d}".format(self.name, suffix, i+1),
+                        nodeType
+                    )
+                    for suffix, nodeType in [
+                        ("md", "multiplyDivide"),
+                        ("adl_a", "addDoubleLinear"),
+                        ("mdl", "multDoubleLinear"),
+                        ("adl_b", "addDoubleLinear"),
+                        ("clamp", "clamp"),
+                    ]
+                ]
+
+                for source, destination in [
+                    (
+                        "{0}.result.position".format(pointOnCurves[i]),
+                        "{0}.point1".format(base)
+                    ),
+                    (
+                        "{0}.result.position".format(pointOnCurves[i+1]),
+                        "{0}.point2".format(base)
+                    ),
+                    (
+                        "{0}.output".format(scaleReaders[i]),
+                        "{0}.point1".format(scale)
+                    ),
+                    (
+                        "{0}.output".format(scaleReaders[i+1]),
+                        "{0}.point2".format(scale)
+                    ),
+                    ("{0}.distance".format(scale), "{0}.input1X".format(md)),
+                    ("{0}.distance".format(base), "{0}.input2X".format(md)),
+                    ("{0}.outputX".format(md), "{0}.input1".format(adlA)),
+                    ("{0}.output".format(adlA), "{0}.input1".format(mdl)),
+                    (
+                        "{0}.output".format(scaleMultiplier),
+                        "{0}.input2".format(mdl)
+                    ),
+                    ("{0}.output".format(mdl), "{0}.input1".format(adlB)),
+                    (
+                        "{0}.scale_clamp_min".format(rootControl),
+                        "{0}.minR".format(clamp)
+                    ),
+                    (
+                        "{0}.scale_clamp_max".format(rootControl),
+                        "{0}.maxR".format(clamp)
+                    ),
+                    ("{0}.output".format(adlB), "{0}.inputR".format(clamp)),
+                ]:
+                    p.addConnection("stretch", source, destination)
+
+                self.__planNodeState(
+                    p,
+                    "stretch",
+                    scaleSwitch,
+                    [md, adlA, base, scale]
+                )
+
+                scaleSegments.append("{0}.outputR".format(clamp))
+                nodes.extend([mdl, adlB, clamp])
+
+            # connect segments to scale constraints
+            axis = ["X", "Y", "Z"]
+            axis.remove(self.forwardDirection.upper())
+
+            for i, c in enumerate(scaleConstraints):
+                segment = scaleSegments[min(i, len(scaleSegments) - 1)]
+                for a in axis:
+                    p.addConnection(
+                        "stretch",
+                        segment,
+                        "{0}.offset{1}".format(c, a)
+                    )
+
+        # create slide
+        if slide:
+            switch = slide["switch"]
+            if self._lodSwitch:
+                switch = self.__planSwitch(
+                    p,
+                    "slide",
+                    "{0}_slide_lod_cd".format(self.name),
+                    "{0}.slide_enable".format(rootControl),
+                    self._lodSwitch
+                )
+
+            for i in range(1, num - 1):
+                nodes.extend(
+                    self.__planSlideJoint(
+                        p,
+                        rootControl,
+                        slide,
+                        switch,
+                        pointOnCurves[i],
+                        i
+                    )
+                )
+
+        # create cache
+        if self.evaluationCache:
+            nodes.append(self.__planCache(p, joints))
+
+        return rootJoint, nodes
+
+    def __planCache(self, p, joints):
+        # variables
+        subsystem = "follicles"
+        matrices, values = self.__getCacheInputs()
+
+        # create node
+        node = p.addNode(
+            subsystem,
+            "{0}_cache".format(self.name),
+            cache.CACHE_NODE
+        )
+
+        for i, attr in enumerate(matrices):
+            p.addConnection(
+                subsystem,
+                attr,
+                "{0}.inputMatrix[{1}]".format(node, i)
+            )
+        for i, attr in enumerate(values):
+            p.addConnection(
+                subsystem,
+                attr,
+                "{0}.inputValue[{1}]".format(node, i)
+            )
+
+        # reroute joints
+        for i, jnt in enumerate(joints):
+            for attr in cache.JOINT_ATTRIBUTES:
+                destination = "{0}.{1}".format(jnt, attr)
+                suffix = attr[0].upper() + attr[1:]
+                for source in p.removeConnections(destination):
+                    p.addConnection(
+                        subsystem,
+                        source,
+                        "{0}.input[{1}].input{2}".format(node, i, suffix)
+                    )
+                    p.addConnection(
+                        subsystem,
+                        "{0}.output[{1}].output{2}".format(node, i, suffix),
+                        destination
+                    )
+
+        return node
+
+    def __planLod(self, p, rootControl, reads, clusters, slide, parameters):
+        # validate number of joints
+        self.__validateLod()
+
+        # variables
+        name = self.name
+        numJoints = self.numJoints
+
+        # plan joint networks
+        for suffix, num, (cParameters, jParameters) in zip(
+            ["_low", ""],
+            [self.lodNumJoints, numJoints],
+            parameters
+        ):
+            self.name = "{0}{1}".format(name, suffix)
+            self.numJoints = num
+
+            # set parameters
+            self.cParameters, self.jParameters = cParameters, jParameters
+            self.weights = self.__getWeighting()
+
+            # create switch
+            self._lodSwitch = self.__planSwitch(
+                p,
+                "follicles",
+                "{0}_lod_cd".format(self.name),
+                "{0}.lod".format(rootControl)
+            )
+
+            # plan network, nodes that are not blocked by a subsystem
+            # switch are blocked by the level of detail switch
+            rootJoint, nodes = self.__planJointNetwork(
+                p,
+                rootControl,
+                reads,
+                clusters,
+                slide
+            )
+            self.__planNodeState(p, "follicles", self._lodSwitch, nodes)
+
+            p.addConnection(
+                "follicles",
+                self._lodSwitch.replace("outColorR", "outColorG"),
+                "{0}.visibility".format(rootJoint)
+            )
+
+        # reset variables
+        self.name = name
+        self.numJoints = numJoints
+        self._lodSwitch = None
+
+    # ------------------------------------------------------------------------
+
+    def __getFitControls(self):
+        # the refit never adds controls, the maximum controls is capped
+        # by the controls of the curve. Without a tolerance the curve is
+        # only refitted when it has more controls than the maximum.
+        if not self.maxControls and not self.fitTolerance:
+            return False, None
+
+        numControls = curve.numControls(self.curve)
+        maxControls = min(self.maxControls or numControls, numControls)
+        if not self.fitTolerance and maxControls == numControls:
+            return False, None
+
+        return True, maxControls
+
+    def __addToContainer(self, nodes):
+        # create container
+        if not self.container or not cmds.objExists(self.container):
+            self._container = container.createContainer(
+                "{0}_container".format(self.name)
+            )
+
+        # the shapes of the curve are not part of the spline IK, this
+        # includes the original shape that is created by the clusters
+        shapes = cmds.listRelatives(self.curve, s=True, path=True) or []
+        nodes = [node for node in nodes if node not in shapes]
+
+        container.addNodes(self.container, nodes)
+
+    # ------------------------------------------------------------------------
+        
+    def __getTrace(self, recorder):
+        # get state, the name itself is not a node and is set explicitly
+        state = {
+            key: recorder.tokenize(value)
+            for key, value in self.__dict__.items()
+            if key != "_trace"
+        }
+        state["_name"] = trace.NAME_TOKEN
+
+        return trace.Trace(
+            recorder.operations,
+            state,
+            {"numCVs": len(self.clusters)}
+        )
+
+    def __build(self):
+        # variables
+        self._cacheNodes = []
+
+        # create clusters
+        self.clusters = cluster.clusterCurve(self.curve, self.name)
+        self.controlClusters = self.clusters[::3]
+
+        # create controls
+        self._rootControl, \
+        self._controls, \
+        self._tangentControls = self.__createControls()
+
+        # create slide controls
+        if self.slide:
+            self.__createSlide()
+
+        # create span curves
+        if self.spanEvaluation:
+            self._spanCurves = self.__createSpanCurves()
+
+        yield "controls", 1.0
+
+        # create joint network
+        if self.output == "deformer":
+            network = self.__createDeformerNetwork()
+        elif self.lodNumJoints:
+            network = self.__createLod()
+        else:
+            network = self.__createJointNetwork()
+
+        for item in network:
+            yield item
+
+    def __createStages(self):
+        # validate offset parent matrix
+        if self.offsetParentMatrix and (
+            cmds.about(apiVersion=True) < OFFSET_PARENT_MATRIX_API
+        ):
+            raise RuntimeError(
+                "create: offset parent matrix requires Maya 2020 or later!"
+            )
+
+        # validate span evaluation, sliding moves the joints along the
+        # full curve
+        if self.spanEvaluation and self.slide:
+            raise ValueError("create: span evaluation doesn't support slide!")
+
+        # validate output, the deformer and matrices replace the joints
+        if self.output != "joints":
+            if self.lodNumJoints:
+                raise ValueError(
+                    "create: {0} output doesn't support level of "
+                    "detail!".format(self.output)
+                )
+            if self.evaluationCache:
+                raise ValueError(
+                    "create: {0} output doesn't support the cache!".format(
+                        self.output
+                    )
+                )
+            if self._drivenJoints:
+                raise ValueError(
+                    "create: {0} output doesn't support joints!".format(
+                        self.output
+                    )
+                )
+        # validate cache, a cache hit only skips evaluation in DG mode
+        if self.evaluationCache and not cache.isEvaluationModeSupported():
+            raise RuntimeError(
+                "create: the cache requires DG evaluation mode!"
+            )
+
+        if self.output == "deformer" and not self.geometry:
+            raise ValueError("create: deformer output requires geometry!")
+        if self.output == "deformer" and self.twistBlending:
+            raise ValueError(
+                "create: deformer output doesn't support twist blending!"
+            )
+
+        # validate level of detail, the number of joints is validated
+        # again once it is recommended from the joint tolerance
+        if not self.jointTolerance:
+            self.__validateLod()
+
+        # refit curve to cap the number of controls, the fit doesn't
+        # interact with the scene and is calculated in a job
+        refit, maxControls = self.__getFitControls()
+        if not self._drivenJoints and refit:
+            points, tangents = curve.getFitSamples(self.curve)
+            job = stage.Job(
+                bezier.fitSplineToControls,
+                points,
+                maxControls,
+                self.fitTolerance,
+                tangents
+            )
+            yield job
+
+            cvs, self._fitError = job.result
+            curve.setBezierCurve(self.curve, cvs)
+
+        # convert curve to bezier curve
+        curve.convertToBezierCurve(self.curve)
+
+        # get number of joints from tolerance
+        if not self._drivenJoints and self.jointTolerance:
+            self.numJoints = curve.recommendNumJoints(
+                self.curveShape,
+                self.jointTolerance,
+                self.__getDistributionBias()
+            )
+            self.__validateLod()
+
+        # create rig, the scene operations are recorded when a
+        # trace is requested. The recorder replaces the commands for the
+        # whole session, so the build is ran in full without yielding,
+        # this way no commands from outside the build are recorded. The
+        # same applies to the created nodes, these are only tracked while
+        # the build is continued.
+        tracker = track.NodeTracker()
+        if self.recordTrace:
+            with tracker, trace.Recorder(self.name, self.curve) as recorder:
+                stage.run(self.__build())
+
+            self._trace = self.__getTrace(recorder)
+            yield "joints", 1.0
+        else:
+            for item in stage.trackNodes(self.__build(), tracker):
+                yield item
+
+        # store all created nodes in a container
+        self._container = None
+        self.__addToContainer(tracker.nodes)
+
+    def __create(self):
+        stage.run(self.__createStages())
+
+    def __getUndoableBuild(self, curves, create):
+        # store the original curves, the curves are refitted and deformed
+        data = [curve.getCurveData(crv) for crv in curves]
+        nodes = []
+
+        def revert():
+            self.__deleteNodes(nodes)
+            for crv, d in zip(curves, data):
+                curve.setCurveData(crv, d)
+
+        def build():
+            with track.NodeTracker() as tracker:
+                try:
+                    create()
+                finally:
+                    nodes[:] = tracker.nodes
+
+        return build, revert, nodes
+
+    def __createUndoLight(self, curves, create):
+        # the inner commands are not recorded, undoing the command deletes
+        # the created nodes and restores the original curves
+        build, revert, _ = self.__getUndoableBuild(curves, create)
+        undo.runUndoableBuild(build, revert)
+
+    def __createDeferred(self, stages, curves, create, progress, finished):
+        build, revert, nodes = self.__getUndoableBuild(curves, create)
+
+        def done(run):
+            # roll back or register the build as an undoable command
+            nodes[:] = run.nodes
+            if run.error or run.cancelled:
+                with undo.UndoSuspendContext():
+                    revert()
+            else:
+                undo.runUndoableBuild(build, revert, built=True)
+
+            if finished:
+                finished(run)
+
+        run = stage.DeferredRun(stages, progress, done)
+        run.start()
+
+        return run
+
+    def __setVariables(
+            self,
+            name,
+            curve_,
+            numJoints,
+            upDirection,
+            worldUpDirection,
+            forwardDirection
+        ):
+        # variables
+        self.name = name
+        self.curve = curve_
+        self.numJoints = numJoints
+        self.upDirection = upDirection
+        self.forwardDirection = forwardDirection
+
+        # vector variables
+        self.upVector = math.convertAxisToVector(upDirection)
+        self.aimVector = math.convertAxisToVector(forwardDirection)
+        self.worldUpVector = math.convertAxisToVector(worldUpDirection)
+        self._fromJoints = bool(self._drivenJoints)
+
+    # ------------------------------------------------------------------------
+
+    def create(
+            self, 
+            name,
+            curve_,
+            numJoints, 
+            upDirection="y", 
+            worldUpDirection="y", 
+            forwardDirection="x"
+        ):
+        """
+        Create the spline IK, besides changing attributes from the
+        Settings class, the create function itself can also be
+        parsed with various variables to customise the result.
+        
+        :param name: name that is used to prefix all nodes
+        :param curve_: curve to attach the Spline IK to.
+        :param numJoints: number of joints to be distributed on the curve,
+            ignored when a joint tolerance is set
+        :param upDirection: "x", "y" or "z", default "y"
+        :param worldUpDirection: "x", "y" or "z", default "y"
+        :param forwardDirection: "x", "y" or "z", default "x"
+        """
+        self.__setVariables(
+            name,
+            curve_,
+            numJoints,
+            upDirection,
+            worldUpDirection,
+            forwardDirection
+        )
+
+        # run the rest of the code in a single undo chunk, in undo light
+        # mode the code is ran as a single undoable command instead
+        if self.undoLight and not self._drivenJoints:
+            self.__createUndoLight([self.curve], self.__create)
+        else:
+            with undo.UndoChunkContext():
+                self.__create()
+
+        return self.rootControl
+
+    def createStages(
+            self,
+            name,
+            curve_,
+            numJoints,
+            upDirection="y",
+            worldUpDirection="y",
+            forwardDirection="x"
+        ):
+        """
+        Create the spline IK in stages, the arguments match the
+        :meth:`SplineIK.create` function. The returned generator yields
+        the progress as a (stage, progress) tuple in between batches of
+        scene operations and yields jobs for the calculations that don't
+        interact with the scene, see :mod:`splineIK.utils.stage`. This
+        makes it possible to spread the build over multiple idle events
+        and to execute the jobs outside of Maya's main thread. The
+        commands are not wrapped in an undo chunk. When a trace is
+        recorded the rig itself is created in a single stage, as the
+        recording would otherwise pick up commands ran in between stages.
+
+        :param name: name that is used to prefix all nodes
+        :param curve_: curve to attach the Spline IK to.
+        :param numJoints: number of joints to be distributed on the curve,
+            ignored when a joint tolerance is set
+        :param upDirection: "x", "y" or "z", default "y"
+        :param worldUpDirection: "x", "y" or "z", default "y"
+        :param forwardDirection: "x", "y" or "z", default "x"
+        :return: stages
+        :rtype: generator
+        :raises ValueError: When created on existing joints
+        """
+        if self._drivenJoints:
+            raise ValueError(
+                "createStages: existing joints are not supported!"
+            )
+
+        self.__setVariables(
+            name,
+            curve_,
+            numJoints,
+            upDirection,
+            worldUpDirection,
+            forwardDirection
+        )
+
+        return self.__createStages()
+
+    def createDeferred(
+            self,
+            name,
+            curve_,
+            numJoints,
+            upDirection="y",
+            worldUpDirection="y",
+            forwardDirection="x",
+            progress=None,
+            finished=None
+        ):
+        """
+        Create the spline IK spread over Maya's idle events, the arguments
+        match the :meth:`SplineIK.create` function. The calculations that
+        don't interact with the scene are executed in a separate thread.
+        This keeps the interface responsive while large rigs are created,
+        see :class:`splineIK.utils.stage.DeferredRun`. The returned run can
+        be cancelled, a cancelled or failed build is rolled back by
+        deleting the created nodes and restoring the original curve. A
+        finished build is registered as a single undoable command.
+
+        :param name: name that is used to prefix all nodes
+        :param curve_: curve to attach the Spline IK to.
+        :param numJoints: number of joints to be distributed on the curve,
+            ignored when a joint tolerance is set
+        :param upDirection: "x", "y" or "z", default "y"
+        :param worldUpDirection: "x", "y" or "z", default "y"
+        :param forwardDirection: "x", "y" or "z", default "x"
+        :param func/None progress: called with the stage and progress
+        :param func/None finished: called with the deferred run
+        :return: deferred run
+        :rtype: splineIK.utils.stage.DeferredRun
+        """
+        stages = self.createStages(
+            name,
+            curve_,
+            numJoints,
+            upDirection,
+            worldUpDirection,
+            forwardDirection
+        )
+
+        return self.__createDeferred(
+            stages,
+            [self.curve],
+            self.__create,
+            progress,
+            finished
+        )
+
+    # ------------------------------------------------------------------------
+
+    def __getBatchSplineIK(self):
+        # create a spline ik with the same settings
+        ik = SplineIK()
+        for key in Settings().__dict__:
+            ik.__dict__[key] = self.__dict__[key]
+
+        return ik
+
+    def __createBatchStages(
+            self,
+            names,
+            curves,
+            numJoints,
+            upDirection,
+            worldUpDirection,
+            forwardDirection
+        ):
+        # variables
+        self._batchResults = []
+        num = len(curves)
+
+        for i, (name, crv) in enumerate(zip(names, curves)):
+            ik = self.__getBatchSplineIK()
+            stages = ik.createStages(
+                name,
+                crv,
+                numJoints,
+                upDirection,
+                worldUpDirection,
+                forwardDirection
+            )
+
+            # create spline ik, the time the build is paused is excluded
+            # from the build time
+            duration = 0
+            start = time.time()
+            for item in stages:
+                duration += time.time() - start
+                if isinstance(item, stage.Job):
+                    yield item
+                else:
+                    yield (
+                        "{0}: {1}".format(name, item[0]),
+                        (i + item[1]) / float(num)
+                    )
+                start = time.time()
+
+            duration += time.time() - start
+
+            # store results
+            self._batchResults.append({
+                "name": name,
+                "curve": crv,
+                "rootControl": ik.rootControl,
+                "time": duration,
+                "nodes": len(container.getNodes(ik.container)),
+            })
+
+    def __validateBatch(self, names, curves):
+        if len(names) != len(curves):
+            raise ValueError(
+                "createBatch: number of names and curves don't match!"
+            )
+        if self._drivenJoints:
+            raise ValueError(
+                "createBatch: existing joints are not supported!"
+            )
+
+    def createBatch(
+            self,
+            names,
+            curves,
+            numJoints,
+            upDirection="y",
+            worldUpDirection="y",
+            forwardDirection="x"
+        ):
+        """
+        Create a spline IK on every curve using the settings of this
+        spline IK, the arguments match the :meth:`SplineIK.create`
+        function apart from a name per curve. All spline IKs are created
+        in a single undo chunk, in undo light mode the batch is ran as a
+        single undoable command. The build time and node count of every
+        spline IK are stored in the :attr:`SplineIK.batchResults`.
+
+        :param list names: names that are used to prefix all nodes
+        :param list curves: curves to attach the Spline IKs to.
+        :param numJoints: number of joints to be distributed on the curves,
+            ignored when a joint tolerance is set
+        :param upDirection: "x", "y" or "z", default "y"
+        :param worldUpDirection: "x", "y" or "z", default "y"
+        :param forwardDirection: "x", "y" or "z", default "x"
+        :return: batch results
+        :rtype: list
+        :raises ValueError: When the number of names and curves don't match
+        """
+        self.__validateBatch(names, curves)
+
+        def create():
+            stage.run(
+                self.__createBatchStages(
+                    names,
+                    curves,
+                    numJoints,
+                    upDirection,
+                    worldUpDirection,
+                    forwardDirection
+                )
+            )
+
+        if self.undoLight:
+            self.__createUndoLight(curves, create)
+        else:
+            with undo.UndoChunkContext():
+                create()
+
+        return self.batchResults
+
+    def createBatchDeferred(
+            self,
+            names,
+            curves,
+            numJoints,
+            upDirection="y",
+            worldUpDirection="y",
+            forwardDirection="x",
+            progress=None,
+            finished=None
+        ):
+        """
+        Create a spline IK on every curve spread over Maya's idle events,
+        see :meth:`SplineIK.createBatch` and
+        :meth:`SplineIK.createDeferred`. The whole batch is rolled back
+        when cancelled or failed, a finished batch is registered as a
+        single undoable command.
+
+        :param list names: names that are used to prefix all nodes
+        :param list curves: curves to attach the Spline IKs to.
+        :param numJoints: number of joints to be distributed on the curves,
+            ignored when a joint tolerance is set
+        :param upDirection: "x", "y" or "z", default "y"
+        :param worldUpDirection: "x", "y" or "z", default "y"
+        :param forwardDirection: "x", "y" or "z", default "x"
+        :param func/None progress: called with the stage and progress
+        :param func/None finished: called with the deferred run
+        :return: deferred run
+        :rtype: splineIK.utils.stage.DeferredRun
+        :raises ValueError: When the number of names and curves don't match
+        """
+        self.__validateBatch(names, curves)
+
+        def getStages():
+            return self.__createBatchStages(
+                names,
+                curves,
+                numJoints,
+                upDirection,
+                worldUpDirection,
+                forwardDirection
+            )
+
+        return self.__createDeferred(
+            getStages(),
+            curves,
+            lambda: stage.run(getStages()),
+            progress,
+            finished
+        )
+
+    # ------------------------------------------------------------------------
+
+    def createFromJoints(
+            self,
+            name,
+            joints,
+            numControls,
+            upDirection="y",
+            worldUpDirection="y",
+            forwardDirection="x"
+        ):
+        """
+        Create the spline IK on an existing joint chain. A bezier curve
+        with the provided number of controls is fitted through the joint
+        positions using least squares, the existing joints are then used
+        as the driven joints of the spline IK. The joints will be parented
+        to a new root joint and their joint orient will be reset. The
+        maximum deviation between the joints and the fitted curve can be
+        queried using the :attr:`SplineIK.fitError` property.
+
+        :param name: name that is used to prefix all nodes
+        :param joints: ordered list of joints to drive
+        :param numControls: number of controls, minimum of 2
+        :param upDirection: "x", "y" or "z", default "y"
+        :param worldUpDirection: "x", "y" or "z", default "y"
+        :param forwardDirection: "x", "y" or "z", default "x"
+        :raises ValueError: When less than 3 joints are provided
+        :raises ValueError: When a level of detail is set
+        :raises ValueError: When the transforms of a joint are locked or
+            already have an incoming connection
+        """
+        # validate
+        if len(joints) < 3:
+            raise ValueError("createFromJoints: at least 3 joints required!")
+        if self.lodNumJoints:
+            raise ValueError(
+                "createFromJoints: level of detail is not supported!"
+            )
+
+        # validate joints, the transforms of the joints are connected which
+        # fails halfway through the build when they are keyed, constrained
+        # or locked
+        blocked = []
+        for jnt in joints:
+            blocked.extend(
+                attribute.getBlockedAttributes(
+                    jnt,
+                    ["translate", "rotate", "scale", "jointOrient"]
+                )
+            )
+
+        if blocked:
+            raise ValueError(
+                "createFromJoints: joint attributes can't be driven, "
+                "{0}!".format(
+                    ", ".join(
+                        "{0} is {1}".format(path, reason)
+                        for path, reason in blocked
+                    )
+                )
+            )
+
+        # get joint positions
+        points = [
+            tuple(cmds.xform(jnt, q=True, ws=True, t=True))
+            for jnt in joints
+        ]
+
+        # fit curve
+        cvs, self._fitError = bezier.fitSpline(
+            points,
+            max(numControls, 2) - 1
+        )
+
+        with undo.UndoChunkContext():
+            crv, _ = curve.createBezierCurve("{0}_crv".format(name), cvs)
+
+            # create spline ik on driven joints
+            self._drivenJoints = joints
+            try:
+                self.create(
+                    name,
+                    crv,
+                    len(joints),
+                    upDirection=upDirection,
+                    worldUpDirection=worldUpDirection,
+                    forwardDirection=forwardDirection
+                )
+            finally:
+                self._drivenJoints = None
+
+            # the fitted curve is part of the spline IK
+            self.__addToContainer([crv])
+
+        return self.rootControl
+
+    # ------------------------------------------------------------------------
+
+    def updateJointCount(self, numJoints):
+        """
+        Update the number of joints of a created spline IK without
+        rebuilding it. The joint parameters and weights are recalculated,
+        only the per joint networks ( follicle, up vector, stretch
+        segment, slide ramp and scale constraint ) of the joints that are
+        added or removed are created or deleted. The controls and clusters
+        are left untouched. Every remaining joint is still updated in
+        place, its parameter, weights, scale constraint and scale reader
+        are reset, which means the cost of an update grows with the total
+        number of joints. The scale readers are read from the current
+        positions on the curve, so the controls are expected to be in
+        their rest pose.
+
+        :param int numJoints: new number of joints, minimum of 3
+        :raises ValueError: When the spline IK is not created
+        :raises ValueError: When the number of joints is lower than 3
+        :raises ValueError: When a level of detail is used
+        :raises ValueError: When created from existing joints
+        :raises ValueError: When the joints are cached
+        :raises ValueError: When the output is not joints
+        """
+        # validate
+        if self.deformerNode or self.matrices:
+            raise ValueError(
+                "updateJointCount: only joint output is supported!"
+            )
+        if not self.rootJoint or not cmds.objExists(self.rootJoint):
+            raise ValueError("updateJointCount: spline ik not created!")
+        if numJoints < 3:
+            raise ValueError("updateJointCount: at least 3 joints required!")
+        if self.lowJoints:
+            raise ValueError(
+                "updateJointCount: level of detail is not supported!"
+            )
+        if self._fromJoints:
+            raise ValueError(
+                "updateJointCount: joints created from existing joints!"
+            )
+        if self.cacheNode:
+            raise ValueError("updateJointCount: cache is not supported!")
+
+        # variables
+        num = len(self.joints)
+        if num == numJoints:
+            return
+
+        with undo.UndoChunkContext(), track.NodeTracker() as tracker:
             # get parameters
+            self.numJoints = numJoints
             self.cParameters, self.jParameters = self.__getParameters()
-            
+
             # get weight mapping between clusters and locators
+            weights = self.weights
             self.weights = self.__getWeighting()
-            
-            # create up vectors
-            self.blends, self.ups = self.__createUpVectors()
-            
-            # create point on curves
-            self.pointOnCurves, \
-            self.aimOnCurves = self.__createPointOnCurves()
-            
-            # create joints
-            self._rootJoint, self._joints = self.__createJoints()
-            
-            # create scale readers
-            self.scaleReaders = self.__createScaleReaders()
-            self.scaleConstraints = self.__connectJoints()
-            
-            # create stretch and squash
-            self.__createStretchAndSquash()
-            
-            # create slide
-            self.__createSlide()
-            
+
+            # remove slide from joints that will become the last joint
+            if self.slide:
+                for i in range(numJoints - 1, num - 1):
+                    self.__removeSlideJoint(i)
+
+            # remove stretch segments and joints
+            if self.stretchAndSquash:
+                for i in reversed(range(numJoints - 1, num - 1)):
+                    self.__removeStretchSegment(i)
+
+            for i in reversed(range(numJoints, num)):
+                self.__removeJoint(i)
+
+            # update remaining joints
+            for i in range(min(num, numJoints)):
+                self.__updateJoint(i, weights[i])
+
+            # add joints
+            for i in range(num, numJoints):
+                self.__addJoint(i)
+
+            # add stretch segments and connect the joints of which the
+            # segment changed
+            if self.stretchAndSquash:
+                for i in range(num - 1, numJoints - 1):
+                    self.__addStretchSegment(i)
+                for i in range(min(num, numJoints) - 1, numJoints):
+                    self.__connectStretchSegment(i)
+
+            # add slide to joints that are no longer the last joint
+            if self.slide:
+                for i in range(num - 1, numJoints - 1):
+                    self.__addSlideJoint(i)
+
+            # store created nodes in the container
+            self.__addToContainer(tracker.nodes)
+
+    def rebindCurve(self, newCurve):
+        """
+        Swap the curve of a created spline IK without rebuilding it. The
+        new curve is converted to a bezier curve and refitted to the same
+        number of controls when the number of control points doesn't
+        match. The clusters are recreated on the new curve and all nodes
+        reading the original curve are reconnected to the new curve. The
+        controls are moved to the new rest positions, after which the
+        joint parameters, weights and rest lengths are recalculated. The
+        controls and joints stay in place, the original curve is left in
+        the scene without clusters. The controls are expected to be in
+        their rest pose.
+
+        :param str newCurve:
+        :raises ValueError: When the spline IK is not created
+        :raises ValueError: When a level of detail is used
+        :raises ValueError: When created from existing joints
+        :raises ValueError: When the joints are cached
+        :raises ValueError: When the output is not joints
+        """
+        # validate
+        if self.deformerNode or self.matrices:
+            raise ValueError("rebindCurve: only joint output is supported!")
+        if not self.rootJoint or not cmds.objExists(self.rootJoint):
+            raise ValueError("rebindCurve: spline ik not created!")
+        if self.lowJoints:
+            raise ValueError("rebindCurve: level of detail is not supported!")
+        if self._fromJoints:
+            raise ValueError(
+                "rebindCurve: joints created from existing joints!"
+            )
+        if self.cacheNode:
+            raise ValueError("rebindCurve: cache is not supported!")
+
+        # get original shape
+        curveShape = cmds.listRelatives(
+            self.curve,
+            s=True,
+            ni=True,
+            f=True
+        )[0]
+
+        with undo.UndoChunkContext():
+            # convert curve to bezier curve
+            curve.convertToBezierCurve(newCurve)
+
+            # refit curve to the same number of controls
+            if curve.numCVs(newCurve) != len(self.clusters):
+                self._fitError = curve.fitBezierCurve(
+                    newCurve,
+                    len(self.controls)
+                )
+
+            # remove the scale constraints driven by the clusters and the
+            # clusters of the original curve
+            cmds.delete(self.scaleConstraints + self.clusters)
+
+            # create clusters
+            self.curve = newCurve
+            with track.NodeTracker() as tracker:
+                self.clusters = cluster.clusterCurve(self.curve, self.name)
+                self.controlClusters = self.clusters[::3]
+
+                # reconnect curve
+                attribute.reconnectOutputs(
+                    "{0}.worldSpace".format(curveShape),
+                    "{0}.worldSpace[0]".format(
+                        cmds.listRelatives(self.curve, s=True, ni=True)[0]
+                    )
+                )
+
+                # recreate scale constraints
+                for i in range(len(self.joints)):
+                    self.scaleConstraints[i] = self.__createScaleConstraint(
+                        i,
+                        self.joints[i]
+                    )
+
+                # reconnect stretch segments
+                if self.stretchAndSquash:
+                    for i in range(len(self.joints)):
+                        self.__connectStretchSegment(i)
+
+                # update curve dependent values
+                self.__refresh()
+
+            # store created nodes in the container
+            self.__addToContainer(tracker.nodes)
+
+    # ------------------------------------------------------------------------
+
+    def select(self):
+        """
+        Select all nodes of the spline IK, the nodes are read from the
+        container.
+
+        :raises ValueError: When the spline IK is not created
+        """
+        # validate
+        if not self.container or not cmds.objExists(self.container):
+            raise ValueError("select: spline ik not created!")
+
+        cmds.select(container.getNodes(self.container))
+
+    def audit(self, path=None):
+        """
+        Audit all nodes of the spline IK for parallel evaluation, the
+        nodes are read from the container. The report contains the share
+        of the number of nodes that is scheduled in parallel, the nodes
+        that are not and the connected groups they form. When a path is
+        provided the report is stored as json, see
+        :mod:`splineIK.utils.audit`.
+
+        :param str/None path:
+        :return: report
+        :rtype: dict
+        :raises ValueError: When the spline IK is not created
+        """
+        # validate
+        if not self.container or not cmds.objExists(self.container):
+            raise ValueError("audit: spline ik not created!")
+
+        report = audit.auditNodes(container.getNodes(self.container))
+        report["name"] = self.name
+
+        if path:
+            audit.saveReport(report, path)
+
+        return report
+
+    def bindSkin(self, geometry, falloff=1.0, maxInfluences=4):
+        """
+        Bind geometry to the joints of the spline IK. All vertices are
+        projected onto the curve at once, the weights are calculated from
+        the distance between the closest parameter of a vertex and the
+        parameters of the joints. The falloff is the radius of a joint in
+        number of joints, with a falloff of one a vertex is weighted to
+        the two joints it lies in between. The weights are written in a
+        single call, see :mod:`splineIK.utils.skin`. The controls are
+        expected to be in their rest pose.
+
+        When the output is matrices the skin cluster is created without
+        influence objects, the matrices and bind pre matrices are connected
+        to the skin cluster directly.
+
+        :param list geometry: meshes or their transforms
+        :param float falloff: default 1
+        :param int maxInfluences: default 4
+        :return: skin clusters
+        :rtype: list
+        :raises ValueError: When the output is a deformer
+        :raises ValueError: When the spline IK is not created
+        :raises ValueError: When the falloff is not positive
+        :raises ValueError: When any of the geometry is not a mesh
+        """
+        # validate
+        if self.deformerNode:
+            raise ValueError("bindSkin: deformer output is not supported!")
+        if not self.rootJoint or not cmds.objExists(self.rootJoint):
+            raise ValueError("bindSkin: spline ik not created!")
+        if falloff <= 0:
+            raise ValueError("bindSkin: falloff should be positive!")
+
+        for geo in geometry:
+            skin.getMeshShape(geo)
+
+        with undo.UndoChunkContext():
+            if self.matrices:
+                return [
+                    skin.bindMatrices(
+                        geo,
+                        self.matrices,
+                        self.bindPreMatrices,
+                        self.curveShape,
+                        self.jParameters,
+                        falloff,
+                        maxInfluences
+                    )
+                    for geo in geometry
+                ]
+
+            return [
+                skin.bindSkin(
+                    geo,
+                    self.joints,
+                    self.curveShape,
+                    self.jParameters,
+                    falloff,
+                    maxInfluences
+                )
+                for geo in geometry
+            ]
+
+    def delete(self):
+        """
+        Delete all nodes of the spline IK in a single operation, the nodes
+        are read from the container. The curve is kept, when the spline IK
+        is created from existing joints the joints are kept as well and
+        parented to the world.
+
+        :raises ValueError: When the spline IK is not created
+        """
+        # validate
+        if not self.container or not cmds.objExists(self.container):
+            raise ValueError("delete: spline ik not created!")
+
+        with undo.UndoChunkContext():
+            # unparent the driven joints, the joints are not part of the
+            # spline IK and would be deleted with the root joint
+            if self._fromJoints:
+                cmds.parent(self.joints, world=True)
+
+            # delete nodes
+            self.__deleteNodes(
+                container.getNodes(self.container) + [self.container]
+            )
+
+        self._container = None
+
+    # ------------------------------------------------------------------------
+
+    def createTemplate(
+            self,
+            name,
+            curve_,
+            numJoints,
+            upDirection="y",
+            worldUpDirection="y",
+            forwardDirection="x"
+        ):
+        """
+        Create the spline IK and capture it as a template. All scene
+        operations of the build are recorded with role based node names,
+        together with the state of the spline IK. The template can be used
+        with :func:`SplineIK.createFromTemplate` to build the same rig
+        topology on other curves without repeating any of the planning.
+
+        :param name: name that is used to prefix all nodes
+        :param curve_: curve to attach the Spline IK to.
+        :param numJoints: number of joints to be distributed on the curve,
+            ignored when a joint tolerance is set
+        :param upDirection: "x", "y" or "z", default "y"
+        :param worldUpDirection: "x", "y" or "z", default "y"
+        :param forwardDirection: "x", "y" or "z", default "x"
+        :return: template
+        :rtype: splineIK.utils.trace.Trace
+        :raises ValueError: When a level of detail is set
+        :raises ValueError: When the output is not joints
+        """
+        # validate
+        if self.lodNumJoints:
+            raise ValueError(
+                "createTemplate: level of detail is not supported!"
+            )
+        if self.output != "joints":
+            raise ValueError(
+                "createTemplate: only joint output is supported!"
+            )
+
+        # create spline ik while recording
+        recordTrace = self.recordTrace
+        self.recordTrace = True
+        try:
+            self.create(
+                name,
+                curve_,
+                numJoints,
+                upDirection=upDirection,
+                worldUpDirection=worldUpDirection,
+                forwardDirection=forwardDirection
+            )
+        finally:
+            self.recordTrace = recordTrace
+
+        return self.trace
+
+    def createFromTemplate(self, template, name, curve_):
+        """
+        Create the spline IK from a template. The curve is converted to a
+        bezier curve and refitted when the number of control points
+        doesn't match the template. The recorded operations are replayed
+        in bulk, after which only the curve dependent values ( control
+        positions, joint parameters, weights and rest lengths ) are
+        updated. The settings of the template are used, which means the
+        settings of this instance are overwritten.
+
+        Example:
+        ::
+            template = SplineIK().createTemplate("tpl", curve, 10)
+            for i, crv in enumerate(curves):
+                SplineIK().createFromTemplate(template, "hair{0}".format(i), crv)
+
+        :param splineIK.utils.trace.Trace template: template or trace
+        :param name: name that is used to prefix all nodes
+        :param curve_: curve to attach the Spline IK to.
+        :return: root control
+        :rtype: str
+        :raises ValueError: When the template uses a level of detail
+        :raises RuntimeError: When the template uses the cache outside of
+            DG evaluation mode
+        """
+        # validate
+        if template.state.get("_lowJoints"):
+            raise ValueError(
+                "createFromTemplate: level of detail is not supported!"
+            )
+
+        with undo.UndoChunkContext():
+            # convert curve to bezier curve
+            curve.convertToBezierCurve(curve_)
+
+            # refit curve to the same number of controls
+            fitError = None
+            numCVs = template.topology["numCVs"]
+            if curve.numCVs(curve_) != numCVs:
+                fitError = curve.fitBezierCurve(curve_, (numCVs - 1) // 3 + 1)
+
+            # load cache plug-in, the cache node is created by the replay
+            if template.state.get("_evaluationCache"):
+                if not cache.isEvaluationModeSupported():
+                    raise RuntimeError(
+                        "createFromTemplate: the cache requires DG "
+                        "evaluation mode!"
+                    )
+
+                cache.loadPlugin()
+
+            # replay template
+            with track.NodeTracker() as tracker:
+                self.__dict__.update(template.replay(name, curve_))
+                self._fitError = fitError
+
+                # update curve dependent values
+                self.__refresh()
+
+            # store all created nodes in a container
+            self._container = None
+            self.__addToContainer(tracker.nodes)
+
         return self.rootControl
+
+    # ------------------------------------------------------------------------
+
+    def plan(
+            self,
+            name,
+            curve_,
+            numJoints,
+            upDirection="y",
+            worldUpDirection="y",
+            forwardDirection="x"
+        ):
+        """
+        Plan the spline IK without creating it. The nodes and connections
+        that :func:`SplineIK.create` would make are returned grouped per
+        subsystem ( controls, up vectors, follicles, stretch and slide )
+        together with their counts and an estimated relative evaluation
+        cost. The scene and the curve are not changed, the parameters,
+        weights, control positions and orientations are stored in the
+        data of the plan. When the curve is refitted the number of joints,
+        parameters and orientations are calculated on a temporary fitted
+        copy of the curve, the same as create calculates them after the
+        curve is refitted.
+
+        Example:
+        ::
+            p = SplineIK().plan("spine", curve, 20)
+            p.counts["subsystems"]["stretch"]["nodes"]
+            p.cost["total"]
+
+        :param name: name that is used to prefix all nodes
+        :param curve_: curve to plan the Spline IK on.
+        :param numJoints: number of joints to be distributed on the curve,
+            ignored when a joint tolerance is set
+        :param upDirection: "x", "y" or "z", default "y"
+        :param worldUpDirection: "x", "y" or "z", default "y"
+        :param forwardDirection: "x", "y" or "z", default "x"
+        :return: plan
+        :rtype: splineIK.utils.plan.Plan
+        :raises ValueError: When the fitted curve is periodic
+        :raises ValueError: When span evaluation is used with slide
+        :raises ValueError: When the output is not joints
+        """
+        # store state, the planner uses the same variables as the build
+        state = dict(self.__dict__)
+
+        try:
+            # variables
+            self.name = name
+            self.curve = curve_
+            self.numJoints = numJoints
+            self.upDirection = upDirection
+            self.forwardDirection = forwardDirection
+
+            # vector variables
+            self.upVector = math.convertAxisToVector(upDirection)
+            self.aimVector = math.convertAxisToVector(forwardDirection)
+            self.worldUpVector = math.convertAxisToVector(worldUpDirection)
+            self._drivenJoints = None
+
+            # validate span evaluation
+            if self.spanEvaluation and self.slide:
+                raise ValueError(
+                    "plan: span evaluation doesn't support slide!"
+                )
+
+            # validate output
+            if self.output != "joints":
+                raise ValueError("plan: only joint output is supported!")
+
+            # get control positions
+            positions, cvs, fitError = self.__getPlanControlPositions()
+
+            # get curve dependent values, when the curve is refitted they
+            # are calculated on a fitted copy of the curve as create
+            # calculates them after the curve is refitted
+            original = self.curve
+            if cvs:
+                self.curve = self.__createPlanCurve(cvs)
+
+            try:
+                # get number of joints from tolerance
+                if self.jointTolerance:
+                    self.numJoints = curve.recommendNumJoints(
+                        self.curveShape,
+                        self.jointTolerance,
+                        self.__getDistributionBias()
+                    )
+
+                # get parameters, for every joint set when a level of
+                # detail is used
+                numJoints = self.numJoints
+                parameters = []
+                for num in (
+                    [self.lodNumJoints, numJoints]
+                    if self.lodNumJoints
+                    else [numJoints]
+                ):
+                    self.numJoints = num
+                    parameters.append(self.__getParameters(len(positions)))
+
+                self.numJoints = numJoints
+
+                # get orientations
+                orientations = [
+                    self.__getOrientation(pos) if orient else [0, 0, 0]
+                    for pos, orient in zip(
+                        [positions[0]] + positions,
+                        [self.orientRootToCurve] +
+                        [self.orientToCurve] * len(positions)
+                    )
+                ]
+            finally:
+                if cvs:
+                    self.__deletePlanCurve(self.curve)
+                    self.curve = original
+
+            # plan controls
+            p = plan.Plan()
+            rootControl, controls, reads, clusters = self.__planControls(
+                p,
+                len(positions)
+            )
+
+            # plan slide
+            slide = None
+            if self.slide:
+                slide = self.__planSlide(p, rootControl)
+
+            # plan span curves
+            if self.spanEvaluation:
+                self._spanCurves, self._spanKnots = self.__planSpanCurves(
+                    p,
+                    clusters
+                )
+
+            # plan joint network
+            if self.lodNumJoints:
+                self.__planLod(
+                    p,
+                    rootControl,
+                    reads,
+                    clusters,
+                    slide,
+                    parameters
+                )
+
+            self.cParameters, self.jParameters = parameters[-1]
+            self.weights = self.__getWeighting()
+
+            if not self.lodNumJoints:
+                self.__planJointNetwork(
+                    p,
+                    rootControl,
+                    reads,
+                    clusters,
+                    slide
+                )
+
+            # store data
+            p.data.update({
+                "numControls": len(positions),
+                "numJoints": self.numJoints,
+                "fitError": fitError,
+                "controlParameters": self.cParameters,
+                "parameters": self.jParameters,
+                "weights": self.weights,
+                "positions": [list(pos) for pos in positions],
+                "rootOrientation": orientations[0],
+                "orientations": orientations[1:],
+            })
+
+            return p
+        finally:
+            self.__dict__.clear()
+            self.__dict__.update(state)
+
+    def previewJoints(self, curve_, numJoints, upDirection="y"):
+        """
+        Get the positions and orientations of the joints without creating
+        the spline IK. The same joint distribution settings are used as
+        :func:`SplineIK.create`, the scene and the curve are not changed.
+        The curve is evaluated directly without any nodes, which makes it
+        fast enough to be called interactively. The orientation of each
+        joint is returned as the forward and up vector in world space.
+
+        :param curve_: curve to preview the joints on.
+        :param numJoints: number of joints to be distributed on the curve,
+            ignored when a joint tolerance is set
+        :param upDirection: "x", "y" or "z", default "y"
+        :return: positions, forward vectors, up vectors
+        :rtype: tuple
+        """
+        # store state, the preview uses the same variables as the build
+        state = dict(self.__dict__)
+
+        try:
+            # variables
+            self.curve = curve_
+            self.numJoints = numJoints
+            self.upVector = math.convertAxisToVector(upDirection)
+            self._drivenJoints = None
+
+            # get number of joints from tolerance
+            if self.jointTolerance:
+                self.numJoints = curve.recommendNumJoints(
+                    self.curveShape,
+                    self.jointTolerance,
+                    self.__getDistributionBias()
+                )
+
+            # get positions
+            positions, forwards = curve.getPointsAtParameters(
+                self.curveShape,
+                self.__getJointParameters()
+            )
+
+            # get ups
+            ups = []
+            for forward in forwards:
+                up = self.__getCurveUp(OpenMaya.MVector(*forward))
+                ups.append((up.x, up.y, up.z))
+
+            return positions, forwards, ups
+        finally:
+            self.__dict__.clear()
+            self.__dict__.update(state)
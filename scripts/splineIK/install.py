@@ -19,12 +19,15 @@ SHELF_TOOL = {
 # ----------------------------------------------------------------------------
 
 
-def shelf():
+def shelf(replace=True):
     """
     Add a new shelf in Maya with the tools that is provided in the SHELF_TOOL
     variable. If the tab exists it will be checked to see if the button is
     already added. If this is the case the previous button will be deleted and
-    a new one will be created in its place.
+    a new one will be created in its place. When replace is disabled an
+    existing button is kept and nothing is changed.
+
+    :param bool replace: replace an existing button
     """
     # get top shelf
     gShelfTopLevel = mel.eval("$tmpVar=$gShelfTopLevel")
@@ -42,6 +45,9 @@ def shelf():
 
     # delete existing button
     if SHELF_TOOL.get("label") in labels:
+        if not replace:
+            return
+
         index = labels.index(SHELF_TOOL.get("label"))
         cmds.deleteUI(names[index])
 
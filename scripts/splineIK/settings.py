@@ -16,6 +16,34 @@ class Settings(object):
     * orientToCurve
     * orientRootToCurve
 
+    * twistBlending
+
+    * stretchAndSquash
+    * slide
+
+    * lodNumJoints
+
+    * jointDistribution
+    * curvatureBias
+    * jointTolerance
+
+    * maxControls
+    * fitTolerance
+
+    * recordTrace
+
+    * undoLight
+
+    * offsetParentMatrix
+
+    * spanEvaluation
+
+    * evaluationCache
+    * evaluationCacheSize
+
+    * output
+    * geometry
+
     Available shapes and colours can be found in the following module.
     :mod:`rjSplineIK.utils.controlShape`
     :mod:`rjSplineIK.utils.colour`
@@ -35,6 +63,45 @@ class Settings(object):
         self._orientToCurve = True
         self._orientRootToCurve = False
 
+        # default up vector variables
+        self._twistBlending = False
+
+        # default subsystem variables
+        self._stretchAndSquash = True
+        self._slide = True
+
+        # default level of detail variables
+        self._lodNumJoints = None
+
+        # default distribution variables
+        self._jointDistribution = "length"
+        self._curvatureBias = 0.75
+        self._jointTolerance = None
+
+        # default fit variables
+        self._maxControls = None
+        self._fitTolerance = None
+
+        # default trace variables
+        self._recordTrace = False
+
+        # default undo variables
+        self._undoLight = False
+
+        # default offset parent matrix variables
+        self._offsetParentMatrix = False
+
+        # default evaluation variables
+        self._spanEvaluation = False
+
+        # default cache variables
+        self._evaluationCache = False
+        self._evaluationCacheSize = 1000
+
+        # default output variables
+        self._output = "joints"
+        self._geometry = []
+
     # --------------------------------------------------------------------
 
     def getRootControlShape(self):
@@ -120,3 +187,174 @@ class Settings(object):
     @orientToCurve.setter
     def orientToCurve(self, value):
         self._orientToCurve = value
+
+    # --------------------------------------------------------------------
+
+    @property
+    def twistBlending(self):
+        return self._twistBlending
+
+    @twistBlending.setter
+    def twistBlending(self, value):
+        self._twistBlending = value
+
+    # --------------------------------------------------------------------
+
+    @property
+    def stretchAndSquash(self):
+        return self._stretchAndSquash
+
+    @stretchAndSquash.setter
+    def stretchAndSquash(self, value):
+        self._stretchAndSquash = value
+
+    @property
+    def slide(self):
+        return self._slide
+
+    @slide.setter
+    def slide(self, value):
+        self._slide = value
+
+    # --------------------------------------------------------------------
+
+    @property
+    def lodNumJoints(self):
+        return self._lodNumJoints
+
+    @lodNumJoints.setter
+    def lodNumJoints(self, value):
+        self._lodNumJoints = value
+
+    # --------------------------------------------------------------------
+
+    @property
+    def jointDistribution(self):
+        return self._jointDistribution
+
+    @jointDistribution.setter
+    def jointDistribution(self, value):
+        if value not in ["length", "curvature"]:
+            raise ValueError(
+                "Joint distribution should be 'length' or 'curvature'!"
+            )
+
+        self._jointDistribution = value
+
+    @property
+    def curvatureBias(self):
+        return self._curvatureBias
+
+    @curvatureBias.setter
+    def curvatureBias(self, value):
+        self._curvatureBias = value
+
+    @property
+    def jointTolerance(self):
+        return self._jointTolerance
+
+    @jointTolerance.setter
+    def jointTolerance(self, value):
+        self._jointTolerance = value
+
+    # --------------------------------------------------------------------
+
+    @property
+    def maxControls(self):
+        return self._maxControls
+
+    @maxControls.setter
+    def maxControls(self, value):
+        if value is not None and value < 2:
+            raise ValueError("Maximum controls should be at least 2!")
+
+        self._maxControls = value
+
+    @property
+    def fitTolerance(self):
+        return self._fitTolerance
+
+    @fitTolerance.setter
+    def fitTolerance(self, value):
+        self._fitTolerance = value
+
+    # --------------------------------------------------------------------
+
+    @property
+    def recordTrace(self):
+        return self._recordTrace
+
+    @recordTrace.setter
+    def recordTrace(self, value):
+        self._recordTrace = value
+
+    # --------------------------------------------------------------------
+
+    @property
+    def undoLight(self):
+        return self._undoLight
+
+    @undoLight.setter
+    def undoLight(self, value):
+        self._undoLight = value
+
+    # --------------------------------------------------------------------
+
+    @property
+    def offsetParentMatrix(self):
+        return self._offsetParentMatrix
+
+    @offsetParentMatrix.setter
+    def offsetParentMatrix(self, value):
+        self._offsetParentMatrix = value
+
+    # --------------------------------------------------------------------
+
+    @property
+    def spanEvaluation(self):
+        return self._spanEvaluation
+
+    @spanEvaluation.setter
+    def spanEvaluation(self, value):
+        self._spanEvaluation = value
+
+    # --------------------------------------------------------------------
+
+    @property
+    def evaluationCache(self):
+        return self._evaluationCache
+
+    @evaluationCache.setter
+    def evaluationCache(self, value):
+        self._evaluationCache = value
+
+    @property
+    def evaluationCacheSize(self):
+        return self._evaluationCacheSize
+
+    @evaluationCacheSize.setter
+    def evaluationCacheSize(self, value):
+        self._evaluationCacheSize = value
+
+    # --------------------------------------------------------------------
+
+    @property
+    def output(self):
+        return self._output
+
+    @output.setter
+    def output(self, value):
+        if value not in ["joints", "deformer", "matrices"]:
+            raise ValueError(
+                "Output should be 'joints', 'deformer' or 'matrices'!"
+            )
+
+        self._output = value
+
+    @property
+    def geometry(self):
+        return self._geometry
+
+    @geometry.setter
+    def geometry(self, value):
+        self._geometry = value
@@ -44,6 +44,72 @@ def addSpacerAttr(node, attr="controls"):
 # ----------------------------------------------------------------------------
 
 
+def reconnectOutputs(source, target):
+    """
+    Move all of the outgoing connections of the source attribute to the
+    target attribute. Existing connections of the destinations are
+    replaced.
+
+    :param str source: (eg. curveShape.worldSpace)
+    :param str target: (eg. curveShape.worldSpace[0])
+    :return: reconnected destination attributes
+    :rtype: list
+    """
+    connections = cmds.listConnections(
+        source,
+        source=False,
+        destination=True,
+        plugs=True,
+        skipConversionNodes=True
+    ) or []
+
+    for destination in connections:
+        cmds.connectAttr(target, destination, force=True)
+
+    return connections
+
+
+def getBlockedAttributes(node, attrs):
+    """
+    Get the attributes of a node that can't be driven by a connection. An
+    attribute is blocked when it or one of its children is locked or
+    already has an incoming connection, for example from keys or a
+    constraint.
+
+    :param str node:
+    :param list attrs: (eg. ["translate", "rotate"])
+    :return: blocked attributes and the reason they are blocked
+    :rtype: list
+    """
+    blocked = []
+    for attr in attrs:
+        path = "{0}.{1}".format(node, attr)
+        paths = [path] + [
+            "{0}.{1}".format(node, child)
+            for child in cmds.attributeQuery(
+                attr,
+                node=node,
+                listChildren=True
+            ) or []
+        ]
+
+        for p in paths:
+            if cmds.getAttr(p, lock=True):
+                blocked.append((p, "locked"))
+            elif cmds.listConnections(
+                p,
+                source=True,
+                destination=False,
+                skipConversionNodes=False
+            ):
+                blocked.append((p, "connected"))
+
+    return blocked
+
+
+# ----------------------------------------------------------------------------
+
+
 def enumStringToValue(attr, lowercase=False):
     """
     Creates a dictionary mapper for enum values. This util can be used
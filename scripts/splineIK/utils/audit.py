@@ -0,0 +1,330 @@
+"""
+Audit the nodes of a rig for parallel evaluation. Every node gets the
+scheduling type the evaluation manager uses for its node type, nodes that
+don't schedule in parallel are reported together with the reason. Nodes
+that don't schedule in parallel and are connected in the dependency graph
+are grouped, these groups are not the clusters of the evaluation graph
+but show which serial nodes depend on each other. Node types that are
+known to be risky are reported separately, as the evaluation manager
+doesn't schedule them differently. The share of nodes that schedule in
+parallel is a node count, not a measure of evaluation cost. The report
+only contains builtin types, which means it can be stored as json and
+compared in continuous integration.
+
+report = auditNodes(nodes)
+saveReport(report, path)
+"""
+import json
+from maya import cmds
+
+
+PARALLEL = "parallel"
+SERIAL = "serial"
+GLOBALLY_SERIAL = "globallySerial"
+UNTRUSTED = "untrusted"
+
+SCHEDULING_TYPES = [PARALLEL, SERIAL, GLOBALLY_SERIAL, UNTRUSTED]
+SCHEDULING_FLAGS = {
+    "nodeTypeSerialize": SERIAL,
+    "nodeTypeGloballySerialize": GLOBALLY_SERIAL,
+    "nodeTypeUntrusted": UNTRUSTED,
+}
+
+# node types that are known to be risky in the animation graph, these are
+# reported as risks and don't change the scheduling type of the node
+NODE_TYPE_RISKS = {
+    "expression": "expressions run python or mel during evaluation",
+    "script": "script nodes run python or mel during evaluation",
+    "ramp": "texture nodes are not designed for animation evaluation",
+}
+
+REPORT_VERSION = 2
+
+
+# ----------------------------------------------------------------------------
+
+
+def getSchedulingOverrides():
+    """
+    Get the node types with a scheduling override from the evaluation
+    manager. Maya versions without parallel evaluation return an empty
+    dictionary.
+
+    :return: scheduling type per node type
+    :rtype: dict
+    """
+    overrides = {}
+    for flag, scheduling in SCHEDULING_FLAGS.items():
+        try:
+            nodeTypes = cmds.evaluationManager(query=True, **{flag: True})
+        except (RuntimeError, TypeError):
+            continue
+
+        if not isinstance(nodeTypes, (list, tuple)):
+            continue
+
+        for nodeType in nodeTypes:
+            overrides[nodeType] = scheduling
+
+    return overrides
+
+
+def getEvaluationMode():
+    """
+    :return: evaluation mode, None when it can't be queried
+    :rtype: str/None
+    """
+    try:
+        mode = cmds.evaluationManager(query=True, mode=True)
+    except (RuntimeError, TypeError):
+        return None
+
+    return mode[0] if isinstance(mode, (list, tuple)) else mode
+
+
+def getScheduling(node, overrides=None):
+    """
+    Get the scheduling type of a node and the reason it doesn't schedule
+    in parallel, the scheduling type is read from the overrides of the
+    evaluation manager. The inherited node types are checked as well, so
+    overrides on a base type are respected.
+
+    :param str node:
+    :param dict/None overrides: scheduling type per node type
+    :return: scheduling type, reason
+    :rtype: tuple
+    """
+    overrides = overrides or {}
+    nodeTypes = cmds.nodeType(node, inherited=True) or [cmds.nodeType(node)]
+
+    for nodeType in reversed(nodeTypes):
+        if nodeType in overrides and overrides[nodeType] != PARALLEL:
+            return (
+                overrides[nodeType],
+                "{0} is scheduled as {1} by the evaluation manager".format(
+                    nodeType,
+                    overrides[nodeType]
+                )
+            )
+
+    return PARALLEL, None
+
+
+def getRisk(node):
+    """
+    :param str node:
+    :return: reason the node type is risky, None if it isn't
+    :rtype: str/None
+    """
+    nodeTypes = cmds.nodeType(node, inherited=True) or [cmds.nodeType(node)]
+    for nodeType in reversed(nodeTypes):
+        if nodeType in NODE_TYPE_RISKS:
+            return NODE_TYPE_RISKS[nodeType]
+
+    return None
+
+
+# ----------------------------------------------------------------------------
+
+
+def getParentedConstraints(nodes):
+    """
+    Get the constraints that are parented under a node they drive. The
+    constraint then depends on the parent inverse matrix of the node it
+    drives, which can cause cycles when the hierarchy changes.
+
+    :param list nodes:
+    :return: constraints
+    :rtype: list
+    """
+    constraints = []
+    for node in cmds.ls(nodes, type="constraint") or []:
+        parent = cmds.listRelatives(node, parent=True) or []
+        driven = cmds.listConnections(
+            node,
+            source=False,
+            destination=True
+        ) or []
+
+        if set(parent) & set(driven):
+            constraints.append(node)
+
+    return constraints
+
+
+def getDeformerChains(nodes):
+    """
+    Get the number of deformers that deform the same geometry. Deformers
+    on the same geometry are evaluated one after another, which means a
+    long chain can't be evaluated in parallel.
+
+    :param list nodes:
+    :return: number of deformers per geometry
+    :rtype: dict
+    """
+    chains = {}
+    for deformer in cmds.ls(nodes, type="geometryFilter") or []:
+        try:
+            geometry = cmds.deformer(deformer, query=True, geometry=True)
+        except RuntimeError:
+            continue
+
+        for shape in geometry or []:
+            chains[shape] = chains.get(shape, 0) + 1
+
+    return chains
+
+
+def getCycles(nodes):
+    """
+    :param list nodes:
+    :return: nodes that are part of a cycle
+    :rtype: list
+    """
+    if not nodes:
+        return []
+
+    try:
+        plugs = cmds.cycleCheck(nodes) or []
+    except RuntimeError:
+        return []
+
+    return sorted(set(plug.split(".")[0] for plug in plugs))
+
+
+def getConnectedGroups(nodes):
+    """
+    Group nodes that are connected in the dependency graph, the
+    connections to nodes outside of the provided nodes are ignored. The
+    groups are not the clusters of the evaluation graph.
+
+    :param list nodes:
+    :return: groups
+    :rtype: list
+    """
+    # variables
+    lookup = set(nodes)
+    groups = []
+    visited = set()
+
+    for node in nodes:
+        if node in visited:
+            continue
+
+        # walk connected nodes
+        group = []
+        stack = [node]
+        visited.add(node)
+
+        while stack:
+            current = stack.pop()
+            group.append(current)
+
+            connections = cmds.listConnections(
+                current,
+                source=True,
+                destination=True,
+                skipConversionNodes=True
+            ) or []
+            for connection in connections:
+                if connection in lookup and connection not in visited:
+                    visited.add(connection)
+                    stack.append(connection)
+
+        groups.append(sorted(group))
+
+    return groups
+
+
+# ----------------------------------------------------------------------------
+
+
+def auditNodes(nodes):
+    """
+    Audit nodes for parallel evaluation. The report contains the number
+    of nodes per scheduling type, the share of the number of nodes that
+    is scheduled in parallel and the groups of connected nodes that are
+    not. Risky node types, constraints parented under the nodes they
+    drive, long deformer chains and cycles are reported as well.
+
+    :param list nodes:
+    :return: report
+    :rtype: dict
+    """
+    # get existing nodes
+    nodes = cmds.ls(nodes) or []
+    overrides = getSchedulingOverrides()
+
+    # get scheduling
+    scheduling = dict((s, 0) for s in SCHEDULING_TYPES)
+    issues = []
+    risks = []
+    serialNodes = []
+
+    for node in nodes:
+        risk = getRisk(node)
+        if risk:
+            risks.append({
+                "node": node,
+                "type": cmds.nodeType(node),
+                "reason": risk,
+            })
+
+        schedulingType, reason = getScheduling(node, overrides)
+        scheduling[schedulingType] += 1
+
+        if schedulingType == PARALLEL:
+            continue
+
+        serialNodes.append(node)
+        issues.append({
+            "node": node,
+            "type": cmds.nodeType(node),
+            "scheduling": schedulingType,
+            "reason": reason,
+        })
+
+    # get groups of connected serial nodes
+    groups = getConnectedGroups(serialNodes)
+    sizes = sorted([len(group) for group in groups], reverse=True)
+
+    return {
+        "version": REPORT_VERSION,
+        "evaluationMode": getEvaluationMode(),
+        "nodes": len(nodes),
+        "scheduling": scheduling,
+        "parallelNodeShare": (
+            scheduling[PARALLEL] / float(max(len(nodes), 1))
+        ),
+        "serialGroups": {
+            "count": len(groups),
+            "sizes": sizes,
+            "largest": sizes[0] if sizes else 0,
+        },
+        "issues": issues,
+        "risks": risks,
+        "parentedConstraints": getParentedConstraints(nodes),
+        "deformerChains": getDeformerChains(nodes),
+        "cycles": getCycles(nodes),
+    }
+
+
+def saveReport(report, path):
+    """
+    Save an audit report to disk as json.
+
+    :param dict report:
+    :param str path:
+    """
+    with open(path, "w") as f:
+        json.dump(report, f, indent=4, sort_keys=True)
+
+
+def loadReport(path):
+    """
+    :param str path:
+    :return: report
+    :rtype: dict
+    """
+    with open(path, "r") as f:
+        return json.load(f)
@@ -0,0 +1,478 @@
+"""
+Fit piecewise cubic bezier curves to a list of ordered points. All
+functions in this module operate on points and vectors stored as tuples,
+this means they don't rely on the scene and can be used outside of Maya's
+main thread. The least squares fit of a segment is solved vectorized over
+all of its points when NumPy is available, without NumPy the points are
+processed one by one.
+"""
+from __future__ import absolute_import
+from math import sqrt
+
+from . import projection
+
+
+numpy = projection.numpy
+
+
+# ----------------------------------------------------------------------------
+
+
+def add(a, b):
+    return a[0] + b[0], a[1] + b[1], a[2] + b[2]
+
+
+def sub(a, b):
+    return a[0] - b[0], a[1] - b[1], a[2] - b[2]
+
+
+def scale(a, s):
+    return a[0] * s, a[1] * s, a[2] * s
+
+
+def dot(a, b):
+    return a[0] * b[0] + a[1] * b[1] + a[2] * b[2]
+
+
+def length(a):
+    return sqrt(dot(a, a))
+
+
+def normalize(a):
+    l = length(a)
+    if l < 1e-12:
+        return a
+
+    return scale(a, 1.0 / l)
+
+
+# ----------------------------------------------------------------------------
+
+
+def evaluate(cvs, u):
+    """
+    Evaluate a single cubic bezier segment at parameter u.
+
+    :param list cvs: 4 control points
+    :param float u: between 0-1
+    :return: point
+    :rtype: tuple
+    """
+    v = 1.0 - u
+    b = [v * v * v, 3 * u * v * v, 3 * u * u * v, u * u * u]
+
+    return tuple(sum(b[i] * cvs[i][j] for i in range(4)) for j in range(3))
+
+
+def derivatives(cvs, u):
+    """
+    Get the first and second derivative of a cubic bezier segment at
+    parameter u.
+
+    :param list cvs: 4 control points
+    :param float u: between 0-1
+    :return: first and second derivative
+    :rtype: tuple
+    """
+    v = 1.0 - u
+    d1 = [sub(cvs[i + 1], cvs[i]) for i in range(3)]
+    d2 = [sub(d1[i + 1], d1[i]) for i in range(2)]
+
+    first = add(
+        add(scale(d1[0], 3 * v * v), scale(d1[1], 6 * u * v)),
+        scale(d1[2], 3 * u * u)
+    )
+    second = add(scale(d2[0], 6 * v), scale(d2[1], 6 * u))
+
+    return first, second
+
+
+def evaluateNumpy(cvs, parameters):
+    """
+    :param numpy.ndarray cvs: 4 control points
+    :param numpy.ndarray parameters: between 0-1
+    :return: points
+    :rtype: numpy.ndarray
+    """
+    u = parameters[:, None]
+    v = 1.0 - u
+
+    return (
+        v * v * v * cvs[0] + 3 * u * v * v * cvs[1] +
+        3 * u * u * v * cvs[2] + u * u * u * cvs[3]
+    )
+
+
+def evaluateSpline(cvs, parameter):
+    """
+    Evaluate a piecewise cubic bezier spline at a parameter. The parameter
+    range of the spline matches the parameter range of a bezier curve in
+    Maya, where each segment spans a parameter range of one.
+
+    :param list cvs: 3n+1 control points
+    :param float parameter: between 0-n
+    :return: point
+    :rtype: tuple
+    """
+    num = (len(cvs) - 1) // 3
+    index = min(max(int(parameter), 0), num - 1)
+
+    return evaluate(cvs[index * 3:index * 3 + 4], parameter - index)
+
+
+# ----------------------------------------------------------------------------
+
+
+def getChordParameters(points):
+    """
+    Get the normalized chord length parameters of a list of points.
+
+    :param list points:
+    :return: parameters between 0-1
+    :rtype: list
+    """
+    parameters = [0.0]
+    for i in range(len(points) - 1):
+        parameters.append(
+            parameters[-1] + length(sub(points[i + 1], points[i]))
+        )
+
+    total = parameters[-1] or 1.0
+    return [p / total for p in parameters]
+
+
+def getEndTangent(p0, p1, p2):
+    """
+    Estimate the tangent at the first of three ordered points using a
+    second order one-sided difference. The difference is the derivative
+    of the parabola through the points, parameterized by chord length.
+
+    :param tuple p0:
+    :param tuple p1:
+    :param tuple p2:
+    :return: tangent
+    :rtype: tuple
+    """
+    h1 = length(sub(p1, p0))
+    h2 = length(sub(p2, p1))
+    if h1 < 1e-12 or h2 < 1e-12:
+        return normalize(sub(p1, p0))
+
+    w0 = -(2 * h1 + h2) / (h1 * (h1 + h2))
+    w1 = (h1 + h2) / (h1 * h2)
+    w2 = -h1 / (h2 * (h1 + h2))
+
+    return normalize(add(add(scale(p0, w0), scale(p1, w1)), scale(p2, w2)))
+
+
+def getTangents(points):
+    """
+    Estimate the normalized tangents of a list of ordered points using
+    central differences. The tangents at the ends use a second order
+    one-sided difference, as a first order difference is noticeably off
+    on curved input.
+
+    :param list points:
+    :return: tangents
+    :rtype: list
+    """
+    tangents = []
+    num = len(points)
+
+    for i in range(num):
+        a = points[max(i - 1, 0)]
+        b = points[min(i + 1, num - 1)]
+        tangents.append(normalize(sub(b, a)))
+
+    if num > 2:
+        tangents[0] = getEndTangent(points[0], points[1], points[2])
+        tangents[-1] = scale(
+            getEndTangent(points[-1], points[-2], points[-3]),
+            -1
+        )
+
+    return tangents
+
+
+# ----------------------------------------------------------------------------
+
+
+def getTangentMagnitudes(c00, c01, c11, x0, x1, chord):
+    """
+    Solve the normal equations of the tangent magnitudes of a segment, the
+    magnitudes fall back to a third of the chord length when the system
+    is singular or a magnitude isn't positive.
+
+    :param float c00:
+    :param float c01:
+    :param float c11:
+    :param float x0:
+    :param float x1:
+    :param float chord: distance between the end points of the segment
+    :return: tangent magnitudes
+    :rtype: tuple
+    """
+    det = c00 * c11 - c01 * c01
+    alpha1 = alpha2 = 0
+    if abs(det) > 1e-12:
+        alpha1 = (x0 * c11 - x1 * c01) / det
+        alpha2 = (c00 * x1 - c01 * x0) / det
+
+    if alpha1 < 1e-6 * chord or alpha2 < 1e-6 * chord:
+        alpha1 = alpha2 = chord / 3.0
+
+    return alpha1, alpha2
+
+
+def fitSegmentNumpy(points, parameters, tangent1, tangent2, iterations=2):
+    """
+    :param list points:
+    :param list parameters: between 0-1
+    :param tuple tangent1: tangent at the start of the segment
+    :param tuple tangent2: tangent at the end of the segment
+    :param int iterations: number of reparameterization iterations
+    :return: control points, maximum error
+    :rtype: tuple
+    """
+    # variables
+    points = numpy.asarray(points, dtype=float)
+    u = numpy.array(parameters, dtype=float)
+    p0 = points[0]
+    p3 = points[-1]
+    t1 = numpy.asarray(normalize(tangent1), dtype=float)
+    t2 = -numpy.asarray(normalize(tangent2), dtype=float)
+    chord = float(numpy.linalg.norm(p3 - p0))
+
+    for iteration in range(iterations + 1):
+        # build normal equations
+        v = 1.0 - u
+        b0, b1, b2, b3 = v * v * v, 3 * u * v * v, 3 * u * u * v, u * u * u
+
+        a1 = b1[:, None] * t1
+        a2 = b2[:, None] * t2
+        tmp = points - (b0 + b1)[:, None] * p0 - (b2 + b3)[:, None] * p3
+
+        # solve tangent magnitudes
+        alpha1, alpha2 = getTangentMagnitudes(
+            float((a1 * a1).sum()),
+            float((a1 * a2).sum()),
+            float((a2 * a2).sum()),
+            float((a1 * tmp).sum()),
+            float((a2 * tmp).sum()),
+            chord
+        )
+
+        cvs = numpy.array([p0, p0 + t1 * alpha1, p3 + t2 * alpha2, p3])
+
+        if iteration == iterations:
+            break
+
+        # reparameterize
+        d1 = cvs[1:] - cvs[:-1]
+        d2 = d1[1:] - d1[:-1]
+        w = (1.0 - u)[:, None]
+        x = u[:, None]
+
+        diff = evaluateNumpy(cvs, u) - points
+        first = 3 * (w * w * d1[0] + 2 * x * w * d1[1] + x * x * d1[2])
+        second = 6 * (w * d2[0] + x * d2[1])
+        denominator = (
+            (first * first).sum(axis=1) + (diff * second).sum(axis=1)
+        )
+
+        valid = numpy.abs(denominator) > 1e-12
+        step = (diff * first).sum(axis=1) / numpy.where(valid, denominator, 1)
+        u = numpy.where(valid, numpy.clip(u - step, 0.0, 1.0), u)
+
+    # get error
+    error = numpy.linalg.norm(evaluateNumpy(cvs, u) - points, axis=1).max()
+
+    return [tuple(cv) for cv in cvs.tolist()], float(error)
+
+
+def fitSegment(points, parameters, tangent1, tangent2, iterations=2):
+    """
+    Fit a single cubic bezier segment through a list of points. The end
+    points of the segment are fixed to the first and last point and the
+    tangent directions are fixed to the provided tangents. The magnitudes
+    of the tangents are solved using least squares, after which the
+    parameters are refined using Newton-Raphson iterations.
+
+    :param list points:
+    :param list parameters: between 0-1
+    :param tuple tangent1: tangent at the start of the segment
+    :param tuple tangent2: tangent at the end of the segment
+    :param int iterations: number of reparameterization iterations
+    :return: control points, maximum error
+    :rtype: tuple
+    """
+    if numpy is not None:
+        return fitSegmentNumpy(
+            points,
+            parameters,
+            tangent1,
+            tangent2,
+            iterations
+        )
+
+    p0 = points[0]
+    p3 = points[-1]
+    t1 = normalize(tangent1)
+    t2 = scale(normalize(tangent2), -1)
+    chord = length(sub(p3, p0))
+
+    parameters = list(parameters)
+    for iteration in range(iterations + 1):
+        # build normal equations
+        c00 = c01 = c11 = x0 = x1 = 0.0
+        for point, u in zip(points, parameters):
+            v = 1.0 - u
+            b0, b1, b2, b3 = v * v * v, 3 * u * v * v, 3 * u * u * v, u * u * u
+
+            a1 = scale(t1, b1)
+            a2 = scale(t2, b2)
+            tmp = sub(point, add(scale(p0, b0 + b1), scale(p3, b2 + b3)))
+
+            c00 += dot(a1, a1)
+            c01 += dot(a1, a2)
+            c11 += dot(a2, a2)
+            x0 += dot(a1, tmp)
+            x1 += dot(a2, tmp)
+
+        # solve tangent magnitudes
+        alpha1, alpha2 = getTangentMagnitudes(c00, c01, c11, x0, x1, chord)
+
+        cvs = [p0, add(p0, scale(t1, alpha1)), add(p3, scale(t2, alpha2)), p3]
+
+        if iteration == iterations:
+            break
+
+        # reparameterize
+        for i, (point, u) in enumerate(zip(points, parameters)):
+            diff = sub(evaluate(cvs, u), point)
+            first, second = derivatives(cvs, u)
+            denominator = dot(first, first) + dot(diff, second)
+            if abs(denominator) > 1e-12:
+                u -= dot(diff, first) / denominator
+                parameters[i] = min(max(u, 0.0), 1.0)
+
+    # get error
+    error = max(
+        length(sub(evaluate(cvs, u), point))
+        for point, u in zip(points, parameters)
+    )
+
+    return cvs, error
+
+
+def fitSpline(points, numSegments, tangents=None):
+    """
+    Fit a piecewise cubic bezier spline with the provided number of
+    segments through a list of ordered points. The segment end points are
+    distributed evenly over the points and share their tangent, which
+    makes the spline tangent continuous. When no tangents are provided
+    they are estimated from the points.
+
+    :param list points:
+    :param int numSegments:
+    :param list/None tangents:
+    :return: control points, maximum error
+    :rtype: tuple
+    """
+    # validate
+    numSegments = max(min(numSegments, len(points) - 1), 1)
+    tangents = tangents or getTangents(points)
+
+    # get anchor indices
+    indices = [
+        int(round(i * (len(points) - 1) / float(numSegments)))
+        for i in range(numSegments + 1)
+    ]
+
+    # fit segments
+    cvs = []
+    errors = []
+
+    for start, end in zip(indices[:-1], indices[1:]):
+        segment = points[start:end + 1]
+        segmentCvs, error = fitSegment(
+            segment,
+            getChordParameters(segment),
+            tangents[start],
+            tangents[end]
+        )
+
+        cvs.extend(segmentCvs[:-1])
+        errors.append(error)
+
+    cvs.append(points[-1])
+    return cvs, max(errors)
+
+
+def fitSplineToTolerance(points, tolerance, maxSegments, tangents=None):
+    """
+    Fit a piecewise cubic bezier spline through a list of ordered points
+    using the least amount of segments that keep the maximum error below
+    the tolerance. The amount of segments is capped at the maximum
+    segments. The amount of segments is found by doubling the segments
+    until the tolerance is met followed by a binary search, this keeps the
+    amount of fits logarithmic to the amount of segments.
+
+    :param list points:
+    :param float tolerance:
+    :param int maxSegments:
+    :param list/None tangents:
+    :return: control points, maximum error
+    :rtype: tuple
+    """
+    tangents = tangents or getTangents(points)
+    fits = {}
+
+    def fit(numSegments):
+        if numSegments not in fits:
+            fits[numSegments] = fitSpline(points, numSegments, tangents)
+        return fits[numSegments]
+
+    # find upper bound
+    upper = 1
+    while upper < maxSegments and fit(upper)[1] > tolerance:
+        upper = min(upper * 2, maxSegments)
+
+    # find lower bound
+    lower = upper // 2 + 1
+    while lower < upper:
+        middle = (lower + upper) // 2
+        if fit(middle)[1] > tolerance:
+            lower = middle + 1
+        else:
+            upper = middle
+
+    return fit(upper)
+
+
+def fitSplineToControls(
+        points,
+        maxControls=None,
+        tolerance=None,
+        tangents=None
+    ):
+    """
+    Fit a piecewise cubic bezier spline through a list of ordered points
+    with a maximum number of controls, where every segment end point is a
+    control. If a tolerance is provided the least amount of controls that
+    keep the maximum error below the tolerance will be used, capped by the
+    maximum controls. When no maximum is provided the number of controls
+    is capped by the number of points.
+
+    :param list points:
+    :param int/None maxControls: maximum number of controls, minimum of 2
+    :param float/None tolerance: maximum error
+    :param list/None tangents:
+    :return: control points, maximum error
+    :rtype: tuple
+    """
+    maxSegments = max((maxControls or len(points)) - 1, 1)
+    if tolerance:
+        return fitSplineToTolerance(points, tolerance, maxSegments, tangents)
+
+    return fitSpline(points, maxSegments, tangents)
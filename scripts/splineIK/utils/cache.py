@@ -0,0 +1,217 @@
+"""
+Cache the joint transforms of a spline IK. The cache node sits in between
+the joint network and the joints, the transforms are stored in a bounded
+least recently used cache keyed on the inputs of the rig. When the inputs
+match a stored entry the stored transforms are returned without pulling
+the joint network, this makes scrubbing over frames that were already
+evaluated cheap. The node is registered by the cache plug-in.
+
+The joint network is only skipped in DG evaluation mode, where nodes are
+evaluated when they are pulled. The evaluation manager ( serial and
+parallel mode ) schedules every dirty node of the joint network each
+frame regardless of the cache, there the cache adds a node and a key per
+frame without saving any evaluation, which is why the cache can only be
+created in DG evaluation mode. The gain can be measured using
+:func:`splineIK.utils.profile.measureToggle` on the enable attribute of
+the node.
+
+node = createCache(name, joints, matrices, values, size=1000)
+"""
+from collections import OrderedDict
+from maya import cmds
+
+
+CACHE_PLUGIN = "splineIKCache"
+CACHE_NODE = "splineIKCache"
+CACHE_NODE_ID = 0x0007F1C0
+CACHE_PRECISION = 6
+
+JOINT_ATTRIBUTES = ["translate", "rotate", "scale"]
+
+
+# ----------------------------------------------------------------------------
+
+
+class LRUCache(object):
+    """
+    The cache holds a maximum number of entries, when the maximum is
+    exceeded the least recently used entries are evicted. The number of
+    hits and misses are counted to be able to tune the size of the cache.
+
+    :param int size: maximum number of entries
+    """
+    def __init__(self, size=1000):
+        self._size = size
+        self._items = OrderedDict()
+        self._hits = 0
+        self._misses = 0
+
+    def __len__(self):
+        return len(self._items)
+
+    # ------------------------------------------------------------------------
+
+    @property
+    def size(self):
+        """
+        :return: maximum number of entries
+        :rtype: int
+        """
+        return self._size
+
+    @size.setter
+    def size(self, size):
+        self._size = size
+        self.__evict()
+
+    @property
+    def hits(self):
+        """
+        :return: number of hits
+        :rtype: int
+        """
+        return self._hits
+
+    @property
+    def misses(self):
+        """
+        :return: number of misses
+        :rtype: int
+        """
+        return self._misses
+
+    # ------------------------------------------------------------------------
+
+    def get(self, key):
+        """
+        Get an entry from the cache, the entry becomes the most recently
+        used entry.
+
+        :param key:
+        :return: value, None when the key is not cached
+        """
+        if key not in self._items:
+            self._misses += 1
+            return None
+
+        value = self._items.pop(key)
+        self._items[key] = value
+        self._hits += 1
+
+        return value
+
+    def set(self, key, value):
+        """
+        :param key:
+        :param value:
+        """
+        self._items.pop(key, None)
+        self._items[key] = value
+        self.__evict()
+
+    def clear(self):
+        """
+        Remove all entries and reset the counters.
+        """
+        self._items.clear()
+        self._hits = 0
+        self._misses = 0
+
+    # ------------------------------------------------------------------------
+
+    def __evict(self):
+        while len(self._items) > max(self._size, 0):
+            self._items.popitem(last=False)
+
+
+# ----------------------------------------------------------------------------
+
+
+def getKey(values, precision=CACHE_PRECISION):
+    """
+    Get the cache key of a list of input values, values are rounded to
+    ignore floating point noise.
+
+    :param list values:
+    :param int precision:
+    :return: key
+    :rtype: tuple
+    """
+    return tuple(round(value, precision) for value in values)
+
+
+# ----------------------------------------------------------------------------
+
+
+def isEvaluationModeSupported():
+    """
+    The cache only skips the evaluation of the joint network in DG
+    evaluation mode, in serial and parallel mode it only adds cost.
+
+    :return: if the current evaluation mode is DG
+    :rtype: bool
+    """
+    return cmds.evaluationManager(query=True, mode=True)[0] == "off"
+
+
+def loadPlugin():
+    """
+    Load the cache plug-in if it isn't already.
+    """
+    if not cmds.pluginInfo(CACHE_PLUGIN, query=True, loaded=True):
+        cmds.loadPlugin(CACHE_PLUGIN)
+
+
+def createCache(name, joints, matrices, values, size=1000):
+    """
+    Create a cache node in between the joint network and the joints. The
+    translate, rotate and scale connections of the joints are rerouted
+    through the cache node. The matrices and values are the inputs of
+    the rig the cache is keyed on, (eg. ctrl.worldMatrix[0]).
+
+    :param str name:
+    :param list joints:
+    :param list matrices: matrix attributes
+    :param list values: numeric attributes
+    :param int size: maximum number of cached frames
+    :return: cache node
+    :rtype: str
+    """
+    loadPlugin()
+
+    # create node
+    node = cmds.createNode(CACHE_NODE, n=name)
+    cmds.setAttr("{0}.cacheSize".format(node), size)
+
+    # connect inputs
+    for i, attr in enumerate(matrices):
+        cmds.connectAttr(attr, "{0}.inputMatrix[{1}]".format(node, i))
+    for i, attr in enumerate(values):
+        cmds.connectAttr(attr, "{0}.inputValue[{1}]".format(node, i))
+
+    # reroute joints
+    for i, jnt in enumerate(joints):
+        for attr in JOINT_ATTRIBUTES:
+            destination = "{0}.{1}".format(jnt, attr)
+            sources = cmds.listConnections(
+                destination,
+                plugs=True,
+                source=True,
+                destination=False
+            )
+
+            if not sources:
+                continue
+
+            suffix = attr[0].upper() + attr[1:]
+            cmds.connectAttr(
+                sources[0],
+                "{0}.input[{1}].input{2}".format(node, i, suffix)
+            )
+            cmds.connectAttr(
+                "{0}.output[{1}].output{2}".format(node, i, suffix),
+                destination,
+                force=True
+            )
+
+    return node
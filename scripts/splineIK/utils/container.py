@@ -0,0 +1,78 @@
+from maya import cmds
+
+from . import attribute
+
+
+VISIBILITY_ATTR = "rig_vis"
+FROZEN_ATTR = "rig_frozen"
+
+
+# ----------------------------------------------------------------------------
+
+
+def createContainer(name):
+    """
+    Create a container node that holds all nodes of a rig. The container
+    gets a visibility and frozen attribute, the nodes added to the
+    container are connected to these attributes. This means hiding or
+    freezing all of the nodes is a single attribute change, regardless
+    of the amount of nodes in the container.
+
+    :param str name: Name of the container
+    :return: container
+    :rtype: str
+    """
+    container = cmds.createNode("container", n=name)
+
+    attribute.addAttr(container, VISIBILITY_ATTR, at="bool", defaultValue=1)
+    attribute.addAttr(container, FROZEN_ATTR, at="bool", defaultValue=0)
+
+    return container
+
+
+def addNodes(container, nodes):
+    """
+    Add nodes to a container, nodes that don't exist are ignored. The
+    visibility attribute of the container is connected to the level of
+    detail visibility of all top level dag nodes, the frozen attribute is
+    connected to the frozen attribute of all nodes. The frozen attribute
+    is only available from Maya 2016.5 onwards, when it doesn't exist the
+    nodes will not be connected.
+
+    :param str container:
+    :param list nodes:
+    """
+    nodes = [node for node in nodes if cmds.objExists(node)]
+    if not nodes:
+        return
+
+    # add to container
+    cmds.container(container, edit=True, addNode=nodes, force=True)
+
+    # connect visibility
+    for node in cmds.ls(nodes, assemblies=True) or []:
+        cmds.connectAttr(
+            "{0}.{1}".format(container, VISIBILITY_ATTR),
+            "{0}.lodVisibility".format(node),
+            force=True
+        )
+
+    # connect frozen
+    if not cmds.attributeQuery("frozen", node=container, exists=True):
+        return
+
+    for node in nodes:
+        cmds.connectAttr(
+            "{0}.{1}".format(container, FROZEN_ATTR),
+            "{0}.frozen".format(node),
+            force=True
+        )
+
+
+def getNodes(container):
+    """
+    :param str container:
+    :return: nodes in the container
+    :rtype: list
+    """
+    return cmds.container(container, query=True, nodeList=True) or []
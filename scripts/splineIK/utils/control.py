@@ -1,15 +1,19 @@
 from maya import cmds
-from . import controlShape, curve, colour
+from . import controlShape, curve, colour, math
 
 
-def createControlShape(name, shape, colour_, num=None):
+def createControlShape(name, shape, colour_, num=None, offset=True):
     """ 
-    Create a control with offset group.
+    Create a control with offset group. When the offset is disabled no
+    offset group is created and the control is returned as its own
+    offset, the rest transform of the control can be moved into its
+    offset parent matrix using :func:`bakeOffsetParentMatrix`.
 
     :param str name: Name of the control ( _ctrl will be appended )
     :param str shape: Shape of the control.
     :param str colour_: Colour of the control.
     :param int num: Number of control ( padding of 3 ).
+    :param bool offset: Create offset group.
     :return: name of offset and control
     :rtype: tuple
     """
@@ -29,15 +33,47 @@ def createControlShape(name, shape, colour_, num=None):
 
     # create
     ctrl, shapes = curve.createCurveShape(ctrlName, shapePoints)
-    offset = cmds.group(w=True, em=True, n=offsetName)
 
     # set colour
     colourString = colour.getColourFromString(colour_)
     for s in shapes:
         cmds.setAttr("{0}.overrideEnabled".format(s), 1)
         cmds.setAttr("{0}.overrideColor".format(s), colourString)
-        
+
+    if not offset:
+        return ctrl, ctrl
+
     # parent ctrl to offset
+    offset = cmds.group(w=True, em=True, n=offsetName)
     ctrl = cmds.parent(ctrl, offset)[0]
 
     return offset, ctrl
+
+
+def bakeOffsetParentMatrix(ctrl):
+    """
+    Move the local transform of a control into its offset parent matrix,
+    the translate, rotate and scale of the control are reset. The world
+    transform of the control and its children is not changed. This makes
+    the offset parent matrix take over the role of an offset group.
+    Requires Maya 2020 or later.
+
+    :param str ctrl:
+    """
+    # get matrices
+    local = math.listToMatrix(cmds.getAttr("{0}.matrix".format(ctrl)))
+    offset = math.listToMatrix(
+        cmds.getAttr("{0}.offsetParentMatrix".format(ctrl))
+    )
+
+    # set offset parent matrix
+    cmds.setAttr(
+        "{0}.offsetParentMatrix".format(ctrl),
+        math.matrixToList(local * offset),
+        type="matrix"
+    )
+
+    # reset transform
+    cmds.setAttr("{0}.translate".format(ctrl), 0, 0, 0)
+    cmds.setAttr("{0}.rotate".format(ctrl), 0, 0, 0)
+    cmds.setAttr("{0}.scale".format(ctrl), 1, 1, 1)
@@ -1,5 +1,9 @@
+import bisect
 from maya import cmds, mel, OpenMaya
-from . import api, math
+from . import api, math, bezier, projection
+
+
+numpy = projection.numpy
 
 
 def numCVs(curve):
@@ -13,6 +17,23 @@ def numCVs(curve):
     return cmds.getAttr("{0}.cp".format(curve), s=1)
 
 
+def numControls(curve):
+    """
+    Get the number of controls of a curve, which is every third control
+    point of the curve once converted to a bezier curve. Nurbs curves are
+    converted to a bezier segment per span.
+
+    :param str curve:
+    :return: number of controls
+    :rtype: int
+    """
+    curveShape = cmds.listRelatives(curve, s=True, f=True) or [curve]
+    if cmds.nodeType(curveShape[0]) == "bezierCurve":
+        return (numCVs(curve) - 1) // 3 + 1
+
+    return cmds.getAttr("{0}.spans".format(curveShape[0])) + 1
+
+
 # ----------------------------------------------------------------------------
 
 
@@ -68,6 +89,247 @@ def convertToBezierCurve(curve):
     cmds.nurbsCurveToBezier()
 
 
+def createBezierCurve(name, cvs):
+    """
+    Create a bezier curve from a list of control points. The amount of
+    control points should be a multiple of three plus one.
+
+    :param str name: Name of curve
+    :param list cvs: 3n+1 control points
+    :return: curve and shape
+    :rtype: tuple
+    """
+    # get knots
+    num = (len(cvs) - 1) // 3
+    knots = [i for i in range(num + 1) for _ in range(3)]
+
+    # create curve
+    curve = cmds.curve(bezier=True, degree=3, point=cvs, knot=knots, n=name)
+    shape = cmds.listRelatives(curve, s=True, f=True)[0]
+    shape = cmds.rename(shape, "{0}Shape".format(name.split("|")[-1]))
+
+    return curve, shape
+
+
+def sampleCurve(curve, num, space=OpenMaya.MSpace.kObject):
+    """
+    Sample points and normalized tangents at evenly spaced lengths along
+    a curve.
+
+    :param str curve:
+    :param int num: number of samples
+    :param OpenMaya.MSpace space:
+    :return: points, tangents
+    :rtype: tuple
+    """
+    mFnCurve = api.asMFnNurbsCurve(curve)
+    length = mFnCurve.length()
+    increment = 1.0 / (num - 1)
+
+    points = []
+    tangents = []
+
+    for i in range(num):
+        parameter = mFnCurve.findParamFromLength(length * increment * i)
+
+        point = OpenMaya.MPoint()
+        mFnCurve.getPointAtParam(parameter, point, space)
+        tangent = mFnCurve.tangent(parameter, space)
+        tangent.normalize()
+
+        points.append((point.x, point.y, point.z))
+        tangents.append((tangent.x, tangent.y, tangent.z))
+
+    return points, tangents
+
+
+def getPointsAtParameters(curve, parameters, space=OpenMaya.MSpace.kWorld):
+    """
+    Get points and normalized tangents at a list of parameters that are
+    normalized between 0-1, the parameters of the split functions can be
+    parsed directly.
+
+    :param str curve:
+    :param list parameters:
+    :param OpenMaya.MSpace space:
+    :return: points, tangents
+    :rtype: tuple
+    """
+    mFnCurve = api.asMFnNurbsCurve(curve)
+    factor = mFnCurve.findParamFromLength(mFnCurve.length())
+
+    points = []
+    tangents = []
+
+    for parameter in parameters:
+        point = OpenMaya.MPoint()
+        mFnCurve.getPointAtParam(parameter * factor, point, space)
+        tangent = mFnCurve.tangent(parameter * factor, space)
+        tangent.normalize()
+
+        points.append((point.x, point.y, point.z))
+        tangents.append((tangent.x, tangent.y, tangent.z))
+
+    return points, tangents
+
+
+def getFitSamples(curve, samples=512):
+    """
+    Sample points and tangents along a curve to fit a bezier curve to,
+    the samples can be fitted outside of Maya's main thread using
+    :func:`splineIK.utils.bezier.fitSplineToControls`. The samples are in
+    the object space of the curve, the same space the control points are
+    set in by :func:`setBezierCurve`.
+
+    :param str curve: Name of curve
+    :param int samples: number of samples used for the fit
+    :return: points, tangents
+    :rtype: tuple
+    :raises ValueError: When the curve is periodic
+    """
+    # get shape
+    curveShape = cmds.listRelatives(curve, s=True, f=True)[0]
+
+    # validate form
+    if cmds.getAttr("{0}.form".format(curveShape)) == 2:
+        raise ValueError("fitBezierCurve: periodic curves are not supported!")
+
+    # sample curve
+    return sampleCurve(curveShape, samples)
+
+
+def setBezierCurve(curve, cvs):
+    """
+    Replace the shape of a curve with a bezier shape created from a list
+    of control points. The name of the shape is kept.
+
+    :param str curve: Name of curve
+    :param list cvs: 3n+1 control points
+    """
+    # get shape
+    curveShape = cmds.listRelatives(curve, s=True, f=True)[0]
+
+    # create shape
+    name = cmds.listRelatives(curve, s=True)[0]
+    fit, shape = createBezierCurve("{0}_fit".format(curve.split("|")[-1]), cvs)
+
+    # replace shape
+    cmds.delete(curveShape)
+    shape = cmds.parent(shape, curve, relative=True, shape=True)[0]
+    cmds.rename(shape, name)
+    cmds.delete(fit)
+
+
+def fitBezierCurve(curve, maxControls=None, tolerance=None, samples=512):
+    """
+    Refit a curve to a bezier curve using least squares on points sampled
+    along the curve. The number of controls of the rig is every third
+    control point of the bezier curve, by providing the maximum controls
+    the complexity of the rig is capped. If a tolerance is provided the
+    least amount of controls that keep the deviation from the original
+    curve below the tolerance will be used, capped by the maximum
+    controls. The shape of the curve will be replaced by the fitted
+    bezier shape.
+
+    :param str curve: Name of curve
+    :param int/None maxControls: maximum number of controls, minimum of 2
+    :param float/None tolerance: maximum deviation in the object space of
+        the curve
+    :param int samples: number of samples used for the fit
+    :return: maximum deviation of the fit
+    :rtype: float
+    :raises ValueError: When the curve is periodic
+    """
+    # sample curve
+    points, tangents = getFitSamples(curve, samples)
+
+    # fit curve
+    cvs, error = bezier.fitSplineToControls(
+        points,
+        maxControls,
+        tolerance,
+        tangents
+    )
+
+    # replace shape
+    setBezierCurve(curve, cvs)
+
+    return error
+
+
+# ----------------------------------------------------------------------------
+
+
+def getCurveData(curve):
+    """
+    Get the data of the first non intermediate shape of a curve, the data
+    can be used to restore the shape using :func:`setCurveData`.
+
+    :param str curve: Name of curve
+    :return: name, type, cvs, knots, degree and form of the shape
+    :rtype: dict
+    """
+    # get shape
+    curveShape = cmds.listRelatives(curve, s=True, ni=True, f=True)[0]
+    mFnCurve = api.asMFnNurbsCurve(curveShape)
+
+    # get data
+    cvs = OpenMaya.MPointArray()
+    mFnCurve.getCVs(cvs, OpenMaya.MSpace.kObject)
+    knots = OpenMaya.MDoubleArray()
+    mFnCurve.getKnots(knots)
+
+    return {
+        "name": curveShape.split("|")[-1],
+        "type": cmds.nodeType(curveShape),
+        "cvs": [(cvs[i].x, cvs[i].y, cvs[i].z) for i in range(cvs.length())],
+        "knots": [knots[i] for i in range(knots.length())],
+        "degree": mFnCurve.degree(),
+        "form": mFnCurve.form(),
+    }
+
+
+def setCurveData(curve, data):
+    """
+    Replace all shapes of a curve with a shape created from the data
+    retrieved using :func:`getCurveData`. This includes intermediate
+    shapes left behind by deformers.
+
+    :param str curve: Name of curve
+    :param dict data:
+    """
+    # remove shapes
+    shapes = cmds.listRelatives(curve, s=True, f=True) or []
+    if shapes:
+        cmds.delete(shapes)
+
+    # get data
+    cvs = OpenMaya.MPointArray()
+    for point in data["cvs"]:
+        cvs.append(OpenMaya.MPoint(*point))
+
+    knots = OpenMaya.MDoubleArray()
+    for knot in data["knots"]:
+        knots.append(knot)
+
+    # create shape
+    mFnCurve = OpenMaya.MFnNurbsCurve()
+    mFnCurve.create(
+        cvs,
+        knots,
+        data["degree"],
+        data["form"],
+        False,
+        True,
+        api.toMObject(curve)
+    )
+    cmds.rename(mFnCurve.fullPathName(), data["name"])
+
+    # convert to bezier curve
+    if data["type"] == "bezierCurve":
+        convertToBezierCurve(curve)
+
+
 # ----------------------------------------------------------------------------
 
 
@@ -132,6 +394,228 @@ def splitCurveToParametersByLength(curve, num):
     return parameters
 
 
+def sampleCurvature(curve, num):
+    """
+    Sample the curvature of a curve at evenly spaced lengths along the
+    curve. The curvature is calculated from the first and second
+    derivatives of the curve at each of the sampled parameters.
+
+    :param str curve:
+    :param int num: number of samples
+    :return: lengths, parameters, curvatures
+    :rtype: tuple
+    """
+    mFnCurve = api.asMFnNurbsCurve(curve)
+    length = mFnCurve.length()
+    increment = 1.0 / (num - 1)
+
+    # variables
+    lengths = []
+    parameters = []
+    curvatures = []
+
+    for i in range(num):
+        # get parameter
+        l = length * increment * i
+        parameter = mFnCurve.findParamFromLength(l)
+
+        # get derivatives
+        point = OpenMaya.MPoint()
+        dU = OpenMaya.MVector()
+        dUU = OpenMaya.MVector()
+        mFnCurve.getDerivativesAtParm(
+            parameter,
+            point,
+            dU,
+            OpenMaya.MSpace.kWorld,
+            dUU
+        )
+
+        # calculate curvature
+        speed = dU.length()
+        curvature = 0
+        if speed > 1e-8:
+            curvature = (dU ^ dUU).length() / (speed ** 3)
+
+        lengths.append(l)
+        parameters.append(parameter)
+        curvatures.append(curvature)
+
+    return lengths, parameters, curvatures
+
+
+def getCurvatureDensity(lengths, curvatures, bias=1.0):
+    """
+    Get the joint density for each of the sampled lengths. The density is
+    a blend between a uniform density and a density based on the square
+    root of the curvature, which is the optimal density to minimize the
+    chord deviation of a piecewise linear approximation. The bias
+    controls the blend, where 0 is fully uniform and 1 is fully based on
+    curvature. The density is normalized to integrate to one over the
+    length of the curve.
+
+    :param list lengths:
+    :param list curvatures:
+    :param float bias: between 0-1
+    :return: densities
+    :rtype: list/numpy.ndarray
+    """
+    if numpy is not None:
+        return getCurvatureDensityNumpy(lengths, curvatures, bias)
+
+    # get curvature density integral
+    roots = [math.sqrt(c) for c in curvatures]
+    integral = 0
+    for i in range(len(lengths) - 1):
+        integral += (roots[i] + roots[i + 1]) * 0.5 * (
+            lengths[i + 1] - lengths[i]
+        )
+
+    # fall back to uniform for straight curves
+    length = lengths[-1]
+    if integral < 1e-8:
+        return [1.0 / length for _ in roots]
+
+    return [(1 - bias) / length + bias * r / integral for r in roots]
+
+
+def getCurvatureDensityNumpy(lengths, curvatures, bias=1.0):
+    """
+    :param list lengths:
+    :param list curvatures:
+    :param float bias: between 0-1
+    :return: densities
+    :rtype: numpy.ndarray
+    """
+    # get curvature density integral
+    lengths = numpy.asarray(lengths, dtype=float)
+    roots = numpy.sqrt(numpy.asarray(curvatures, dtype=float))
+    integral = float(
+        ((roots[1:] + roots[:-1]) * 0.5 * numpy.diff(lengths)).sum()
+    )
+
+    # fall back to uniform for straight curves
+    length = lengths[-1]
+    if integral < 1e-8:
+        return numpy.full(len(roots), 1.0 / length)
+
+    return (1 - bias) / length + bias * roots / integral
+
+
+def recommendNumJoints(curve, tolerance, bias=1.0, samples=512):
+    """
+    Get the minimum amount of joints required to keep the chord
+    deviation between the curve and the joint chain below the tolerance.
+    The chord deviation of a segment with length h on a curve with
+    curvature k is approximated with k * h^2 / 8. The bias matches the
+    bias used to distribute the joints, a bias of 0 matches the
+    distribution of :func:`splitCurveToParametersByLength`.
+
+    :param str curve:
+    :param float tolerance: maximum chord deviation in world units
+    :param float bias: between 0-1
+    :param int samples:
+    :return: number of joints
+    :rtype: int
+    """
+    lengths, _, curvatures = sampleCurvature(curve, samples)
+    densities = getCurvatureDensity(lengths, curvatures, bias)
+
+    # the segment length at each sample is 1 / (num * density), the
+    # number of segments is driven by the sample with the highest ratio
+    # between its required and its distributed density.
+    if numpy is not None:
+        num = float(
+            (
+                numpy.sqrt(numpy.asarray(curvatures) / (8.0 * tolerance)) /
+                densities
+            ).max()
+        )
+    else:
+        num = max(
+            math.sqrt(c / (8.0 * tolerance)) / d
+            for c, d in zip(curvatures, densities)
+        )
+
+    return max(int(math.ceil(num)) + 1, 3)
+
+
+def splitCurveToParametersByCurvature(curve, num, bias=1.0, samples=None):
+    """
+    Get a list of parameters spaced along a curve based on the curvature
+    of the curve. Tight bends will receive more parameters then straight
+    sections of the curve, see :func:`getCurvatureDensity` for more
+    information about the bias. Ranges are normalizes to be between 0-1.
+
+    :param str curve:
+    :param int num:
+    :param float bias: between 0-1
+    :param int/None samples:
+
+    :return: parameters
+    :rtype: list
+    """
+    # sample curve
+    samples = samples or max(256, num * 8)
+    lengths, parameters, curvatures = sampleCurvature(curve, samples)
+    densities = getCurvatureDensity(lengths, curvatures, bias)
+    mFnCurve = api.asMFnNurbsCurve(curve)
+
+    if numpy is not None:
+        # get cumulative density
+        lengths = numpy.asarray(lengths, dtype=float)
+        cumulative = numpy.concatenate((
+            [0.0],
+            numpy.cumsum(
+                (densities[1:] + densities[:-1]) * 0.5 * numpy.diff(lengths)
+            )
+        ))
+
+        # invert cumulative density
+        targets = numpy.linspace(0.0, cumulative[-1], num)
+        split = [
+            mFnCurve.findParamFromLength(length)
+            for length in numpy.interp(targets, cumulative, lengths).tolist()
+        ]
+    else:
+        # get cumulative density
+        cumulative = [0]
+        for i in range(samples - 1):
+            cumulative.append(
+                cumulative[-1] + (densities[i] + densities[i + 1]) * 0.5 * (
+                    lengths[i + 1] - lengths[i]
+                )
+            )
+
+        # invert cumulative density
+        increment = cumulative[-1] / (num - 1)
+
+        j = 0
+        split = []
+        for i in range(num):
+            target = increment * i
+            while j < samples - 2 and cumulative[j + 1] < target:
+                j += 1
+
+            # interpolate length
+            span = cumulative[j + 1] - cumulative[j]
+            weight = (target - cumulative[j]) / span if span else 0
+            weight = min(max(weight, 0), 1)
+            length = lengths[j] + (lengths[j + 1] - lengths[j]) * weight
+
+            split.append(mFnCurve.findParamFromLength(length))
+
+    # normalize
+    factor = split[-1]
+    split = [p/factor for p in split]
+
+    if cmds.getAttr("{0}.form".format(curve)) == 2:
+        split.insert(0, split[-1])
+        split.pop(-1)
+
+    return split
+
+
 def splitCurveToParametersByParameter(curve, num):
     """
     Get a list of parameters evenly spaced along a curve, based on the
@@ -153,6 +637,49 @@ def splitCurveToParametersByParameter(curve, num):
     return parameters
 
 
+def getSpanKnots(curve):
+    """
+    Get the knot values at the start and end of every span of a curve,
+    for a bezier curve a span is the segment between two controls.
+
+    :param str curve:
+    :return: span knots
+    :rtype: list
+    """
+    knots = OpenMaya.MDoubleArray()
+    mFnCurve = api.asMFnNurbsCurve(curve)
+    mFnCurve.getKnots(knots)
+
+    return sorted(set(round(knots[i], 6) for i in range(knots.length())))
+
+
+def splitParametersToSpans(parameters, knots):
+    """
+    Convert parameters normalized along the full curve to the span they
+    lie in and a parameter normalized along that span. The span knots can
+    be retrieved using :func:`getSpanKnots`.
+
+    :param list parameters:
+    :param list knots: span knots
+    :return: span index and parameter per parameter
+    :rtype: list
+    """
+    # variables
+    start = knots[0]
+    end = knots[-1]
+    last = len(knots) - 2
+
+    spans = []
+    for parameter in parameters:
+        value = start + parameter * (end - start)
+        span = min(max(bisect.bisect_right(knots, value) - 1, 0), last)
+        length = knots[span + 1] - knots[span]
+
+        spans.append((span, (value - knots[span]) / length))
+
+    return spans
+
+
 # ----------------------------------------------------------------------------
 
 
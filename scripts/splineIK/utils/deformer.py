@@ -0,0 +1,555 @@
+"""
+Deform geometry along a spline IK without joints. The deformer evaluates
+a frame at every sample of the curve, the samples are placed where the
+joints would be. The frames use the same blended up vectors, stretch and
+slide as the joint network. The geometry is bound in its rest pose as an
+explicit step, every point is projected onto the curve and stored as an
+offset in the two frames it lies in between. The offsets are blended
+linearly during deformation. Points are deformed in a single vectorized
+pass when NumPy is available. The node is registered by the deformer
+plug-in, the node never binds by itself, geometry of which the bind
+doesn't match is left undeformed until it is bound again.
+
+node = createDeformer(name, geometry)
+bindDeformer(node)
+"""
+import bisect
+from maya import cmds, OpenMaya
+
+from . import api, curve, projection
+
+numpy = projection.numpy
+
+
+DEFORMER_PLUGIN = "splineIKDeformer"
+DEFORMER_NODE = "splineIKDeformer"
+DEFORMER_NODE_ID = 0x0007F1C1
+
+
+# ----------------------------------------------------------------------------
+
+
+def dot(a, b):
+    """
+    :param list a:
+    :param list b:
+    :return: dot product
+    :rtype: float
+    """
+    return sum(x * y for x, y in zip(a, b))
+
+
+def cross(a, b):
+    """
+    :param list a:
+    :param list b:
+    :return: cross product
+    :rtype: list
+    """
+    return [
+        a[1] * b[2] - a[2] * b[1],
+        a[2] * b[0] - a[0] * b[2],
+        a[0] * b[1] - a[1] * b[0],
+    ]
+
+
+def normalize(a):
+    """
+    :param list a:
+    :return: normalized vector
+    :rtype: list
+    """
+    length = dot(a, a) ** 0.5 or 1.0
+    return [x / length for x in a]
+
+
+# ----------------------------------------------------------------------------
+
+
+def getFrame(position, tangent, up, forwardAxis, upAxis, scale=(1, 1, 1)):
+    """
+    Get the frame of a sample, the same orientation as an aim constraint
+    is calculated. The forward axis aims along the tangent and the up axis
+    is aligned with the up vector. The frame is returned as the rows of a
+    matrix, the last row holds the position.
+
+    :param list position:
+    :param list tangent:
+    :param list up: up vector
+    :param int forwardAxis: 0, 1 or 2
+    :param int upAxis: 0, 1 or 2
+    :param list scale: scale per axis
+    :return: rows
+    :rtype: list
+    """
+    # get vectors
+    forward = normalize(tangent)
+    up = normalize([u - f * dot(up, forward) for u, f in zip(up, forward)])
+
+    # keep the frame right handed
+    sideAxis = 3 - forwardAxis - upAxis
+    if (forwardAxis + 1) % 3 == upAxis:
+        side = cross(forward, up)
+    else:
+        side = cross(up, forward)
+
+    # get rows
+    rows = [None, None, None]
+    for axis, vector in zip(
+        [forwardAxis, upAxis, sideAxis],
+        [forward, up, side]
+    ):
+        rows[axis] = [v * scale[axis] for v in vector]
+
+    return rows + [list(position)]
+
+
+def getFrames(
+        positions,
+        tangents,
+        matrices,
+        forwardAxis,
+        upAxis,
+        stretch=None
+    ):
+    """
+    Get the frames of all samples. The up vector and scale of a sample
+    are read from the blended matrix of the controls, the same as the up
+    vectors of the joint network. The stretch is applied to the axes that
+    are not the forward axis.
+
+    :param list positions:
+    :param list tangents:
+    :param list matrices: blended matrix per sample as 16 values
+    :param int forwardAxis: 0, 1 or 2
+    :param int upAxis: 0, 1 or 2
+    :param list/None stretch: stretch per sample
+    :return: frames
+    :rtype: list
+    """
+    frames = []
+    for i, (position, tangent, matrix) in enumerate(
+        zip(positions, tangents, matrices)
+    ):
+        rows = [matrix[j * 4:j * 4 + 3] for j in range(4)]
+
+        # get up vector, the up point is offset along the up axis of the
+        # blended matrix
+        up = [
+            r * 100 + t - p
+            for r, t, p in zip(rows[upAxis], rows[3], position)
+        ]
+
+        # get scale
+        scale = [dot(row, row) ** 0.5 for row in rows[:3]]
+        if stretch:
+            scale = [
+                s if axis == forwardAxis else s * stretch[i]
+                for axis, s in enumerate(scale)
+            ]
+
+        frames.append(
+            getFrame(position, tangent, up, forwardAxis, upAxis, scale)
+        )
+
+    return frames
+
+
+def getStretch(
+        positions,
+        restLengths,
+        rootScale,
+        multiplier,
+        clampMin,
+        clampMax
+    ):
+    """
+    Get the stretch of every sample, the same calculation as the stretch
+    segments of the joint network is used. The last sample uses the
+    stretch of the segment before it.
+
+    :param list positions:
+    :param list restLengths:
+    :param float rootScale:
+    :param float multiplier:
+    :param float clampMin:
+    :param float clampMax:
+    :return: stretch
+    :rtype: list
+    """
+    stretch = []
+    for i, rest in enumerate(restLengths):
+        length = sum(
+            (a - b) ** 2
+            for a, b in zip(positions[i], positions[i + 1])
+        ) ** 0.5
+
+        value = rest * rootScale / max(length, 1e-6)
+        value = 1 + (value - 1) * multiplier
+        stretch.append(min(max(value, clampMin), clampMax))
+
+    stretch.append(stretch[-1] if stretch else 1.0)
+    return stretch
+
+
+def getRestLengths(positions):
+    """
+    :param list positions:
+    :return: distance between the positions
+    :rtype: list
+    """
+    return [
+        sum((a - b) ** 2 for a, b in zip(p1, p2)) ** 0.5
+        for p1, p2 in zip(positions[:-1], positions[1:])
+    ]
+
+
+# ----------------------------------------------------------------------------
+
+
+def transformPoints(points, matrix):
+    """
+    :param list points:
+    :param list matrix: 16 values
+    :return: transformed points
+    :rtype: list/numpy.ndarray
+    """
+    if numpy is not None:
+        points = numpy.asarray(points, dtype=float)[:, :3]
+        matrix = numpy.asarray(matrix, dtype=float).reshape(4, 4)
+        return points.dot(matrix[:3, :3]) + matrix[3, :3]
+
+    rows = [matrix[j * 4:j * 4 + 3] for j in range(4)]
+    return [
+        [
+            sum(point[k] * rows[k][j] for k in range(3)) + rows[3][j]
+            for j in range(3)
+        ]
+        for point in points
+    ]
+
+
+def bindPoints(points, parameters, sampleParameters, frames):
+    """
+    Bind points to the frames of the samples. Every point is stored as the
+    index of the first of the two frames it lies in between, the blend
+    weight between the frames and the offset in both frames.
+
+    :param list points:
+    :param list parameters: closest parameter of every point
+    :param list sampleParameters: parameter of every frame
+    :param list frames:
+    :return: indices, weights, offsets
+    :rtype: tuple
+    """
+    if numpy is not None:
+        return bindPointsNumpy(points, parameters, sampleParameters, frames)
+
+    # variables
+    indices = []
+    weights = []
+    offsets = []
+    last = len(sampleParameters) - 2
+
+    for point, parameter in zip(points, parameters):
+        # get frames
+        index = bisect.bisect_left(sampleParameters, parameter) - 1
+        index = min(max(index, 0), last)
+
+        p0 = sampleParameters[index]
+        p1 = sampleParameters[index + 1]
+        weight = min(max((parameter - p0) / max(p1 - p0, 1e-12), 0.0), 1.0)
+
+        # get offsets, the rows of a frame are orthogonal
+        offset = []
+        for frame in frames[index:index + 2]:
+            relative = [p - t for p, t in zip(point[:3], frame[3])]
+            offset.extend(
+                dot(relative, row) / dot(row, row)
+                for row in frame[:3]
+            )
+
+        indices.append(index)
+        weights.append(weight)
+        offsets.extend(offset)
+
+    return indices, weights, offsets
+
+
+def bindPointsNumpy(points, parameters, sampleParameters, frames):
+    """
+    :param list/numpy.ndarray points:
+    :param list/numpy.ndarray parameters:
+    :param list sampleParameters:
+    :param list frames:
+    :return: indices, weights, offsets
+    :rtype: tuple
+    """
+    # variables
+    points = numpy.asarray(points, dtype=float)[:, :3]
+    parameters = numpy.asarray(parameters, dtype=float)
+    samples = numpy.asarray(sampleParameters, dtype=float)
+    frames = numpy.asarray(frames, dtype=float)
+
+    # get frames
+    indices = numpy.searchsorted(samples, parameters, side="left") - 1
+    indices = numpy.clip(indices, 0, len(samples) - 2)
+
+    p0 = samples[indices]
+    p1 = samples[indices + 1]
+    weights = (parameters - p0) / numpy.maximum(p1 - p0, 1e-12)
+    weights = numpy.clip(weights, 0.0, 1.0)
+
+    # get offsets, the rows of a frame are orthogonal
+    offsets = []
+    for i in [indices, indices + 1]:
+        rows = frames[i, :3, :]
+        relative = points - frames[i, 3, :]
+        offsets.append(
+            numpy.einsum("nj,nij->ni", relative, rows) /
+            (rows ** 2).sum(axis=2)
+        )
+
+    offsets = numpy.concatenate(offsets, axis=1)
+    return indices.tolist(), weights.tolist(), offsets.ravel().tolist()
+
+
+def deformPoints(indices, weights, offsets, frames, points, envelope=1.0):
+    """
+    Deform the bound points by the frames of the samples.
+
+    :param list indices:
+    :param list weights:
+    :param list offsets:
+    :param list frames:
+    :param list points: original points
+    :param float envelope:
+    :return: deformed points
+    :rtype: list/numpy.ndarray
+    """
+    if numpy is not None:
+        return deformPointsNumpy(
+            indices,
+            weights,
+            offsets,
+            frames,
+            points,
+            envelope
+        )
+
+    deformed = []
+    for i, (index, weight, point) in enumerate(zip(indices, weights, points)):
+        offset = offsets[i * 6:i * 6 + 6]
+
+        position = [0.0, 0.0, 0.0]
+        for frame, local, w in zip(
+            frames[index:index + 2],
+            [offset[:3], offset[3:]],
+            [1 - weight, weight]
+        ):
+            for j in range(3):
+                position[j] += w * (
+                    frame[3][j] +
+                    sum(local[k] * frame[k][j] for k in range(3))
+                )
+
+        deformed.append([
+            p + (d - p) * envelope
+            for p, d in zip(point[:3], position)
+        ])
+
+    return deformed
+
+
+def deformPointsNumpy(indices, weights, offsets, frames, points, envelope=1.0):
+    """
+    :param list indices:
+    :param list weights:
+    :param list offsets:
+    :param list frames:
+    :param list/numpy.ndarray points: original points
+    :param float envelope:
+    :return: deformed points
+    :rtype: numpy.ndarray
+    """
+    # variables
+    indices = numpy.asarray(indices, dtype=int)
+    weights = numpy.asarray(weights, dtype=float)[:, None]
+    offsets = numpy.asarray(offsets, dtype=float).reshape(-1, 2, 3)
+    frames = numpy.asarray(frames, dtype=float)
+    points = numpy.asarray(points, dtype=float)[:, :3]
+
+    # deform
+    deformed = numpy.zeros_like(points)
+    for k, w in [(0, 1 - weights), (1, weights)]:
+        frame = frames[indices + k]
+        position = numpy.einsum("ni,nij->nj", offsets[:, k], frame[:, :3])
+        deformed += w * (position + frame[:, 3])
+
+    return points + (deformed - points) * envelope
+
+
+# ----------------------------------------------------------------------------
+
+
+def loadPlugin():
+    """
+    Load the deformer plug-in if it isn't already.
+    """
+    if not cmds.pluginInfo(DEFORMER_PLUGIN, query=True, loaded=True):
+        cmds.loadPlugin(DEFORMER_PLUGIN)
+
+
+def createDeformer(name, geometry):
+    """
+    Create a deformer on a geometry, the geometry is bound on the first
+    evaluation after the inputs of the deformer are connected.
+
+    :param str name:
+    :param str geometry:
+    :return: deformer
+    :rtype: str
+    """
+    loadPlugin()
+    return cmds.deformer(geometry, type=DEFORMER_NODE, n=name)[0]
+
+
+def getSamples(deformer):
+    """
+    :param str deformer:
+    :return: parameters and matrices of the samples of a deformer
+    :rtype: tuple
+    """
+    indices = cmds.getAttr(
+        "{0}.sample".format(deformer),
+        multiIndices=True
+    ) or []
+
+    parameters = [
+        cmds.getAttr(
+            "{0}.sample[{1}].sampleParameter".format(deformer, i)
+        )
+        for i in indices
+    ]
+    matrices = [
+        cmds.getAttr("{0}.sample[{1}].sampleMatrix".format(deformer, i))
+        for i in indices
+    ]
+
+    return parameters, matrices
+
+
+def getGeometryPoints(geometry):
+    """
+    :param str geometry:
+    :return: world space positions of the points of any geometry
+    :rtype: list
+    """
+    points = OpenMaya.MPointArray()
+    iterator = OpenMaya.MItGeometry(api.toMDagPath(geometry))
+    iterator.allPositions(points, OpenMaya.MSpace.kWorld)
+
+    return [
+        [points[i].x, points[i].y, points[i].z]
+        for i in range(points.length())
+    ]
+
+
+def clearBind(deformer):
+    """
+    Remove the bind of a deformer, the geometry is left undeformed until
+    it is bound again.
+
+    :param str deformer:
+    """
+    indices = cmds.getAttr("{0}.bind".format(deformer), multiIndices=True)
+    for index in indices or []:
+        cmds.removeMultiInstance(
+            "{0}.bind[{1}]".format(deformer, index),
+            b=True
+        )
+
+    cmds.setAttr("{0}.restLength".format(deformer), [], type="doubleArray")
+
+
+def bindDeformer(deformer):
+    """
+    Bind the geometry of a deformer, the existing bind is discarded. The
+    bind is calculated from the curve and samples in their current pose,
+    which means the rig is expected to be in its rest pose. The points
+    are read with the bind removed, so the original positions of the
+    geometry are used.
+
+    :param str deformer:
+    """
+    # remove bind, the deformer passes through unbound geometry
+    clearBind(deformer)
+
+    # get samples
+    parameters, matrices = getSamples(deformer)
+    if len(parameters) < 2:
+        return
+
+    curveShape = cmds.listConnections(
+        "{0}.inputCurve".format(deformer),
+        source=True,
+        destination=False,
+        shapes=True
+    )[0]
+    positions, tangents = curve.getPointsAtParameters(curveShape, parameters)
+    frames = getFrames(
+        positions,
+        tangents,
+        matrices,
+        cmds.getAttr("{0}.forwardAxis".format(deformer)),
+        cmds.getAttr("{0}.upAxis".format(deformer))
+    )
+
+    num = (len(parameters) - 1) * projection.SAMPLES_PER_SEGMENT + 1
+    sampleParameters = projection.getSampleParameters(num)
+    samplePoints, _ = curve.getPointsAtParameters(
+        curveShape,
+        sampleParameters
+    )
+
+    # bind geometry
+    for index, geometry in zip(
+        cmds.deformer(deformer, query=True, geometryIndices=True),
+        cmds.deformer(deformer, query=True, geometry=True)
+    ):
+        points = getGeometryPoints(geometry)
+        closest = projection.getClosestParameters(
+            points,
+            samplePoints,
+            sampleParameters
+        )
+        indices, weights, offsets = bindPoints(
+            points,
+            closest,
+            parameters,
+            frames
+        )
+
+        attr = "{0}.bind[{1}]".format(deformer, index)
+        for name, values, dataType in [
+            ("bindIndex", indices, "Int32Array"),
+            ("bindWeight", weights, "doubleArray"),
+            ("bindOffset", offsets, "doubleArray"),
+        ]:
+            cmds.setAttr(
+                "{0}.{1}".format(attr, name),
+                values,
+                type=dataType
+            )
+
+    # set rest lengths, stored without the scale of the root
+    rootMatrix = cmds.getAttr("{0}.rootMatrix".format(deformer))
+    rootScale = sum(v * v for v in rootMatrix[:3]) ** 0.5
+    cmds.setAttr(
+        "{0}.restLength".format(deformer),
+        [
+            length / max(rootScale, 1e-6)
+            for length in getRestLengths(positions)
+        ],
+        type="doubleArray"
+    )
@@ -139,3 +139,33 @@ def lookRotation(forward, up):
         q = OpenMaya.MQuaternion(q[0], q[1], q[2], w)
         q.normalizeIt()
         return q
+
+
+# ----------------------------------------------------------------------------
+
+
+def listToMatrix(values):
+    """
+    Convert a list of 16 values, as returned when querying a matrix
+    attribute, into a matrix.
+
+    :param list values:
+    :return: matrix
+    :rtype: OpenMaya.MMatrix
+    """
+    matrix = OpenMaya.MMatrix()
+    OpenMaya.MScriptUtil.createMatrixFromList(list(values), matrix)
+
+    return matrix
+
+
+def matrixToList(matrix):
+    """
+    Convert a matrix into a list of 16 values, which can be used to set a
+    matrix attribute.
+
+    :param OpenMaya.MMatrix matrix:
+    :return: values
+    :rtype: list
+    """
+    return [matrix(i, j) for i in range(4) for j in range(4)]
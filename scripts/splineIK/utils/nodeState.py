@@ -0,0 +1,52 @@
+from maya import cmds
+
+
+NODE_STATE_NORMAL = 0
+NODE_STATE_BLOCKING = 2
+
+
+# ----------------------------------------------------------------------------
+
+
+def createNodeStateSwitch(name, attr, value=1, state=None):
+    """
+    Create a condition node that converts the parsed attribute into a node
+    state. When the attribute matches the value the node state will be
+    normal, in any other case the node state will be blocking. Blocking
+    nodes are not evaluated and do not propagate dirty messages, which
+    means the nodes connected to the switch cost nothing when disabled.
+
+    Switches can be chained by parsing the output of another switch as the
+    state, the state will then be used when the attribute matches the
+    value.
+
+    :param str name: Name of the condition node
+    :param str attr: Attribute driving the switch, (eg. ctrl.enable)
+    :param int value: Value of the attribute the nodes are active on
+    :param str/None state: Node state attribute of a parent switch
+    :return: node state attribute
+    :rtype: str
+    """
+    cd = cmds.createNode("condition", n=name)
+
+    cmds.setAttr("{0}.secondTerm".format(cd), value)
+    cmds.setAttr("{0}.colorIfTrueR".format(cd), NODE_STATE_NORMAL)
+    cmds.setAttr("{0}.colorIfFalseR".format(cd), NODE_STATE_BLOCKING)
+    cmds.connectAttr(attr, "{0}.firstTerm".format(cd))
+
+    if state:
+        cmds.connectAttr(state, "{0}.colorIfTrueR".format(cd))
+
+    return "{0}.outColorR".format(cd)
+
+
+def connectNodeState(switch, nodes):
+    """
+    Connect the output of a node state switch to the node state attribute
+    of all of the parsed nodes.
+
+    :param str switch: Node state attribute
+    :param list nodes:
+    """
+    for node in nodes:
+        cmds.connectAttr(switch, "{0}.nodeState".format(node))
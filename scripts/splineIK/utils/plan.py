@@ -0,0 +1,311 @@
+"""
+Plan the nodes and connections of a build without creating them. The plan
+groups the nodes and connections per subsystem and reports their counts
+and an estimated relative evaluation cost, which makes it possible to
+reject or downscale expensive builds before they are created. The plan
+is made by a planner that mirrors the build, a plan can be checked
+against the nodes of the created rig to catch the planner drifting from
+the build.
+
+p = Plan()
+p.addNode("controls", "spine_root_ctrl", "transform")
+p.cost["total"]
+checkPlan(p, container.getNodes(rigContainer))
+"""
+from collections import OrderedDict
+from maya import cmds
+
+
+# ----------------------------------------------------------------------------
+
+
+SUBSYSTEMS = ["controls", "up vectors", "follicles", "stretch", "slide"]
+
+# relative evaluation cost per node type, the values are estimates based on
+# the amount of work a node does during evaluation compared to a simple
+# arithmetic node. Node types that are not listed use the default cost.
+NODE_COSTS = {
+    "addDoubleLinear": 0.5,
+    "multDoubleLinear": 0.5,
+    "condition": 0.5,
+    "clamp": 0.5,
+    "multiplyDivide": 0.5,
+    "plusMinusAverage": 0.75,
+    "distanceBetween": 0.75,
+    "vectorProduct": 0.75,
+    "angleBetween": 0.75,
+    "blendWeighted": 0.5,
+    "pointMatrixMult": 1.0,
+    "multMatrix": 1.0,
+    "decomposeMatrix": 1.5,
+    "wtAddMatrix": 1.5,
+    "transform": 1.0,
+    "joint": 1.5,
+    "nurbsCurve": 1.0,
+    "cluster": 2.0,
+    "clusterHandle": 0.5,
+    "ramp": 3.0,
+    "aimConstraint": 3.0,
+    "scaleConstraint": 2.0,
+    "parentConstraint": 3.0,
+    "pointOnCurveInfo": 4.0,
+    "motionPath": 4.0,
+}
+NODE_COST_DEFAULT = 1.0
+CONNECTION_COST = 0.1
+
+# node types Maya creates alongside the cluster deformers, their number
+# differs between Maya versions so they are not planned or compared
+IGNORED_NODE_TYPES = [
+    "groupId",
+    "groupParts",
+    "objectSet",
+    "tweak",
+]
+
+
+# ----------------------------------------------------------------------------
+
+
+class Plan(object):
+    """
+    The plan holds the nodes and connections a build would create, grouped
+    by subsystem. Nodes are stored as (name, type) and connections as
+    (source, destination). The plan doesn't interact with the scene, it
+    can be used to report the size and estimated evaluation cost of a
+    build before it is created.
+    """
+    def __init__(self):
+        self._subsystems = OrderedDict(
+            (subsystem, {"nodes": [], "connections": []})
+            for subsystem in SUBSYSTEMS
+        )
+        self._data = {}
+
+    # ------------------------------------------------------------------------
+
+    def addNode(self, subsystem, name, nodeType):
+        """
+        :param str subsystem:
+        :param str name:
+        :param str nodeType:
+        :return: name
+        :rtype: str
+        """
+        self._subsystems[subsystem]["nodes"].append((name, nodeType))
+        return name
+
+    def addConnection(self, subsystem, source, destination):
+        """
+        :param str subsystem:
+        :param str source:
+        :param str destination:
+        """
+        self._subsystems[subsystem]["connections"].append(
+            (source, destination)
+        )
+
+    def addConnections(self, subsystem, source, destinations):
+        """
+        :param str subsystem:
+        :param str source:
+        :param list destinations:
+        """
+        for destination in destinations:
+            self.addConnection(subsystem, source, destination)
+
+    def removeConnections(self, destination):
+        """
+        Remove the incoming connections of a destination, this is used
+        when the build reroutes a connection.
+
+        :param str destination:
+        :return: sources of the removed connections
+        :rtype: list
+        """
+        sources = []
+        for subsystem in self._subsystems.values():
+            connections = []
+            for source, dest in subsystem["connections"]:
+                if dest == destination:
+                    sources.append(source)
+                else:
+                    connections.append((source, dest))
+
+            subsystem["connections"] = connections
+
+        return sources
+
+    # ------------------------------------------------------------------------
+
+    @property
+    def subsystems(self):
+        """
+        :return: nodes and connections per subsystem
+        :rtype: OrderedDict
+        """
+        return self._subsystems
+
+    @property
+    def data(self):
+        """
+        :return: additional data of the plan, (eg. parameters)
+        :rtype: dict
+        """
+        return self._data
+
+    @property
+    def nodes(self):
+        """
+        :return: nodes of all subsystems
+        :rtype: list
+        """
+        return [
+            node
+            for subsystem in self.subsystems.values()
+            for node in subsystem["nodes"]
+        ]
+
+    @property
+    def connections(self):
+        """
+        :return: connections of all subsystems
+        :rtype: list
+        """
+        return [
+            connection
+            for subsystem in self.subsystems.values()
+            for connection in subsystem["connections"]
+        ]
+
+    # ------------------------------------------------------------------------
+
+    @property
+    def counts(self):
+        """
+        :return: node and connection counts, in total, per subsystem and
+            per node type
+        :rtype: dict
+        """
+        types = {}
+        for _, nodeType in self.nodes:
+            types[nodeType] = types.get(nodeType, 0) + 1
+
+        return {
+            "nodes": len(self.nodes),
+            "connections": len(self.connections),
+            "subsystems": OrderedDict(
+                (
+                    key,
+                    {
+                        "nodes": len(subsystem["nodes"]),
+                        "connections": len(subsystem["connections"])
+                    }
+                )
+                for key, subsystem in self.subsystems.items()
+            ),
+            "types": types
+        }
+
+    @property
+    def cost(self):
+        """
+        :return: estimated relative evaluation cost, in total and per
+            subsystem
+        :rtype: dict
+        """
+        subsystems = OrderedDict()
+        for key, subsystem in self.subsystems.items():
+            subsystems[key] = sum(
+                NODE_COSTS.get(nodeType, NODE_COST_DEFAULT)
+                for _, nodeType in subsystem["nodes"]
+            ) + len(subsystem["connections"]) * CONNECTION_COST
+
+        return {
+            "total": sum(subsystems.values()),
+            "subsystems": subsystems
+        }
+
+    # ------------------------------------------------------------------------
+
+    def asDict(self):
+        """
+        :return: plan as a dictionary, which can be stored as json
+        :rtype: dict
+        """
+        return {
+            "subsystems": self.subsystems,
+            "counts": self.counts,
+            "cost": self.cost,
+            "data": self.data,
+        }
+
+
+# ----------------------------------------------------------------------------
+
+
+def getNodeTypes(nodes):
+    """
+    :param list nodes:
+    :return: number of nodes per node type
+    :rtype: dict
+    """
+    types = {}
+    for node in nodes:
+        nodeType = cmds.nodeType(node)
+        types[nodeType] = types.get(nodeType, 0) + 1
+
+    return types
+
+
+def comparePlan(plan, nodes):
+    """
+    Compare the node types of a plan with the nodes of the created rig,
+    every node type is compared except for the bookkeeping nodes of the
+    cluster deformers, see :data:`IGNORED_NODE_TYPES`.
+
+    :param Plan plan:
+    :param list nodes: nodes of the created rig
+    :return: differences as the count in the plan and the rig
+    :rtype: dict
+    """
+    planned = plan.counts["types"]
+    created = getNodeTypes(nodes)
+
+    differences = {}
+    for nodeType in set(planned.keys()) | set(created.keys()):
+        if nodeType in IGNORED_NODE_TYPES:
+            continue
+
+        numPlanned = planned.get(nodeType, 0)
+        numCreated = created.get(nodeType, 0)
+        if numPlanned != numCreated:
+            differences[nodeType] = (numPlanned, numCreated)
+
+    return differences
+
+
+def checkPlan(plan, nodes):
+    """
+    Check that a plan matches the rig it mirrors, this makes sure the
+    planner doesn't drift from the build when the build changes. The plan
+    has to be made before the build, as the build changes the curve.
+
+    Example:
+    ::
+        sik = SplineIK()
+        p = sik.plan("spine", curve, 20)
+        sik.create("spine", curve, 20)
+        checkPlan(p, container.getNodes(sik.container))
+
+    :param Plan plan:
+    :param list nodes: nodes of the created rig
+    :raises RuntimeError: When the node types don't match
+    """
+    differences = comparePlan(plan, nodes)
+    if differences:
+        raise RuntimeError(
+            "checkPlan: planned and created nodes differ {0}!".format(
+                differences
+            )
+        )
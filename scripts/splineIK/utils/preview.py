@@ -0,0 +1,76 @@
+from maya import cmds
+
+from . import undo
+
+
+PREVIEW_CURVE = "splineIK_preview_crv"
+
+
+# ----------------------------------------------------------------------------
+
+
+def getPreviewPoints(positions, ups, size=None):
+    """
+    Get the points of a linear curve that draws a joint chain. The curve
+    runs through all of the positions, at every position a line is drawn
+    in the direction of the up vector and back. This makes it possible to
+    draw the positions and orientations of all joints using a single
+    curve. When no size is provided the up lines are half the average
+    distance between the positions.
+
+    :param list positions:
+    :param list ups:
+    :param float/None size: length of the up lines
+    :return: points
+    :rtype: list
+    """
+    # get size
+    if size is None:
+        distances = [
+            sum((a - b) ** 2 for a, b in zip(p1, p2)) ** 0.5
+            for p1, p2 in zip(positions[:-1], positions[1:])
+        ]
+        size = sum(distances) / max(len(distances), 1) * 0.5
+
+    # get points
+    points = []
+    for pos, up in zip(positions, ups):
+        points.append(pos)
+        points.append([p + u * size for p, u in zip(pos, up)])
+        points.append(pos)
+
+    return points
+
+
+def drawPreview(positions, ups, size=None):
+    """
+    Draw a joint chain preview using a single template curve. When the
+    preview curve exists its points are replaced, the commands are not
+    recorded in the undo queue so the preview can be updated
+    interactively.
+
+    :param list positions:
+    :param list ups:
+    :param float/None size: length of the up lines
+    :return: preview curve
+    :rtype: str
+    """
+    points = getPreviewPoints(positions, ups, size)
+
+    with undo.UndoSuspendContext():
+        if cmds.objExists(PREVIEW_CURVE):
+            cmds.curve(PREVIEW_CURVE, replace=True, degree=1, point=points)
+        else:
+            cmds.curve(degree=1, point=points, name=PREVIEW_CURVE)
+            cmds.setAttr("{0}.template".format(PREVIEW_CURVE), 1)
+
+    return PREVIEW_CURVE
+
+
+def deletePreview():
+    """
+    Delete the preview curve if it exists.
+    """
+    with undo.UndoSuspendContext():
+        if cmds.objExists(PREVIEW_CURVE):
+            cmds.delete(PREVIEW_CURVE)
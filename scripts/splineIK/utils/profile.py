@@ -0,0 +1,226 @@
+import sys
+import time
+from maya import cmds
+
+
+def measurePlayback(plugs, start=None, end=None, iterations=1):
+    """
+    Measure the time it takes to evaluate a frame range. For every frame
+    the time is changed and the parsed plugs are pulled, this makes sure
+    the network driving the plugs is evaluated in both DG and parallel
+    evaluation mode. When no start or end is provided the playback range
+    is used.
+
+    :param list plugs: Plugs to pull, (eg. joint.worldMatrix)
+    :param int/None start:
+    :param int/None end:
+    :param int iterations: Number of times to evaluate the range
+    :return: frames per second
+    :rtype: float
+    """
+    # get range
+    if start is None:
+        start = int(cmds.playbackOptions(query=True, minTime=True))
+    if end is None:
+        end = int(cmds.playbackOptions(query=True, maxTime=True))
+
+    # store current time
+    current = cmds.currentTime(query=True)
+    frames = range(start, end + 1)
+
+    # evaluate range
+    t = time.time()
+    for _ in range(iterations):
+        for frame in frames:
+            cmds.currentTime(frame, update=True)
+            cmds.dgeval(plugs)
+
+    duration = time.time() - t
+
+    # restore current time
+    cmds.currentTime(current, update=True)
+
+    return (len(frames) * iterations) / max(duration, 1e-6)
+
+
+def measureToggle(attr, plugs, start=None, end=None, iterations=1):
+    """
+    Measure the playback gain of a boolean toggle, the frame range is
+    evaluated with the toggle enabled and disabled. The original value
+    of the toggle is restored afterwards.
+
+    Example:
+    ::
+        measureToggle(
+            "spine_root_ctrl.scale_enable",
+            ["{0}.worldMatrix".format(j) for j in ik.joints]
+        )
+
+    :param str attr: Boolean attribute, (eg. ctrl.scale_enable)
+    :param list plugs: Plugs to pull, (eg. joint.worldMatrix)
+    :param int/None start:
+    :param int/None end:
+    :param int iterations: Number of times to evaluate the range
+    :return: enabled fps, disabled fps and gain
+    :rtype: dict
+    """
+    value = cmds.getAttr(attr)
+    results = {}
+
+    for key, state in zip(["enabled", "disabled"], [1, 0]):
+        cmds.setAttr(attr, state)
+        results[key] = measurePlayback(plugs, start, end, iterations)
+
+    cmds.setAttr(attr, value)
+
+    results["gain"] = results["disabled"] / results["enabled"]
+    return results
+
+
+# ----------------------------------------------------------------------------
+
+
+def measureBuild(build, iterations=1):
+    """
+    Measure the time it takes to run a build function. The build is undone
+    after every iteration, this means the build function should wrap its
+    operations in a single undo chunk.
+
+    :param callable build:
+    :param int iterations: Number of times to run the build
+    :return: seconds per build
+    :rtype: float
+    """
+    duration = 0
+    for _ in range(iterations):
+        t = time.time()
+        build()
+        duration += time.time() - t
+
+        cmds.undo()
+
+    return duration / iterations
+
+
+def compareBuilds(reference, build, iterations=1):
+    """
+    Compare the time it takes to run a build function against a reference
+    build function, both builds are undone after every iteration.
+
+    Example:
+    ::
+        template = SplineIK().createTemplate("tpl", "curve1", 10)
+        compareBuilds(
+            lambda: SplineIK().create("hair", "curve2", 10),
+            lambda: SplineIK().createFromTemplate(template, "hair", "curve2")
+        )
+
+    :param callable reference:
+    :param callable build:
+    :param int iterations: Number of times to run the builds
+    :return: reference seconds, build seconds and speedup
+    :rtype: dict
+    """
+    results = {
+        "reference": measureBuild(reference, iterations),
+        "build": measureBuild(build, iterations),
+    }
+
+    results["speedup"] = results["reference"] / max(results["build"], 1e-6)
+    return results
+
+
+# ----------------------------------------------------------------------------
+
+
+def measureImport(name="splineIK"):
+    """
+    Measure the time it takes to import a package from scratch. The
+    modules of the package that are already imported are removed before
+    the import and restored afterwards, the modules that are imported by
+    the package itself are returned as well.
+
+    :param str name: Name of the package
+    :return: seconds and imported modules
+    :rtype: dict
+    """
+    def getModules():
+        return [
+            key
+            for key in sys.modules.keys()
+            if key == name or key.startswith("{0}.".format(name))
+        ]
+
+    # remove imported modules
+    stored = dict((key, sys.modules.pop(key)) for key in getModules())
+
+    try:
+        t = time.time()
+        __import__(name)
+        duration = time.time() - t
+
+        modules = sorted(key for key in getModules() if sys.modules[key])
+    finally:
+        for key in getModules():
+            sys.modules.pop(key)
+
+        sys.modules.update(stored)
+
+    return {"time": duration, "modules": modules}
+
+
+def checkImport(
+        name="splineIK",
+        reference="splineIK.create",
+        maxRatio=0.25,
+        maxTime=None,
+        allowed=None
+    ):
+    """
+    Check that importing a package stays cheap, this makes sure no heavy
+    modules are imported on startup by accident. When no allowed modules
+    are provided only the package itself is allowed to be imported.
+
+    The import time is compared against the import time of a reference
+    module, by default the create module with all of its utils, this
+    keeps the check independent of the speed of the machine. An absolute
+    maximum time can be provided as well.
+
+    :param str name: Name of the package
+    :param str/None reference: Name of the reference module
+    :param float maxRatio: maximum import time relative to the reference
+    :param float/None maxTime: maximum import time in seconds
+    :param list/None allowed: modules that are allowed to be imported
+    :return: seconds, imported modules and ratio to the reference
+    :rtype: dict
+    :raises RuntimeError: When the import is too slow or imports modules
+        that are not allowed
+    """
+    allowed = set(allowed or [name])
+    results = measureImport(name)
+
+    modules = [m for m in results["modules"] if m not in allowed]
+    if modules:
+        raise RuntimeError(
+            "checkImport: '{0}' imports {1}!".format(name, modules)
+        )
+
+    if reference:
+        duration = measureImport(reference)["time"]
+        results["ratio"] = results["time"] / max(duration, 1e-9)
+
+        if results["ratio"] > maxRatio:
+            raise RuntimeError(
+                "checkImport: '{0}' took {1:.0%} of the import time of "
+                "'{2}'!".format(name, results["ratio"], reference)
+            )
+
+    if maxTime is not None and results["time"] > maxTime:
+        raise RuntimeError(
+            "checkImport: '{0}' took {1:.3f}s to import!".format(
+                name,
+                results["time"]
+            )
+        )
+
+    return results
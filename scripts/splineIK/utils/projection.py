@@ -0,0 +1,153 @@
+"""
+Project points onto a curve that is sampled into a polyline. The closest
+parameters of all points are calculated in a single vectorized query when
+NumPy is available, the points are processed in chunks to keep the memory
+bounded. Without NumPy the points are projected one by one.
+
+samplePoints, _ = curve.getPointsAtParameters(curve, sampleParameters)
+parameters = getClosestParameters(points, samplePoints, sampleParameters)
+"""
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+CHUNK_SIZE = 4096
+SAMPLES_PER_SEGMENT = 8
+
+
+# ----------------------------------------------------------------------------
+
+
+def getSampleParameters(num):
+    """
+    :param int num:
+    :return: evenly spaced parameters between 0-1
+    :rtype: list
+    """
+    return [i / float(num - 1) for i in range(num)]
+
+
+# ----------------------------------------------------------------------------
+
+
+def getClosestParameter(point, samplePoints, sampleParameters):
+    """
+    :param list point:
+    :param list samplePoints:
+    :param list sampleParameters:
+    :return: closest parameter
+    :rtype: float
+    """
+    # get closest sample
+    distances = [
+        sum((p - s) ** 2 for p, s in zip(point, sample))
+        for sample in samplePoints
+    ]
+    index = distances.index(min(distances))
+    last = len(samplePoints) - 1
+
+    # project on the segments next to the closest sample
+    best = None
+    for i0, i1 in [(max(index - 1, 0), index), (index, min(index + 1, last))]:
+        a = samplePoints[i0]
+        b = samplePoints[i1]
+        ab = [y - x for x, y in zip(a, b)]
+        length = sum(v * v for v in ab)
+
+        t = 0.0
+        if length > 1e-12:
+            t = sum((p - x) * v for p, x, v in zip(point, a, ab)) / length
+            t = min(max(t, 0.0), 1.0)
+
+        distance = sum(
+            (p - x - v * t) ** 2
+            for p, x, v in zip(point, a, ab)
+        )
+        if best is None or distance < best[0]:
+            parameter = sampleParameters[i0] + t * (
+                sampleParameters[i1] - sampleParameters[i0]
+            )
+            best = (distance, parameter)
+
+    return best[1]
+
+
+def getClosestParametersNumpy(points, samplePoints, sampleParameters):
+    """
+    :param list/numpy.ndarray points:
+    :param list samplePoints:
+    :param list sampleParameters:
+    :return: closest parameters
+    :rtype: numpy.ndarray
+    """
+    # variables
+    points = numpy.asarray(points, dtype=float)[:, :3]
+    samples = numpy.asarray(samplePoints, dtype=float)
+    parameters = numpy.asarray(sampleParameters, dtype=float)
+    squared = (samples ** 2).sum(axis=1)
+    last = len(samples) - 1
+
+    # get closest samples, processed in chunks so the distance matrix
+    # stays small
+    indices = numpy.empty(len(points), dtype=int)
+    for start in range(0, len(points), CHUNK_SIZE):
+        chunk = points[start:start + CHUNK_SIZE]
+        distances = squared[None, :] - 2.0 * chunk.dot(samples.T)
+        indices[start:start + CHUNK_SIZE] = distances.argmin(axis=1)
+
+    # project on the segments next to the closest samples
+    bestDistance = None
+    bestParameter = None
+    for i0, i1 in [
+        (numpy.maximum(indices - 1, 0), indices),
+        (indices, numpy.minimum(indices + 1, last))
+    ]:
+        a = samples[i0]
+        ab = samples[i1] - a
+        length = (ab ** 2).sum(axis=1)
+
+        t = ((points - a) * ab).sum(axis=1) / numpy.maximum(length, 1e-12)
+        t = numpy.clip(t, 0.0, 1.0)
+
+        distance = ((points - a - ab * t[:, None]) ** 2).sum(axis=1)
+        parameter = parameters[i0] + t * (parameters[i1] - parameters[i0])
+
+        if bestDistance is None:
+            bestDistance, bestParameter = distance, parameter
+            continue
+
+        closer = distance < bestDistance
+        bestDistance = numpy.where(closer, distance, bestDistance)
+        bestParameter = numpy.where(closer, parameter, bestParameter)
+
+    return bestParameter
+
+
+def getClosestParameters(points, samplePoints, sampleParameters):
+    """
+    Get the closest parameter on a sampled curve for every point. The
+    points are projected onto the segments next to their closest sample,
+    the parameter is interpolated along that segment.
+
+    :param list points:
+    :param list samplePoints:
+    :param list sampleParameters:
+    :return: parameters
+    :rtype: list/numpy.ndarray
+    """
+    if not len(points):
+        return []
+
+    if numpy is not None:
+        return getClosestParametersNumpy(
+            points,
+            samplePoints,
+            sampleParameters
+        )
+
+    return [
+        getClosestParameter(point[:3], samplePoints, sampleParameters)
+        for point in points
+    ]
@@ -0,0 +1,463 @@
+"""
+Bind geometry to the joints of a spline IK. All vertices are projected
+onto the curve in a single closest parameter query, the weights are
+calculated from the distance in parameter space between a vertex and the
+parameters of the joints. The weights are written to the skin cluster in
+a single call. When NumPy is available the projection and weights are
+calculated vectorized. Geometry can also be bound to matrices instead of
+joints, the matrices are connected to a skin cluster without influence
+objects. The weights are calculated and set per vertex, which means only
+meshes can be bound.
+
+sc = bindSkin(geometry, joints, curveShape, jointParameters)
+sc = bindMatrices(geometry, matrices, bindPreMatrices, curveShape, ...)
+"""
+from maya import cmds, OpenMaya, OpenMayaAnim
+
+from . import api, curve, projection
+
+numpy = projection.numpy
+
+
+# ----------------------------------------------------------------------------
+
+
+def getFalloff(distance, radius):
+    """
+    Get the weight of a distance within a radius, the weights of two
+    neighbouring joints add up to one when the radius is the distance
+    between the joints.
+
+    :param float distance:
+    :param float radius:
+    :return: weight
+    :rtype: float
+    """
+    x = min(abs(distance) / max(radius, 1e-12), 1.0)
+    return 1 - x * x * (3 - 2 * x)
+
+
+def getRadii(jointParameters, falloff):
+    """
+    Get the radius before and after every joint, the radius is the
+    distance to the neighbouring joint multiplied by the falloff. The
+    first and last joint use the radius of the other side.
+
+    :param list jointParameters:
+    :param float falloff:
+    :return: radii before, radii after
+    :rtype: tuple
+    """
+    gaps = [b - a for a, b in zip(jointParameters[:-1], jointParameters[1:])]
+    before = [gaps[0]] + gaps
+    after = gaps + [gaps[-1]]
+
+    return (
+        [gap * falloff for gap in before],
+        [gap * falloff for gap in after]
+    )
+
+
+def getWeights(parameters, jointParameters, falloff=1.0, maxInfluences=4):
+    """
+    Get the weights of a list of parameters, the weights are returned as
+    a flat list with a weight for every joint per parameter. Only the
+    highest weights up to the maximum number of influences are kept and
+    normalized. When a parameter is outside of the radius of all joints
+    it is fully weighted to the closest joint.
+
+    :param list parameters: closest parameter of every vertex
+    :param list jointParameters:
+    :param float falloff: radius in number of joints, default 1
+    :param int maxInfluences:
+    :return: weights
+    :rtype: list
+    """
+    if numpy is not None:
+        return getWeightsNumpy(
+            parameters,
+            jointParameters,
+            falloff,
+            maxInfluences
+        )
+
+    # variables
+    weights = []
+    before, after = getRadii(jointParameters, falloff)
+
+    for parameter in parameters:
+        # get weights
+        values = [
+            getFalloff(
+                parameter - p,
+                before[j] if parameter < p else after[j]
+            )
+            for j, p in enumerate(jointParameters)
+        ]
+
+        # fallback to closest joint
+        if not sum(values):
+            distances = [abs(parameter - p) for p in jointParameters]
+            values[distances.index(min(distances))] = 1.0
+
+        # cap influences
+        order = sorted(range(len(values)), key=lambda j: -values[j])
+        for j in order[maxInfluences:]:
+            values[j] = 0.0
+
+        # normalize
+        total = sum(values)
+        weights.extend(value / total for value in values)
+
+    return weights
+
+
+def getWeightsNumpy(parameters, jointParameters, falloff, maxInfluences):
+    """
+    :param list/numpy.ndarray parameters:
+    :param list jointParameters:
+    :param float falloff:
+    :param int maxInfluences:
+    :return: weights
+    :rtype: list
+    """
+    # variables
+    parameters = numpy.asarray(parameters, dtype=float)
+    joints = numpy.asarray(jointParameters, dtype=float)
+    before, after = [
+        numpy.asarray(radii, dtype=float)
+        for radii in getRadii(jointParameters, falloff)
+    ]
+
+    # get weights, processed in chunks so the weight matrix stays small
+    chunks = []
+    for start in range(0, len(parameters), projection.CHUNK_SIZE):
+        chunk = parameters[start:start + projection.CHUNK_SIZE]
+        distances = chunk[:, None] - joints[None, :]
+
+        radii = numpy.where(distances < 0, before, after)
+        x = numpy.minimum(
+            numpy.abs(distances) / numpy.maximum(radii, 1e-12),
+            1.0
+        )
+        values = 1 - x * x * (3 - 2 * x)
+
+        # fallback to closest joint
+        empty = values.sum(axis=1) == 0
+        if empty.any():
+            closest = numpy.abs(distances[empty]).argmin(axis=1)
+            values[numpy.nonzero(empty)[0], closest] = 1.0
+
+        # cap influences
+        if maxInfluences < len(joints):
+            indices = numpy.argpartition(
+                -values,
+                maxInfluences - 1,
+                axis=1
+            )[:, maxInfluences:]
+            rows = numpy.arange(len(values))[:, None]
+            values[rows, indices] = 0.0
+
+        # normalize
+        chunks.append(values / values.sum(axis=1)[:, None])
+
+    return numpy.concatenate(chunks).ravel().tolist()
+
+
+# ----------------------------------------------------------------------------
+
+
+def getMeshShape(geometry):
+    """
+    Get the mesh shape of geometry, the geometry can be the mesh shape
+    itself or its transform.
+
+    :param str geometry:
+    :return: mesh shape
+    :rtype: str
+    :raises ValueError: When the geometry is not a mesh
+    """
+    shapes = cmds.ls(geometry, type="mesh", long=True)
+    shapes = shapes or cmds.listRelatives(
+        geometry,
+        shapes=True,
+        noIntermediate=True,
+        fullPath=True,
+        type="mesh"
+    )
+
+    if not shapes:
+        raise ValueError(
+            "getMeshShape: '{0}' is not a mesh, only meshes can be "
+            "bound!".format(geometry)
+        )
+
+    return shapes[0]
+
+
+def getPoints(geometry):
+    """
+    :param str geometry: mesh or its transform
+    :return: world space positions of the vertices
+    :rtype: list
+    :raises ValueError: When the geometry is not a mesh
+    """
+    values = cmds.xform(
+        "{0}.vtx[*]".format(getMeshShape(geometry)),
+        query=True,
+        worldSpace=True,
+        translation=True
+    )
+    return [values[i:i + 3] for i in range(0, len(values), 3)]
+
+
+def getClosestParameters(points, curveShape, numJoints):
+    """
+    Get the closest normalized parameter on the curve for every point,
+    the curve is sampled with a fixed number of samples between two joints.
+
+    :param list points:
+    :param str curveShape:
+    :param int numJoints:
+    :return: parameters
+    :rtype: list/numpy.ndarray
+    """
+    num = (numJoints - 1) * projection.SAMPLES_PER_SEGMENT + 1
+    sampleParameters = projection.getSampleParameters(num)
+    samplePoints, _ = curve.getPointsAtParameters(
+        curveShape,
+        sampleParameters
+    )
+
+    return projection.getClosestParameters(
+        points,
+        samplePoints,
+        sampleParameters
+    )
+
+
+def getGeometryWeights(
+        geometry,
+        curveShape,
+        jointParameters,
+        falloff=1.0,
+        maxInfluences=4
+    ):
+    """
+    :param str geometry: mesh or its transform
+    :param str curveShape:
+    :param list jointParameters:
+    :param float falloff:
+    :param int maxInfluences:
+    :return: weights
+    :rtype: list
+    :raises ValueError: When the geometry is not a mesh
+    """
+    points = getPoints(geometry)
+    parameters = getClosestParameters(
+        points,
+        curveShape,
+        len(jointParameters)
+    )
+
+    return getWeights(
+        parameters,
+        jointParameters,
+        falloff,
+        maxInfluences
+    )
+
+
+def setWeights(skinCluster, joints, weights):
+    """
+    Set all weights of a skin cluster in a single call. The weights are
+    ordered per vertex with a weight for every joint, they are reordered
+    to match the influences of the skin cluster.
+
+    :param str skinCluster: skin cluster deforming a mesh
+    :param list joints:
+    :param list weights:
+    :raises ValueError: When the skin cluster doesn't deform a mesh
+    """
+    # variables
+    fnSkinCluster = OpenMayaAnim.MFnSkinCluster(api.toMObject(skinCluster))
+    shape = cmds.skinCluster(skinCluster, query=True, geometry=True)[0]
+    dag = api.toMDagPath(getMeshShape(shape))
+    numJoints = len(joints)
+
+    # get influence order
+    paths = OpenMaya.MDagPathArray()
+    fnSkinCluster.influenceObjects(paths)
+    influences = [paths[i].fullPathName() for i in range(paths.length())]
+
+    order = [
+        influences.index(cmds.ls(jnt, long=True)[0])
+        for jnt in joints
+    ]
+    if order != list(range(numJoints)):
+        ordered = [0.0] * len(weights)
+        for i in range(0, len(weights), numJoints):
+            for j, index in enumerate(order):
+                ordered[i + index] = weights[i + j]
+
+        weights = ordered
+
+    # get components
+    fnComponent = OpenMaya.MFnSingleIndexedComponent()
+    components = fnComponent.create(OpenMaya.MFn.kMeshVertComponent)
+    fnComponent.setCompleteData(len(weights) // numJoints)
+
+    # get arrays, the weights are copied in one go as filling the array
+    # value by value is slow on dense meshes
+    indices = OpenMaya.MIntArray()
+    for i in range(numJoints):
+        indices.append(i)
+
+    util = OpenMaya.MScriptUtil()
+    util.createFromList(weights, len(weights))
+    values = OpenMaya.MDoubleArray(util.asDoublePtr(), len(weights))
+
+    fnSkinCluster.setWeights(dag, components, indices, values, False)
+
+
+def setWeightList(skinCluster, weights, numInfluences):
+    """
+    Set the weights of a skin cluster per vertex, the weights of a vertex
+    are set in a single call as a range between its first and last
+    influence that is not zero. Skin clusters without influence objects
+    can't be set using :func:`setWeights`.
+
+    :param str skinCluster:
+    :param list weights:
+    :param int numInfluences:
+    """
+    for i in range(0, len(weights), numInfluences):
+        values = weights[i:i + numInfluences]
+        indices = [j for j, weight in enumerate(values) if weight]
+        if not indices:
+            continue
+
+        first, last = indices[0], indices[-1]
+        cmds.setAttr(
+            "{0}.weightList[{1}].weights[{2}:{3}]".format(
+                skinCluster,
+                i // numInfluences,
+                first,
+                last
+            ),
+            *values[first:last + 1]
+        )
+
+
+def bindSkin(
+        geometry,
+        joints,
+        curveShape,
+        jointParameters,
+        falloff=1.0,
+        maxInfluences=4
+    ):
+    """
+    Bind geometry to the joints of a spline IK. The skin cluster is
+    created with a closest distance bind, after which all weights are
+    replaced with weights calculated from the closest parameter of every
+    vertex on the curve. The curve and joints are expected to be in
+    their rest pose.
+
+    :param str geometry:
+    :param list joints:
+    :param str curveShape:
+    :param list jointParameters: normalized parameters of the joints
+    :param float falloff: radius in number of joints, default 1
+    :param int maxInfluences:
+    :return: skin cluster
+    :rtype: str
+    """
+    # get weights
+    weights = getGeometryWeights(
+        geometry,
+        curveShape,
+        jointParameters,
+        falloff,
+        maxInfluences
+    )
+
+    # create skin cluster
+    skinCluster = cmds.skinCluster(
+        joints,
+        geometry,
+        toSelectedBones=True,
+        bindMethod=0,
+        maximumInfluences=maxInfluences,
+        obeyMaxInfluences=False,
+        normalizeWeights=1,
+        n="{0}_sc".format(geometry.split("|")[-1])
+    )[0]
+
+    # set weights
+    setWeights(skinCluster, joints, weights)
+    return skinCluster
+
+
+def bindMatrices(
+        geometry,
+        matrices,
+        bindPreMatrices,
+        curveShape,
+        jointParameters,
+        falloff=1.0,
+        maxInfluences=4
+    ):
+    """
+    Bind geometry to matrices instead of joints. The skin cluster is
+    created without influence objects, the matrices are connected and the
+    bind pre matrices are set directly. The weights are calculated the
+    same as :func:`bindSkin`, the curve is expected to be in its rest
+    pose.
+
+    :param str geometry:
+    :param list matrices: world matrix attributes
+    :param list bindPreMatrices: inverse rest matrices as 16 values
+    :param str curveShape:
+    :param list jointParameters: normalized parameters of the matrices
+    :param float falloff: radius in number of matrices, default 1
+    :param int maxInfluences:
+    :return: skin cluster
+    :rtype: str
+    """
+    # get weights
+    weights = getGeometryWeights(
+        geometry,
+        curveShape,
+        jointParameters,
+        falloff,
+        maxInfluences
+    )
+
+    # create skin cluster
+    skinCluster = cmds.deformer(
+        geometry,
+        type="skinCluster",
+        n="{0}_sc".format(geometry.split("|")[-1])
+    )[0]
+
+    cmds.setAttr(
+        "{0}.geomMatrix".format(skinCluster),
+        cmds.getAttr("{0}.worldMatrix[0]".format(geometry)),
+        type="matrix"
+    )
+
+    # connect matrices
+    for i, (matrix, bindPreMatrix) in enumerate(
+        zip(matrices, bindPreMatrices)
+    ):
+        cmds.connectAttr(matrix, "{0}.matrix[{1}]".format(skinCluster, i))
+        cmds.setAttr(
+            "{0}.bindPreMatrix[{1}]".format(skinCluster, i),
+            bindPreMatrix,
+            type="matrix"
+        )
+
+    # set weights
+    setWeightList(skinCluster, weights, len(matrices))
+    return skinCluster
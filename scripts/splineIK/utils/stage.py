@@ -0,0 +1,249 @@
+"""
+Run staged builds. A staged build is a generator that yields progress and
+jobs. Progress is yielded as a (stage, progress) tuple in between batches
+of scene operations, these are the points where a build can be paused or
+cancelled. A job holds a pure python calculation that doesn't interact
+with the scene, this means it can be executed outside of Maya's main
+thread. The result is stored on the job before the build is continued.
+
+def build():
+    job = Job(math.remapWeighting, values1, values2)
+    yield job
+
+    for i, weight in enumerate(job.result):
+        # scene operations
+        yield "joints", (i + 1) / float(len(job.result))
+
+run(build())
+
+A staged build can also be spread over Maya's idle events using the
+deferred run, the jobs are then executed in a separate thread.
+
+DeferredRun(build(), progress=func, finished=func).start()
+"""
+import time
+import threading
+from maya import utils
+
+from . import undo, track
+
+
+class Job(object):
+    """
+    The job holds a function and its arguments, calling the job will
+    store the result of the function.
+
+    :param func func:
+    """
+    def __init__(self, func, *args, **kwargs):
+        self._func = func
+        self._args = args
+        self._kwargs = kwargs
+        self._result = None
+
+    def __call__(self):
+        self._result = self._func(*self._args, **self._kwargs)
+        return self._result
+
+    # ------------------------------------------------------------------------
+
+    @property
+    def result(self):
+        """
+        :return: result of the function
+        """
+        return self._result
+
+
+# ----------------------------------------------------------------------------
+
+
+def step(stages):
+    """
+    Continue a staged build until it yields progress or a job.
+
+    :param generator stages:
+    :return: progress, job or None when the build is finished
+    :rtype: tuple/Job/None
+    """
+    try:
+        return next(stages)
+    except StopIteration:
+        return None
+
+
+def run(stages):
+    """
+    Run a staged build in full, jobs are executed on the current thread.
+
+    :param generator stages:
+    """
+    for item in stages:
+        if isinstance(item, Job):
+            item()
+
+
+def trackNodes(stages, tracker):
+    """
+    Continue a staged build with the node tracker only active while the
+    build itself is continued. The tracker is stopped while the build is
+    paused, this way nodes created in between the slices of a deferred
+    run, by the user or other tools, are not tracked as part of the build.
+
+    :param generator stages:
+    :param splineIK.utils.track.NodeTracker tracker:
+    :return: stages
+    :rtype: generator
+    """
+    try:
+        while True:
+            tracker.start()
+            try:
+                item = step(stages)
+            finally:
+                tracker.stop()
+
+            if item is None:
+                return
+
+            yield item
+    finally:
+        stages.close()
+
+
+# ----------------------------------------------------------------------------
+
+
+class DeferredRun(object):
+    """
+    The deferred run continues a staged build on Maya's idle events, the
+    scene operations are executed in slices of a maximum time. This
+    keeps the interface responsive during long builds. Jobs are executed
+    in a separate thread, the build is continued on the main thread once
+    the job is finished. Maya's API is not thread safe, so only jobs are
+    executed outside of the main thread. All slices are ran with undo
+    recording suspended and the created nodes are tracked, it is up to
+    the finished callback to delete the nodes or register the build as
+    an undoable command.
+
+    The progress callback is called with the stage and progress, the
+    finished callback is called with the deferred run.
+
+    :param generator stages:
+    :param func/None progress:
+    :param func/None finished:
+    :param float sliceTime: maximum time of a slice in seconds
+    """
+    def __init__(self, stages, progress=None, finished=None, sliceTime=0.05):
+        self._stages = stages
+        self._progress = progress
+        self._finished = finished
+        self._sliceTime = sliceTime
+
+        self._nodes = []
+        self._error = None
+        self._cancelled = False
+        self._running = False
+
+    # ------------------------------------------------------------------------
+
+    @property
+    def nodes(self):
+        """
+        :return: nodes created by the build
+        :rtype: list
+        """
+        return self._nodes
+
+    @property
+    def error(self):
+        """
+        :return: error raised by the build
+        :rtype: Exception/None
+        """
+        return self._error
+
+    @property
+    def cancelled(self):
+        """
+        :return: cancelled state
+        :rtype: bool
+        """
+        return self._cancelled
+
+    @property
+    def running(self):
+        """
+        :return: running state
+        :rtype: bool
+        """
+        return self._running
+
+    # ------------------------------------------------------------------------
+
+    def start(self):
+        """
+        Start the build on the next idle event.
+        """
+        self._running = True
+        utils.executeDeferred(self.__continue)
+
+    def cancel(self):
+        """
+        Cancel the build, the build is stopped at the next slice. A job
+        that is executing can not be interrupted, its result is ignored.
+        """
+        self._cancelled = True
+
+    # ------------------------------------------------------------------------
+
+    def __continue(self):
+        # variables
+        job = None
+        finished = False
+        end = time.time() + self._sliceTime
+
+        with undo.UndoSuspendContext(), track.NodeTracker() as tracker:
+            try:
+                if self._error or self._cancelled:
+                    self._stages.close()
+                    finished = True
+
+                while not finished:
+                    item = step(self._stages)
+                    if item is None:
+                        finished = True
+                    elif isinstance(item, Job):
+                        job = item
+                        break
+                    else:
+                        if self._progress:
+                            self._progress(*item)
+                        if time.time() > end:
+                            break
+
+            except Exception as e:
+                self._error = e
+                finished = True
+            finally:
+                self._nodes.extend(tracker.nodes)
+
+        # continue build
+        if finished:
+            self._running = False
+            if self._finished:
+                self._finished(self)
+        elif job:
+            thread = threading.Thread(target=self.__runJob, args=(job,))
+            thread.daemon = True
+            thread.start()
+        else:
+            utils.executeDeferred(self.__continue)
+
+    def __runJob(self, job):
+        try:
+            job()
+        except Exception as e:
+            self._error = e
+
+        utils.executeDeferred(self.__continue)
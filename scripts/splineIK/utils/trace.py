@@ -0,0 +1,513 @@
+"""
+Record the scene operations of a build as a trace. While the recorder is
+active the commands that create and connect nodes are wrapped, every call
+is stored together with its arguments and result. The names of the
+created nodes, the name of the rig and the curve are replaced by tokens,
+this makes it possible to replay a trace on another curve with another
+name and to compare traces between versions to catch network growth.
+
+with Recorder(name, curve) as recorder:
+    # build
+trace = Trace(recorder.operations, state, topology)
+trace.save(path)
+Trace.load(path).replay(newName, newCurve)
+"""
+import json
+from maya import cmds
+
+
+try:
+    STRING_TYPES = (str, unicode)
+except NameError:
+    STRING_TYPES = (str,)
+
+
+# ----------------------------------------------------------------------------
+
+
+OPERATIONS = [
+    "addAttr",
+    "cluster",
+    "connectAttr",
+    "createNode",
+    "curve",
+    "delete",
+    "group",
+    "joint",
+    "makeIdentity",
+    "parent",
+    "parentConstraint",
+    "removeMultiInstance",
+    "rename",
+    "scaleConstraint",
+    "select",
+    "setAttr",
+    "spaceLocator",
+    "xform",
+]
+
+NAME_TOKEN = "{name}"
+CURVE_TOKEN = "{curve}"
+ITEMS_KEY = "__items__"
+VERSION = 1
+
+
+# ----------------------------------------------------------------------------
+
+
+def isQuery(kwargs):
+    """
+    :param dict kwargs: Flags of a command
+    :return: if the command is ran in query mode
+    :rtype: bool
+    """
+    return bool(kwargs.get("query") or kwargs.get("q"))
+
+
+def splitNode(value):
+    """
+    Split a string into the path components of the node and the remaining
+    attribute, (eg. "|grp|node.attr" -> ["", "grp", "node"], ".attr")
+
+    :param str value:
+    :return: components, attribute
+    :rtype: tuple
+    """
+    node, dot, attr = value.partition(".")
+    return node.split("|"), dot + attr
+
+
+def joinNode(components, attr):
+    """
+    :param list components:
+    :param str attr:
+    :return: joined node and attribute
+    :rtype: str
+    """
+    return "|".join(components) + attr
+
+
+def flatten(value):
+    """
+    :param str/list/tuple/None value:
+    :return: flattened list of strings
+    :rtype: list
+    """
+    if isinstance(value, (list, tuple)):
+        return [v for item in value for v in flatten(item)]
+    elif isinstance(value, STRING_TYPES):
+        return [value]
+
+    return []
+
+
+def encode(value):
+    """
+    Encode a value to be stored as json, dictionaries are stored as a list
+    of items as json doesn't support keys other than strings.
+
+    :param value:
+    :return: encoded value
+    """
+    if isinstance(value, (list, tuple)):
+        return [encode(v) for v in value]
+    elif isinstance(value, dict):
+        return {ITEMS_KEY: [[k, encode(v)] for k, v in value.items()]}
+
+    return value
+
+
+def decode(value):
+    """
+    Decode a value stored as json, see :func:`encode`.
+
+    :param value:
+    :return: decoded value
+    """
+    if isinstance(value, list):
+        return [decode(v) for v in value]
+    elif isinstance(value, dict):
+        return {k: decode(v) for k, v in value[ITEMS_KEY]}
+
+    return value
+
+
+# ----------------------------------------------------------------------------
+
+
+class Recorder(object):
+    """
+    The recorder keeps track of all scene operations that are executed
+    using maya.cmds while the context is active, queries are ignored.
+    Node names are stored as role based references, the name prefix is
+    replaced with "{name}" and the curve with "{curve}". Nodes that are not
+    prefixed, like the default names of clusters, are resolved from the
+    results of the operations when replayed. Can be used in combination
+    with the "with" statement.
+
+    with Recorder(name, curve) as recorder:
+        # code
+
+    operations = recorder.operations
+    """
+    def __init__(self, name, curve):
+        self._name = name
+        self._curve = curve
+        self._known = set([curve])
+        self._operations = []
+        self._functions = {}
+
+    # ------------------------------------------------------------------------
+
+    def __enter__(self):
+        for func in OPERATIONS:
+            self._functions[func] = getattr(cmds, func)
+            setattr(cmds, func, self.__wrap(func))
+
+        return self
+
+    def __exit__(self, *exc_info):
+        for func, original in self._functions.items():
+            setattr(cmds, func, original)
+
+        self._functions = {}
+
+    def __wrap(self, func):
+        original = self._functions[func]
+
+        def wrapper(*args, **kwargs):
+            result = original(*args, **kwargs)
+            if not isQuery(kwargs):
+                self.__record(func, args, kwargs, result)
+
+            return result
+
+        return wrapper
+
+    def __record(self, func, args, kwargs, result):
+        # tokenize arguments, new names are always tokenized
+        args = [
+            self.tokenize(arg, force=func == "rename" and i == 1)
+            for i, arg in enumerate(args)
+        ]
+        kwargs = {
+            key: self.tokenize(value, force=key in ["n", "name"])
+            for key, value in kwargs.items()
+        }
+
+        # store result names
+        for value in flatten(result):
+            components, _ = splitNode(value)
+            self._known.update(c for c in components if c)
+
+        self._operations.append([func, args, kwargs, self.tokenize(result)])
+
+    # ------------------------------------------------------------------------
+
+    @property
+    def operations(self):
+        """
+        :return: recorded operations [function, args, kwargs, result]
+        :rtype: list
+        """
+        return self._operations
+
+    # ------------------------------------------------------------------------
+
+    def __tokenizeComponent(self, component, force=False):
+        if not force and component not in self._known:
+            return component
+
+        if component == self._curve:
+            return CURVE_TOKEN
+        elif component.startswith(self._name):
+            return NAME_TOKEN + component[len(self._name):]
+
+        return component
+
+    def tokenize(self, value, force=False):
+        """
+        Replace the node names in the value with role based references.
+        Lists, tuples and dictionaries are processed recursively.
+
+        :param value:
+        :param bool force: tokenize names that are not created yet
+        :return: tokenized value
+        """
+        if isinstance(value, (list, tuple)):
+            return [self.tokenize(v, force) for v in value]
+        elif isinstance(value, dict):
+            return {k: self.tokenize(v, force) for k, v in value.items()}
+        elif not isinstance(value, STRING_TYPES):
+            return value
+
+        components, attr = splitNode(value)
+        components = [
+            self.__tokenizeComponent(c, force)
+            for c in components
+        ]
+
+        return joinNode(components, attr)
+
+
+# ----------------------------------------------------------------------------
+
+
+class Trace(object):
+    """
+    A trace holds the recorded operations of a build together with the
+    role based state of the build and its topology. Replaying a trace will
+    execute the operations in order without any of the planning that was
+    required to generate them.
+
+    :param list operations:
+    :param dict state:
+    :param dict topology:
+    """
+    def __init__(self, operations, state, topology):
+        self._operations = operations
+        self._state = state
+        self._topology = topology
+
+    # ------------------------------------------------------------------------
+
+    @property
+    def operations(self):
+        """
+        :return: recorded operations [function, args, kwargs, result]
+        :rtype: list
+        """
+        return self._operations
+
+    @property
+    def state(self):
+        """
+        :return: role based state of the build
+        :rtype: dict
+        """
+        return self._state
+
+    @property
+    def topology(self):
+        """
+        :return: topology of the build, (eg. number of cvs)
+        :rtype: dict
+        """
+        return self._topology
+
+    # ------------------------------------------------------------------------
+
+    def replay(self, name, curve):
+        """
+        Replay the operations on a new name and curve. The names of the
+        nodes created during the replay are mapped to the roles of the
+        trace, the state is returned with all of its roles resolved.
+
+        :param str name:
+        :param str curve:
+        :return: resolved state
+        :rtype: dict
+        """
+        results = {}
+
+        def resolve(value):
+            if isinstance(value, (list, tuple)):
+                return [resolve(v) for v in value]
+            elif isinstance(value, dict):
+                return {k: resolve(v) for k, v in value.items()}
+            elif not isinstance(value, STRING_TYPES):
+                return value
+
+            components, attr = splitNode(value)
+            components = [
+                results.get(c) or
+                c.replace(NAME_TOKEN, name).replace(CURVE_TOKEN, curve)
+                for c in components
+            ]
+
+            return joinNode(components, attr)
+
+        # replay operations
+        for func, args, kwargs, result in self.operations:
+            actual = getattr(cmds, func)(*resolve(args), **resolve(kwargs))
+
+            # map recorded names to the actual names
+            for recorded, value in zip(flatten(result), flatten(actual)):
+                recorded, _ = splitNode(recorded)
+                value, _ = splitNode(value)
+                results[recorded[-1]] = value[-1]
+
+        return resolve(self.state)
+
+    # ------------------------------------------------------------------------
+
+    def save(self, path):
+        """
+        Store the trace on disk as json.
+
+        :param str path:
+        """
+        data = {
+            "version": VERSION,
+            "operations": encode(self.operations),
+            "state": encode(self.state),
+            "topology": encode(self.topology),
+        }
+
+        with open(path, "w") as f:
+            json.dump(data, f, separators=(",", ":"))
+
+    @classmethod
+    def load(cls, path):
+        """
+        Load a trace that was stored on disk using :meth:`Trace.save`.
+
+        :param str path:
+        :return: trace
+        :rtype: Trace
+        :raises ValueError: When the version of the trace is not supported
+        """
+        with open(path, "r") as f:
+            data = json.load(f)
+
+        if data.get("version") != VERSION:
+            raise ValueError("load: trace version is not supported!")
+
+        return cls(
+            decode(data["operations"]),
+            decode(data["state"]),
+            decode(data["topology"])
+        )
+
+
+# ----------------------------------------------------------------------------
+
+
+def summarize(operations):
+    """
+    Count the operations of a trace per function, created nodes are
+    counted per node type, (eg. "createNode:multDoubleLinear").
+
+    :param list operations:
+    :return: counts
+    :rtype: dict
+    """
+    counts = {}
+    for func, args, kwargs, result in operations:
+        key = func
+        if func == "createNode":
+            key = "{0}:{1}".format(func, args[0])
+
+        counts[key] = counts.get(key, 0) + 1
+
+    return counts
+
+
+def getCreatedNodes(operations):
+    """
+    :param list operations:
+    :return: role based names of all nodes created by the operations
+    :rtype: set
+    """
+    nodes = set()
+    for func, args, kwargs, result in operations:
+        if func == "setAttr" or func == "connectAttr":
+            continue
+
+        for value in flatten(result):
+            components, _ = splitNode(value)
+            nodes.add(components[-1])
+
+    return nodes
+
+
+def diff(a, b):
+    """
+    Compare two traces, this can be used to catch accidental network
+    growth between versions. Only the differences are returned, the
+    operation counts are returned as a tuple of the count in trace a
+    and trace b.
+
+    Example:
+    ::
+        diff(Trace.load(pathA), Trace.load(pathB))
+        # {
+        #     "operations": {"createNode:multDoubleLinear": (40, 80)},
+        #     "added": ["{name}_scale_mdl_021", ...],
+        #     "removed": [],
+        # }
+
+    :param Trace a:
+    :param Trace b:
+    :return: operations, added and removed nodes
+    :rtype: dict
+    """
+    countsA = summarize(a.operations)
+    countsB = summarize(b.operations)
+
+    operations = {}
+    for key in set(countsA.keys()) | set(countsB.keys()):
+        countA = countsA.get(key, 0)
+        countB = countsB.get(key, 0)
+        if countA != countB:
+            operations[key] = (countA, countB)
+
+    nodesA = getCreatedNodes(a.operations)
+    nodesB = getCreatedNodes(b.operations)
+
+    return {
+        "operations": operations,
+        "added": sorted(nodesB - nodesA),
+        "removed": sorted(nodesA - nodesB),
+    }
+
+
+def checkMatrices(nodes, references, tolerance=1e-4):
+    """
+    Check that the world matrices of the nodes match the world matrices
+    of the reference nodes. This can be used to check that a spline IK
+    created from a template ends up in the same rest pose as a spline IK
+    that is created directly on the same curve.
+
+    Example:
+    ::
+        template = SplineIK().createTemplate("tpl", "curve1", 10)
+        a = SplineIK()
+        a.createFromTemplate(template, "a", "curve2")
+        b = SplineIK()
+        b.create("b", cmds.duplicate("curve2")[0], 10)
+        checkMatrices(a.joints, b.joints)
+
+    :param list nodes:
+    :param list references:
+    :param float tolerance: maximum difference of a matrix value
+    :return: maximum difference
+    :rtype: float
+    :raises RuntimeError: When the number of nodes doesn't match or the
+        matrices of nodes differ more than the tolerance
+    """
+    if len(nodes) != len(references):
+        raise RuntimeError(
+            "checkMatrices: {0} nodes don't match {1} references!".format(
+                len(nodes),
+                len(references)
+            )
+        )
+
+    maximum = 0.0
+    failed = []
+    for node, reference in zip(nodes, references):
+        a = cmds.xform(node, query=True, worldSpace=True, matrix=True)
+        b = cmds.xform(reference, query=True, worldSpace=True, matrix=True)
+
+        difference = max(abs(x - y) for x, y in zip(a, b))
+        maximum = max(maximum, difference)
+        if difference > tolerance:
+            failed.append(node)
+
+    if failed:
+        raise RuntimeError(
+            "checkMatrices: {0} don't match their reference!".format(failed)
+        )
+
+    return maximum
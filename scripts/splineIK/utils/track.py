@@ -0,0 +1,82 @@
+from maya import OpenMaya
+
+
+class NodeTracker(object):
+    """
+    The node tracker is used to keep track of all nodes that are created
+    while the context is active. Nodes that are deleted before the nodes
+    are queried will be ignored. Can be used in combination with the
+    "with" statement.
+
+    with NodeTracker() as tracker:
+        # code
+
+    nodes = tracker.nodes
+
+    The tracker can also be started and stopped multiple times, the nodes
+    of all the periods it was active in are combined. This makes it
+    possible to only track the nodes of a build that is spread over
+    multiple idle events, see :func:`splineIK.utils.stage.trackNodes`.
+    """
+    def __init__(self):
+        self._handles = []
+        self._callback = None
+
+    # ------------------------------------------------------------------------
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def __nodeAdded(self, obj, *args):
+        self._handles.append(OpenMaya.MObjectHandle(obj))
+
+    # ------------------------------------------------------------------------
+
+    def start(self):
+        """
+        Start tracking the created nodes.
+        """
+        if self._callback is not None:
+            return
+
+        self._callback = OpenMaya.MDGMessage.addNodeAddedCallback(
+            self.__nodeAdded,
+            "dependNode"
+        )
+
+    def stop(self):
+        """
+        Stop tracking the created nodes.
+        """
+        if self._callback is None:
+            return
+
+        OpenMaya.MMessage.removeCallback(self._callback)
+        self._callback = None
+
+    # ------------------------------------------------------------------------
+
+    @property
+    def nodes(self):
+        """
+        :return: names of all created nodes that still exist
+        :rtype: list
+        """
+        nodes = []
+        for handle in self._handles:
+            if not handle.isValid():
+                continue
+
+            obj = handle.object()
+            if obj.hasFn(OpenMaya.MFn.kDagNode):
+                dag = OpenMaya.MDagPath.getAPathTo(obj)
+                nodes.append(dag.partialPathName())
+            else:
+                dep = OpenMaya.MFnDependencyNode(obj)
+                nodes.append(dep.name())
+
+        return nodes
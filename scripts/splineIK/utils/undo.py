@@ -1,16 +1,134 @@
 from maya import cmds
 
 
+BUILD_PLUGIN = "splineIKBuild"
+BUILD_COMMAND = "splineIKBuild"
+
+
+# ----------------------------------------------------------------------------
+
+
 class UndoChunkContext(object):
     """
     The undo context is used to combine a chain of commands into one undo.
     Can be used in combination with the "with" statement.
-    
+
     with UndoChunkContext():
         # code
     """
     def __enter__(self):
         cmds.undoInfo(openChunk=True)
-        
+
     def __exit__(self, *exc_info):
         cmds.undoInfo(closeChunk=True)
+
+
+class UndoSuspendContext(object):
+    """
+    The undo suspend context is used to run a chain of commands without
+    recording them in the undo queue, the queue itself is not flushed.
+    Can be used in combination with the "with" statement.
+
+    with UndoSuspendContext():
+        # code
+    """
+    def __enter__(self):
+        self._state = cmds.undoInfo(query=True, state=True)
+        cmds.undoInfo(stateWithoutFlush=False)
+
+    def __exit__(self, *exc_info):
+        cmds.undoInfo(stateWithoutFlush=self._state)
+
+
+# ----------------------------------------------------------------------------
+
+
+class UndoableBuild(object):
+    """
+    The undoable build holds a build function and the function that
+    reverts it. Both functions are ran with undo recording suspended, this
+    means the memory and time of the undo no longer depend on the amount
+    of commands the build executes. The functions are executed by the
+    build command, see :func:`runUndoableBuild`. When the build is already
+    executed the first redo is skipped, this makes it possible to register
+    a build that was spread over multiple idle events.
+
+    :param func build:
+    :param func revert:
+    :param bool built:
+    """
+    def __init__(self, build, revert, built=False):
+        self._build = build
+        self._revert = revert
+        self._built = built
+        self._error = None
+
+    # ------------------------------------------------------------------------
+
+    @property
+    def error(self):
+        """
+        :return: error raised by the build
+        :rtype: Exception/None
+        """
+        return self._error
+
+    # ------------------------------------------------------------------------
+
+    def redo(self):
+        if self._built:
+            self._built = False
+            return
+
+        # the build is reverted when it fails, as its commands can't be
+        # undone by the user
+        with UndoSuspendContext():
+            try:
+                self._build()
+            except Exception as e:
+                self._error = e
+                self._revert()
+                raise
+
+    def undo(self):
+        with UndoSuspendContext():
+            self._revert()
+
+
+# ----------------------------------------------------------------------------
+
+
+PENDING_BUILDS = []
+
+
+def runUndoableBuild(build, revert, built=False):
+    """
+    Run a build as a single undoable command. The build command plug-in
+    will be loaded if it isn't already, the build is passed to the
+    command using :data:`PENDING_BUILDS` as commands only accept simple
+    arguments. When built is enabled the build is only registered, it
+    will be executed on redo.
+
+    :param func build:
+    :param func revert:
+    :param bool built: build is already executed
+    :raises Exception: When the build raises an error
+    """
+    # load build plugin
+    if not cmds.pluginInfo(BUILD_PLUGIN, query=True, loaded=True):
+        cmds.loadPlugin(BUILD_PLUGIN)
+
+    # run build
+    undoableBuild = UndoableBuild(build, revert, built)
+    PENDING_BUILDS.append(undoableBuild)
+
+    try:
+        getattr(cmds, BUILD_COMMAND)()
+    except RuntimeError:
+        if undoableBuild.error:
+            raise undoableBuild.error
+
+        raise
+    finally:
+        if undoableBuild in PENDING_BUILDS:
+            PENDING_BUILDS.remove(undoableBuild)
@@ -0,0 +1,655 @@
+import os
+from maya import OpenMaya, OpenMayaUI, cmds
+
+from .create import SplineIK
+from .utils.controlShape import CONTROL_SHAPES
+from .utils.colour import COLOURS_FROM_STRING
+from .utils import preview
+
+
+# ----------------------------------------------------------------------------
+
+
+# import pyside, do qt version check for maya 2017 >
+qtVersion = cmds.about(qtVersion=True)
+if qtVersion.startswith("4") or type(qtVersion) not in [str, unicode]:
+    from PySide.QtGui import *
+    from PySide.QtCore import *
+    import shiboken
+else:
+    from PySide2.QtGui import *
+    from PySide2.QtCore import *
+    from PySide2.QtWidgets import *
+    import shiboken2 as shiboken
+
+
+# ----------------------------------------------------------------------------
+
+
+FONT = QFont()
+FONT.setFamily("Consolas")
+
+BOLT_FONT = QFont()
+BOLT_FONT.setFamily("Consolas")
+BOLT_FONT.setWeight(100)  
+
+PREVIEW_DELAY = 250
+
+
+# ----------------------------------------------------------------------------
+
+
+def mayaWindow():
+    """
+    Get Maya's main window.
+    
+    :rtype: QMainWindow
+    """
+    window = OpenMayaUI.MQtUtil.mainWindow()
+    window = shiboken.wrapInstance(long(window), QMainWindow)
+    
+    return window  
+
+
+def isValid(widget):
+    """
+    Check if the underlying Qt object of a widget still exists.
+
+    :param QWidget widget:
+    :rtype: bool
+    """
+    return shiboken.isValid(widget)
+
+
+def isCurve(node):
+    """
+    Check if a node uniquely exists and is a curve or a transform with a
+    curve shape. Bezier curves are a type of nurbs curve and are valid
+    as well.
+
+    :param str node:
+    :rtype: bool
+    """
+    if len(cmds.ls(node)) != 1:
+        return False
+
+    return bool(
+        cmds.ls(node, type="nurbsCurve") or
+        cmds.listRelatives(node, shapes=True, type="nurbsCurve")
+    )
+
+
+# ----------------------------------------------------------------------------
+
+
+def divider(parent):
+    """
+    Create divider ui widget.
+    
+    :param QWidget parent:
+    :rtype: QFrame
+    """
+    line = QFrame(parent)
+    line.setFrameShape(QFrame.HLine)
+    line.setFrameShadow(QFrame.Sunken)
+    return line
+
+
+# ----------------------------------------------------------------------------
+
+
+def getIconPath(name):
+    """
+    Get an icon path based on file name. All paths in the XBMLANGPATH variable
+    processed to see if the provided icon can be found.
+
+    :param str name:
+    :return: Icon path
+    :rtype: str/None
+    """
+    for path in os.environ.get("XBMLANGPATH").split(os.pathsep):
+        iconPath = os.path.join(path, name)
+        if os.path.exists(iconPath):
+            return iconPath.replace("\\", "/")
+
+
+# ----------------------------------------------------------------------------
+
+
+class LabelWidget(QWidget):
+    def __init__(self, parent, label, widget):
+        QWidget.__init__(self, parent)
+        
+        layout = QHBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+        layout.setSpacing(3)
+        
+        # create label
+        self.label = QLabel(self)
+        self.label.setText(label)
+        self.label.setFont(FONT)
+        layout.addWidget(self.label)
+        
+        # create line edit
+        self.widget = widget(self)
+        self.widget.setFont(FONT)
+        layout.addWidget(self.widget)
+
+
+class InputWidget(LabelWidget):
+    def __init__(self, parent, label):
+        LabelWidget.__init__(self, parent, label, QLineEdit)
+  
+    def text(self):
+        return self.widget.text()
+
+
+class ComboBoxWidget(LabelWidget):
+    def __init__(self, parent, label, items, defaultItem=None):
+        LabelWidget.__init__(self, parent, label, QComboBox)
+        
+        # add items
+        self.widget.addItems(items)
+        
+        # set default
+        index = items.index(defaultItem)
+        self.widget.setCurrentIndex(index)
+  
+    def currentText(self):
+        return self.widget.currentText()
+
+
+class SpinBoxWidget(LabelWidget):
+    def __init__(self, parent, label, defaultValue, minValue, maxValue):
+        LabelWidget.__init__(self, parent, label, QSpinBox)
+        self.widget.setMinimum(minValue)
+        self.widget.setMaximum(maxValue)
+        self.widget.setValue(defaultValue)
+  
+    def value(self):
+        return self.widget.value()
+
+
+# ----------------------------------------------------------------------------
+
+
+class SelectWidget(QWidget):
+    released = Signal()
+    def __init__(self, parent, label, button):
+        QWidget.__init__(self, parent)
+        
+        layout = QHBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+        layout.setSpacing(3)
+        
+        # create label
+        self.label = QLabel(self)
+        self.label.setText(label)
+        self.label.setFont(FONT)
+        self.label.setFixedWidth(75)
+        layout.addWidget(self.label)
+        
+        # create line edit
+        self.edit = QLineEdit(self)
+        self.edit.setFont(FONT)
+        layout.addWidget(self.edit)
+        
+        # create label
+        self.button = QPushButton(self)
+        self.button.setText(button)
+        self.button.setFont(FONT)
+        self.button.setFixedWidth(100)
+        self.button.released.connect(self.released.emit)
+        layout.addWidget(self.button)
+        
+    # ------------------------------------------------------------------------
+        
+    def setText(self, text):
+        self.edit.setText(text)
+        
+    def text(self):
+        return self.edit.text()
+
+
+# ----------------------------------------------------------------------------
+
+
+class ControlWidget(QWidget):
+    def __init__(self, parent, label, defaultShape, defaultColour):
+        QWidget.__init__(self, parent)
+
+        # variables
+        shapes = CONTROL_SHAPES.keys()
+        shapes.sort()
+        
+        colours = COLOURS_FROM_STRING.keys()
+        colours.sort()
+        
+        # create layout
+        layout = QHBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+        layout.setSpacing(10)
+        
+        # create label
+        self.label = QLabel(self)
+        self.label.setText(label)
+        self.label.setFont(FONT)
+        layout.addWidget(self.label)
+
+        # create shape
+        self.shape = ComboBoxWidget(
+            self,
+            "Shape:", 
+            shapes, 
+            defaultShape
+        )
+        self.shape.label.setFixedWidth(50)
+        layout.addWidget(self.shape)
+        
+        # create colour
+        self.colour = ComboBoxWidget(
+            self,
+            "Colour:", 
+            colours, 
+            defaultColour
+        )
+        self.colour.label.setFixedWidth(50)
+        layout.addWidget(self.colour)
+
+    # ------------------------------------------------------------------------
+
+    def getShape(self):
+        return self.shape.currentText()
+
+    def getColour(self):
+        return self.colour.currentText()
+
+
+# ----------------------------------------------------------------------------
+
+
+class SplineIKWidget(QWidget):
+    def __init__(self, parent):
+        QWidget.__init__(self, parent)
+        
+        # set ui
+        self.setParent(parent)        
+        self.setWindowFlags(Qt.Window)  
+
+        self.setWindowTitle("Spline IK")      
+        self.setWindowIcon(QIcon(getIconPath("SIK_icon.png")))
+        self.resize(475, 250)
+        
+        # create layout
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(5, 5, 5, 5)
+        layout.setSpacing(3)
+        
+        # create name input
+        self.name = InputWidget(self, "Name")
+        self.name.label.setFixedWidth(75)
+        layout.addWidget(self.name)
+        
+        # create curve selector
+        self.curve = SelectWidget(self, "Curve", "Select Curve")
+        self.curve.released.connect(self.getSelection)
+        self.curve.edit.textChanged.connect(self.schedulePreview)
+        layout.addWidget(self.curve)
+        
+        # add divider
+        div = divider(self)
+        layout.addWidget(div)
+        
+        # add num joints
+        self.joint = SpinBoxWidget(self, "Num Joints", 20, 3, 500)
+        self.joint.widget.valueChanged.connect(self.schedulePreview)
+        layout.addWidget(self.joint)
+
+        # add preview
+        self.preview = QCheckBox(self)
+        self.preview.setText("Preview Joints")
+        self.preview.setFont(FONT)
+        self.preview.toggled.connect(self.updatePreview)
+        layout.addWidget(self.preview)
+        
+        # add divider
+        div = divider(self)
+        layout.addWidget(div)
+        
+        # create vectors
+        axis = ["x", "y", "z"]
+        
+        self.forward = ComboBoxWidget(self, "Forward Axis", axis, "x")
+        layout.addWidget(self.forward)
+        
+        self.up = ComboBoxWidget(self, "Up Axis", axis, "y")
+        self.up.widget.currentIndexChanged.connect(self.schedulePreview)
+        layout.addWidget(self.up)
+        
+        self.worldUp = ComboBoxWidget(self, "World Up Axis", axis, "y")
+        layout.addWidget(self.worldUp)
+
+        # add divider
+        div = divider(self)
+        layout.addWidget(div)
+        
+        self.root = ControlWidget(self, "Root Control", "triangle", "light blue")
+        layout.addWidget(self.root)
+        
+        self.slide = ControlWidget(self, "Slide Control", "sphere", "red")
+        layout.addWidget(self.slide)
+        
+        self.tweak = ControlWidget(self, "Tweak Control", "sphere", "yellow")
+        layout.addWidget(self.tweak)
+        
+        self.tangent = ControlWidget(self, "Tangent Control", "cube", "white")
+        layout.addWidget(self.tangent)
+        
+        # add divider
+        div = divider(self)
+        layout.addWidget(div)
+        
+        # create orient
+        option = ["Yes", "No"]
+        self.orientRoot = ComboBoxWidget(self, "Orient Root to Curve", option, "No")
+        layout.addWidget(self.orientRoot)
+        
+        self.orient = ComboBoxWidget(self, "Orient to Curve", option, "Yes")
+        layout.addWidget(self.orient)
+        
+        # add divider
+        div = divider(self)
+        layout.addWidget(div)
+        
+        # create button
+        self.create = QPushButton(self)
+        self.create.pressed.connect(self.doCreate)
+        self.create.setText("Create")
+        self.create.setFont(FONT)
+        layout.addWidget(self.create)
+
+        # create progress
+        progress = QWidget(self)
+        progressLayout = QHBoxLayout(progress)
+        progressLayout.setContentsMargins(0, 0, 0, 0)
+        progressLayout.setSpacing(3)
+        layout.addWidget(progress)
+
+        self.stage = QLabel(progress)
+        self.stage.setFont(FONT)
+        self.stage.setMinimumWidth(75)
+        progressLayout.addWidget(self.stage)
+
+        self.progress = QProgressBar(progress)
+        self.progress.setRange(0, 100)
+        progressLayout.addWidget(self.progress)
+
+        self.cancel = QPushButton(progress)
+        self.cancel.pressed.connect(self.doCancel)
+        self.cancel.setText("Cancel")
+        self.cancel.setFont(FONT)
+        self.cancel.setEnabled(False)
+        progressLayout.addWidget(self.cancel)
+
+        # create results
+        self.results = QTableWidget(self)
+        self.results.setColumnCount(3)
+        self.results.setHorizontalHeaderLabels(["Name", "Time (s)", "Nodes"])
+        self.results.horizontalHeader().setStretchLastSection(True)
+        self.results.verticalHeader().setVisible(False)
+        self.results.setFont(FONT)
+        layout.addWidget(self.results)
+
+        # create preview timer, edits are collected and previewed once
+        # the input settles
+        self.previewTimer = QTimer(self)
+        self.previewTimer.setSingleShot(True)
+        self.previewTimer.setInterval(PREVIEW_DELAY)
+        self.previewTimer.timeout.connect(self.updatePreview)
+
+        # variables
+        self.run = None
+        
+    # ------------------------------------------------------------------------    
+        
+    def getSelection(self):
+        """
+        Get the current selection and see if the shapes of all instances
+        of the selection are of type 'nurbsCurve' or 'bezierCurve', if the
+        criteria are met the line edit of the curve selection widget is 
+        updated with a comma separated list of the curves. If the criteria
+        are not met a ValueError will be raised.
+        
+        :raises ValueError: if the selection criteria are not met.
+        """
+        # get selection
+        selection = cmds.ls(sl=True)
+        if not selection:
+            raise ValueError("No selection found!")
+
+        for node in selection:
+            # check shapes ( exist )
+            shapes = cmds.listRelatives(node, s=True) or []
+            if not shapes:
+                raise ValueError("No shapes found in selection!")
+
+            # check shapes
+            for shape in shapes:
+                if cmds.nodeType(shape) not in ["nurbsCurve", "bezierCurve"]:
+                    raise ValueError(
+                        "Shapes are not of type 'nurbsCurve' or "
+                        "'bezierCurve'!"
+                    )
+
+        # set text
+        self.curve.setText(", ".join(selection))
+
+    def getCurves(self):
+        """
+        :return: curves of the curve selection widget
+        :rtype: list
+        """
+        return [
+            curve.strip()
+            for curve in self.curve.text().split(",")
+            if curve.strip()
+        ]
+
+    def getNames(self, curves):
+        """
+        Get a name for every curve. When a single curve is used the name
+        of the input field is used, otherwise the names are derived from
+        the curve names, prefixed with the name of the input field if
+        provided.
+
+        :param list curves:
+        :return: names
+        :rtype: list
+        :raises ValueError: if the input field is empty for a single curve
+        """
+        name = self.name.text()
+        if len(curves) == 1:
+            if not name:
+                raise ValueError("No name specified!")
+
+            return [name]
+
+        names = [curve.split("|")[-1] for curve in curves]
+        if name:
+            names = ["{0}_{1}".format(name, n) for n in names]
+
+        return names
+        
+    # ------------------------------------------------------------------------
+
+    def schedulePreview(self, *args):
+        """
+        Update the preview once the input hasn't changed for the preview
+        delay, this prevents the preview from being rebuilt on every
+        keystroke or step of the joint count.
+        """
+        self.previewTimer.start()
+
+    def updatePreview(self, *args):
+        """
+        Draw the positions and orientations of the joints on the first
+        curve using a single preview curve, no nodes of the setup are created.
+        The preview is deleted when it is disabled or when the curve
+        doesn't exist or isn't a curve, it isn't updated while a setup is
+        created.
+        """
+        self.previewTimer.stop()
+        if self.run:
+            return
+
+        # validate, only the first curve is previewed
+        curves = self.getCurves()
+        if (
+            not self.preview.isChecked() or
+            not curves or
+            not isCurve(curves[0])
+        ):
+            preview.deletePreview()
+            return
+
+        # draw preview
+        positions, _, ups = SplineIK().previewJoints(
+            curves[0],
+            self.joint.value(),
+            upDirection=self.up.currentText()
+        )
+        preview.drawPreview(positions, ups)
+
+    def showEvent(self, event):
+        self.updatePreview()
+        QWidget.showEvent(self, event)
+
+    def closeEvent(self, event):
+        self.previewTimer.stop()
+        preview.deletePreview()
+        QWidget.closeEvent(self, event)
+
+    # ------------------------------------------------------------------------
+        
+    def doCreate(self):
+        """
+        Read the values of the ui and create a spline ik on every curve, if
+        the creation is succesfull the root controls of the setups will be
+        selected. All setups are created as a batch with a single undo. A
+        ValueError will be raised if the input field is empty for a single
+        curve or no curve is selected.
+        
+        :raises ValueError: if the input or curve field are empty
+        """
+        # validate curve
+        curves = self.getCurves()
+        if not curves:
+            raise ValueError("No curve specified!")
+
+        # validate name
+        names = self.getNames(curves)
+
+        # create spline ik object
+        ik = SplineIK()
+
+        # set control shape and colour
+        ik.rootControlShape = self.root.getShape()
+        ik.rootControlColour = self.root.getColour()
+        ik.slideControlShape = self.slide.getShape()
+        ik.slideControlColour = self.slide.getColour()
+        ik.controlShape = self.tweak.getShape()
+        ik.controlColour = self.tweak.getColour()
+        ik.tangentControlShape = self.tangent.getShape()
+        ik.tangentControlColour = self.tangent.getColour()
+        
+        # set orientation
+        orient = True if self.orientRoot.currentText() == "Yes" else False
+        ik.orientRootToCurve = orient
+        
+        orient = True if self.orient.currentText() == "Yes" else False
+        ik.orientToCurve = orient
+
+        # create spline ik, the creation is spread over idle events so
+        # the ui stays responsive and the creation can be cancelled
+        preview.deletePreview()
+        self.create.setEnabled(False)
+        self.cancel.setEnabled(True)
+
+        self.run = ik.createBatchDeferred(
+            names,
+            curves,
+            self.joint.value(),
+            forwardDirection=self.forward.currentText(),
+            upDirection=self.up.currentText(),
+            worldUpDirection=self.worldUp.currentText(),
+            progress=self.doProgress,
+            finished=lambda run: self.doFinished(run, ik)
+        )
+
+    def doProgress(self, stage, progress):
+        """
+        Update the stage label and progress bar.
+
+        :param str stage:
+        :param float progress:
+        """
+        self.stage.setText(stage)
+        self.progress.setValue(int(progress * 100))
+
+    def doCancel(self):
+        """
+        Cancel the creation, the created nodes will be deleted and the
+        original curve restored.
+        """
+        if self.run:
+            self.run.cancel()
+
+    def doFinished(self, run, ik):
+        """
+        Reset the progress, update the results and select the root controls
+        of the setups if the creation was succesfull. The error of a failed
+        creation will be raised.
+
+        :param splineIK.utils.stage.DeferredRun run:
+        :param SplineIK ik:
+        :raises Exception: if the creation failed
+        """
+        # reset ui
+        self.run = None
+        self.create.setEnabled(True)
+        self.cancel.setEnabled(False)
+        self.stage.setText("")
+        self.progress.setValue(0)
+        self.updatePreview()
+
+        # validate
+        if run.error:
+            raise run.error
+        elif run.cancelled:
+            return
+
+        # update results
+        self.setResults(ik.batchResults)
+
+        # select roots
+        cmds.select([result["rootControl"] for result in ik.batchResults])
+
+    def setResults(self, results):
+        """
+        Populate the results table with the build time and node count of
+        every created setup.
+
+        :param list results:
+        """
+        self.results.setRowCount(len(results))
+        for i, result in enumerate(results):
+            for j, value in enumerate([
+                result["name"],
+                "{0:.3f}".format(result["time"]),
+                str(result["nodes"])
+            ]):
+                item = QTableWidgetItem(value)
+                item.setFont(FONT)
+                item.setFlags(Qt.ItemIsSelectable | Qt.ItemIsEnabled)
+                self.results.setItem(i, j, item)
+
@@ -1,4 +1,7 @@
-from maya import utils
+from maya import cmds, utils
 
-import splineIK.install
-utils.executeDeferred(splineIK.install.shelf)
+# the shelf button is only installed in interactive sessions when it is
+# missing, batch sessions don't import the package at all
+if not cmds.about(batch=True):
+    import splineIK.install
+    utils.executeDeferred(splineIK.install.shelf, False)
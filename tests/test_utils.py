@@ -0,0 +1,228 @@
+"""
+Smoke tests of the utils that don't interact with the scene. The modules
+import maya, the tests are skipped when maya can't be imported and can be
+run using mayapy without initializing Maya. Every module with an optional
+NumPy path is tested with and without NumPy. The import of the package is
+checked to stay cheap compared to the import of the create module.
+
+mayapy -m unittest discover -s tests
+"""
+import json
+import math
+import os
+import sys
+import unittest
+
+sys.path.insert(
+    0,
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "scripts")
+)
+
+try:
+    from splineIK.utils import bezier, cache, deformer, profile, projection
+    from splineIK.utils import skin, trace
+except ImportError as e:
+    raise unittest.SkipTest("maya is not available: {0}".format(e))
+
+
+# ----------------------------------------------------------------------------
+
+
+class NumpyTestCase(unittest.TestCase):
+    """
+    The tests are run with the optional NumPy path of the modules disabled,
+    the NumPy subclasses run them again with NumPy enabled.
+    """
+    MODULES = [bezier, deformer, skin]
+    USE_NUMPY = False
+
+    def setUp(self):
+        if self.USE_NUMPY and projection.numpy is None:
+            self.skipTest("numpy is not available")
+
+        self._numpy = [module.numpy for module in self.MODULES]
+        for module in self.MODULES:
+            module.numpy = projection.numpy if self.USE_NUMPY else None
+
+    def tearDown(self):
+        for module, value in zip(self.MODULES, self._numpy):
+            module.numpy = value
+
+    def assertPointsEqual(self, a, b, places=6):
+        self.assertEqual(len(a), len(b))
+        for p1, p2 in zip(a, b):
+            for v1, v2 in zip(p1, p2):
+                self.assertAlmostEqual(v1, v2, places=places)
+
+
+# ----------------------------------------------------------------------------
+
+
+class BezierTests(NumpyTestCase):
+    def test_fitSegment(self):
+        cvs = [(0, 0, 0), (1, 2, 0), (3, 2, 0), (4, 0, 0)]
+        parameters = [i / 20.0 for i in range(21)]
+        points = [bezier.evaluate(cvs, u) for u in parameters]
+
+        fitted, error = bezier.fitSegment(
+            points,
+            bezier.getChordParameters(points),
+            bezier.sub(cvs[1], cvs[0]),
+            bezier.sub(cvs[3], cvs[2])
+        )
+
+        self.assertLess(error, 1e-2)
+        self.assertPointsEqual(fitted, cvs, places=1)
+
+    def test_fitSplineToControls(self):
+        points = [
+            (math.cos(i * 0.1) * 5, math.sin(i * 0.1) * 5, i * 0.1)
+            for i in range(60)
+        ]
+
+        cvs, error = bezier.fitSplineToControls(points, maxControls=4)
+        self.assertEqual(len(cvs), 10)
+        self.assertLess(error, 0.5)
+        self.assertPointsEqual([cvs[0], cvs[-1]], [points[0], points[-1]])
+
+        for i, point in enumerate(points):
+            parameter = 3.0 * i / (len(points) - 1)
+            evaluated = bezier.evaluateSpline(cvs, parameter)
+            self.assertLess(bezier.length(bezier.sub(evaluated, point)), 0.5)
+
+
+class SkinTests(NumpyTestCase):
+    def test_getWeights(self):
+        jointParameters = [i / 9.0 for i in range(10)]
+        parameters = [i / 99.0 for i in range(100)] + [-0.5, 1.5]
+
+        weights = skin.getWeights(parameters, jointParameters, 1.5, 2)
+        self.assertEqual(len(weights), len(parameters) * 10)
+
+        for i in range(len(parameters)):
+            values = weights[i * 10:i * 10 + 10]
+            self.assertAlmostEqual(sum(values), 1.0)
+            self.assertLessEqual(len([v for v in values if v]), 2)
+
+        # joint parameters are fully weighted to their joint
+        weights = skin.getWeights(jointParameters, jointParameters)
+        for i in range(10):
+            self.assertAlmostEqual(weights[i * 10 + i], 1.0)
+
+
+class DeformerTests(NumpyTestCase):
+    def getFrames(self, offset):
+        positions = [(i, offset, 0) for i in range(5)]
+        tangents = [(1, 0, 0)] * 5
+        matrices = [
+            [1, 0, 0, 0, 0, 1, 0, 0, 0, 0, 1, 0, p[0], p[1], p[2], 1]
+            for p in positions
+        ]
+
+        return deformer.getFrames(positions, tangents, matrices, 0, 1)
+
+    def test_bindPoints(self):
+        points = [(0.5, 1, 0), (1.25, -1, 2), (3.9, 0, -1)]
+        parameters = [0.125, 0.3125, 0.975]
+        sampleParameters = [i / 4.0 for i in range(5)]
+
+        indices, weights, offsets = deformer.bindPoints(
+            points,
+            parameters,
+            sampleParameters,
+            self.getFrames(0)
+        )
+        self.assertEqual(list(indices), [0, 1, 3])
+
+        # the rest pose returns the original points
+        deformed = deformer.deformPoints(
+            indices,
+            weights,
+            offsets,
+            self.getFrames(0),
+            points
+        )
+        self.assertPointsEqual(deformed, points)
+
+        # translated frames translate the points
+        deformed = deformer.deformPoints(
+            indices,
+            weights,
+            offsets,
+            self.getFrames(2),
+            points
+        )
+        self.assertPointsEqual(
+            deformed,
+            [(x, y + 2, z) for x, y, z in points]
+        )
+
+
+class BezierNumpyTests(BezierTests):
+    USE_NUMPY = True
+
+
+class SkinNumpyTests(SkinTests):
+    USE_NUMPY = True
+
+
+class DeformerNumpyTests(DeformerTests):
+    USE_NUMPY = True
+
+
+# ----------------------------------------------------------------------------
+
+
+class LRUCacheTests(unittest.TestCase):
+    def test_eviction(self):
+        lru = cache.LRUCache(size=2)
+        lru.set("a", 1)
+        lru.set("b", 2)
+        self.assertEqual(lru.get("a"), 1)
+
+        # b is the least recently used entry
+        lru.set("c", 3)
+        self.assertIsNone(lru.get("b"))
+        self.assertEqual(lru.get("c"), 3)
+        self.assertEqual((lru.hits, lru.misses), (2, 1))
+
+        lru.size = 1
+        self.assertEqual(len(lru), 1)
+        self.assertEqual(lru.get("c"), 3)
+
+    def test_getKey(self):
+        self.assertEqual(
+            cache.getKey([1.0000001, 2.0]),
+            cache.getKey([1.0, 2.0000004])
+        )
+
+
+class TraceTests(unittest.TestCase):
+    def test_encode(self):
+        value = {"name": "{name}_jnt", "values": (1, 2.5), 3: [{4: None}]}
+        decoded = trace.decode(json.loads(json.dumps(trace.encode(value))))
+
+        self.assertEqual(
+            decoded,
+            {"name": "{name}_jnt", "values": [1, 2.5], 3: [{4: None}]}
+        )
+
+    def test_splitNode(self):
+        components, attr = trace.splitNode("|grp|node.attr[0]")
+        self.assertEqual(components, ["", "grp", "node"])
+        self.assertEqual(trace.joinNode(components, attr), "|grp|node.attr[0]")
+
+
+class ImportTests(unittest.TestCase):
+    def test_checkImport(self):
+        try:
+            __import__("splineIK.create")
+        except Exception as e:
+            self.skipTest("create can't be imported: {0}".format(e))
+
+        results = profile.checkImport()
+        self.assertEqual(results["modules"], ["splineIK"])
+
+
+if __name__ == "__main__":
+    unittest.main()